@@ -0,0 +1,304 @@
+"""
+Bulk chart generation CLI
+
+Reads subjects from CSV or NDJSON, calculates the requested charts in a
+process pool and streams the results to NDJSON or the compact chart store
+format. Progress is checkpointed so an interrupted run can be resumed.
+
+Each input row holds a `chart_type` (natal, transit, synastry, composite,
+solar_return, progressed; default natal) plus the keyword arguments of the
+matching ChartService method, e.g.:
+
+    chart_type,date_time,latitude,longitude,house_system
+    natal,2026-01-27 20:14,40.4168,-3.7038,placidus
+
+Usage:
+    python batch_charts.py subjects.csv -o charts.ndjson
+    python batch_charts.py subjects.ndjson -o charts.bin --format compact --resume
+"""
+import argparse
+import csv
+import inspect
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.chart_store import chart_store, encode_payload
+
+
+CHART_METHODS = {
+    "natal": "calculate_natal",
+    "transit": "calculate_transit",
+    "synastry": "calculate_synastry",
+    "composite": "calculate_composite",
+    "solar_return": "calculate_solar_return",
+    "progressed": "calculate_progressed",
+}
+
+FLOAT_FIELDS = ("latitude", "longitude")
+SUBJECT_PREFIXES = ("", "natal_", "person1_", "person2_")
+INT_FIELDS = ("year",)
+
+# Options left out of chart IDs at their defaults, as in the charts router
+DEFAULT_OPTIONS = {"formatting": "full", "precision": "full"}
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield input rows from a CSV or NDJSON file ("-" reads NDJSON from stdin)"""
+    if path == "-":
+        for line in sys.stdin:
+            if line.strip():
+                yield json.loads(line)
+        return
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def prepare_task(row: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Split a raw input row into (chart_type, method kwargs), coercing CSV strings"""
+    from services.chart_service import ChartService
+
+    chart_type = str(row.get("chart_type", "natal")).replace("-", "_").lower()
+    if chart_type not in CHART_METHODS:
+        raise ValueError(f"Unknown chart type: {chart_type}")
+    accepted = inspect.signature(getattr(ChartService, CHART_METHODS[chart_type])).parameters
+    params = {}
+    for key, value in row.items():
+        if key not in accepted or key == "self":
+            continue
+        if key.endswith(FLOAT_FIELDS):
+            value = float(value)
+        elif key in INT_FIELDS:
+            value = int(value)
+        if DEFAULT_OPTIONS.get(key, object()) == value:
+            continue
+        params[key] = value
+    # Charts echo their house system, and request models always carry it
+    if "house_system" in accepted:
+        params.setdefault("house_system", accepted["house_system"].default)
+    return chart_type, params
+
+
+def calculate_batch(tasks: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Worker entry point: calculate a batch of (row number, input row) tasks"""
+    from services.chart_service import chart_service
+    from services.geo_resolver import geo_resolver
+
+    prepared = []
+    for row_number, row in tasks:
+        try:
+            prepared.append((row_number, prepare_task(row)))
+        except Exception as e:
+            prepared.append((row_number, e))
+
+    # Resolve timezones for every subject of the batch in one pass; the
+    # chart calculations below then hit the resolver's caches
+    subjects = [
+        (params[f"{prefix}date_time"], params[f"{prefix}latitude"], params[f"{prefix}longitude"])
+        for _, task in prepared if not isinstance(task, Exception)
+        for params in (task[1],)
+        for prefix in SUBJECT_PREFIXES
+        if f"{prefix}latitude" in params and f"{prefix}date_time" in params
+    ]
+    try:
+        geo_resolver.resolve_many(subjects)
+    except Exception:
+        pass  # invalid rows are reported individually below
+
+    results = []
+    for row_number, task in prepared:
+        try:
+            if isinstance(task, Exception):
+                raise task
+            chart_type, params = task
+            chart = getattr(chart_service, CHART_METHODS[chart_type])(**params)
+            results.append({
+                "row": row_number,
+                "chart_type": chart_type,
+                "chart_id": chart_store.chart_id(chart_type, params),
+                "chart": chart,
+            })
+        except Exception as e:
+            results.append({"row": row_number, "error": str(e)})
+    return results
+
+
+class ChartWriter:
+    """Append-only writer for NDJSON or length-prefixed compact records"""
+
+    def __init__(self, path: str, fmt: str, append: bool):
+        self.fmt = fmt
+        mode = "a" if append else "w"
+        if fmt == "compact":
+            self._file = sys.stdout.buffer if path == "-" else open(path, mode + "b")
+        else:
+            self._file = sys.stdout if path == "-" else open(path, mode, encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self.fmt == "compact":
+            payload = encode_payload(record)
+            self._file.write(struct.pack(">I", len(payload)) + payload)
+        else:
+            self._file.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+        if self._file not in (sys.stdout, sys.stdout.buffer):
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file not in (sys.stdout, sys.stdout.buffer):
+            self._file.close()
+
+
+def read_compact(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate over records written with --format compact"""
+    from services.chart_store import decode_payload
+
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return
+            (size,) = struct.unpack(">I", header)
+            payload = f.read(size)
+            if len(payload) < size:
+                return  # truncated trailing record from an interrupted run
+            yield decode_payload(payload)
+
+
+def load_checkpoint(path: str) -> set:
+    """Row numbers already completed by a previous run"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip().isdigit()}
+
+
+class Progress:
+    """Periodic progress line on stderr"""
+
+    def __init__(self, total: int, done: int, interval: float = 1.0):
+        self.total = total
+        self.done = done
+        self.errors = 0
+        self.interval = interval
+        self._start = time.monotonic()
+        self._start_done = done
+        self._last = 0.0
+
+    def update(self, done: int, errors: int, force: bool = False) -> None:
+        self.done += done
+        self.errors += errors
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = now - self._start
+        rate = (self.done - self._start_done) / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else float("inf")
+        sys.stderr.write(
+            f"\r{self.done}/{self.total} charts  {rate:.1f}/s  "
+            f"errors: {self.errors}  ETA: {eta:.0f}s   "
+        )
+        sys.stderr.flush()
+
+
+def run(args: argparse.Namespace) -> int:
+    """Calculate every pending row and stream the results out"""
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    if args.output == "-" and not args.checkpoint:
+        checkpoint_path = None
+
+    completed = load_checkpoint(checkpoint_path) if (args.resume and checkpoint_path) else set()
+    rows = list(read_rows(args.input))
+    pending = [(number, row) for number, row in enumerate(rows) if number not in completed]
+    batches = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+
+    writer = ChartWriter(args.output, args.format, append=bool(completed))
+    checkpoint = open(checkpoint_path, "a" if completed else "w", encoding="utf-8") if checkpoint_path else None
+    progress = Progress(total=len(rows), done=len(rows) - len(pending))
+    failures = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            batch_iter = iter(batches)
+            in_flight = set()
+            # Keep a bounded window of batches queued so memory stays flat
+            for batch in batch_iter:
+                in_flight.add(pool.submit(calculate_batch, batch))
+                if len(in_flight) >= args.workers * 2:
+                    break
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results = future.result()
+                    errors = 0
+                    for record in results:
+                        if "error" in record:
+                            errors += 1
+                            sys.stderr.write(f"\nrow {record['row']}: {record['error']}\n")
+                            continue
+                        writer.write(record)
+                    writer.flush()
+                    if args.store:
+                        chart_store.import_charts(
+                            record["chart"] for record in results if "error" not in record
+                        )
+                    if checkpoint:
+                        checkpoint.write("".join(
+                            f"{record['row']}\n" for record in results
+                            if "error" not in record or args.skip_errors
+                        ))
+                        checkpoint.flush()
+                    failures += errors
+                    progress.update(len(results), errors)
+                    next_batch = next(batch_iter, None)
+                    if next_batch is not None:
+                        in_flight.add(pool.submit(calculate_batch, next_batch))
+    finally:
+        writer.close()
+        if checkpoint:
+            checkpoint.close()
+        progress.update(0, 0, force=True)
+        sys.stderr.write("\n")
+
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate charts in bulk from a CSV or NDJSON list of subjects"
+    )
+    parser.add_argument("input", help="CSV or NDJSON file of subjects ('-' for NDJSON on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=("ndjson", "compact"), default="ndjson",
+                        help="ndjson, or compact length-prefixed zlib records")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="Rows per worker task (default: 16)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip rows recorded in the checkpoint and append to the output")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--store", action="store_true",
+                        help="Also persist every chart in the chart store")
+    parser.add_argument("--skip-errors", action="store_true",
+                        help="Checkpoint failed rows so --resume does not retry them")
+    return run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Load test for the interpretation endpoint
+
+Drives POST /api/interpret at a fixed concurrency and reports the
+time-to-first-token and total latency percentiles (p50/p95/p99),
+throughput and errors. Run it against a backend that talks to
+mock_openrouter.py to avoid spending OpenRouter quota (and with
+ADMISSION_ENABLED=false, since all requests come from one client):
+
+    python loadtest_interpret.py --url http://127.0.0.1:8000 -c 32 -n 500
+    python loadtest_interpret.py -c 8 -d 60 --no-stream --report
+
+For streamed requests the first token is the first SSE event carrying
+text; for non-streamed ones it is the complete response.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+
+DEFAULT_BIRTH_DATA = {"date_time": "1990-01-01 12:00", "latitude": 40.7128, "longitude": -74.006}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Result:
+    """Outcome of one request"""
+
+    def __init__(self):
+        """Initialize an empty result"""
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+        self.chars = 0
+        self.error: Optional[str] = None
+
+
+async def run_request(client: httpx.AsyncClient, url: str, payload: Dict[str, Any]) -> Result:
+    """Send one interpretation request and time it"""
+    result = Result()
+    started = time.perf_counter()
+    try:
+        if payload.get("stream"):
+            async with client.stream("POST", url, json=payload) as response:
+                if response.status_code != 200:
+                    result.error = f"HTTP {response.status_code}"
+                    return result
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data = line[5:].removeprefix(" ")
+                        if event == "error":
+                            result.error = f"stream: {data}"
+                        elif data != "[DONE]" and data:
+                            if result.ttft is None:
+                                result.ttft = time.perf_counter() - started
+                            result.chars += len(data)
+                    elif not line:
+                        event = None
+        else:
+            response = await client.post(url, json=payload)
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+                return result
+            text = response.json().get("interpretation", "")
+            if text.startswith("Error:"):
+                result.error = "upstream error"
+            result.ttft = time.perf_counter() - started
+            result.chars = len(text)
+    except httpx.HTTPError as e:
+        result.error = type(e).__name__
+        return result
+    result.total = time.perf_counter() - started
+    return result
+
+
+async def load_test(
+    url: str,
+    payload: Dict[str, Any],
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+    timeout: float,
+) -> Dict[str, Any]:
+    """Run workers until `requests` are sent or `duration` seconds pass"""
+    results: List[Result] = []
+    sent = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal sent
+        while True:
+            if requests is not None and sent >= requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            sent += 1
+            results.append(await run_request(client, url, payload))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    succeeded = [result for result in results if result.error is None]
+    errors: Dict[str, int] = {}
+    for result in results:
+        if result.error is not None:
+            errors[result.error] = errors.get(result.error, 0) + 1
+
+    def summary(values: List[float]) -> Dict[str, Optional[float]]:
+        return {f"p{q}": percentile(values, q) for q in (50, 95, 99)}
+
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "throughput_rps": len(succeeded) / elapsed if elapsed else 0.0,
+        "throughput_chars_per_s": sum(result.chars for result in succeeded) / elapsed if elapsed else 0.0,
+        "ttft": summary([result.ttft for result in succeeded if result.ttft is not None]),
+        "latency": summary([result.total for result in succeeded if result.total is not None]),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Human-readable summary"""
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.0f} ms"
+
+    print(f"requests     {report['requests']} ({report['succeeded']} ok) at concurrency {report['concurrency']}"
+          f" in {report['elapsed']:.1f} s")
+    print(f"throughput   {report['throughput_rps']:.2f} req/s, {report['throughput_chars_per_s']:.0f} chars/s")
+    for name in ("ttft", "latency"):
+        values = report[name]
+        print(f"{name:<12} p50 {ms(values['p50'])}  p95 {ms(values['p95'])}  p99 {ms(values['p99'])}")
+    for error, count in sorted(report["errors"].items(), key=lambda item: -item[1]):
+        print(f"error        {count} x {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test POST /api/interpret")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend base URL")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=None, help="Total requests (default 200 without -d)")
+    parser.add_argument("-d", "--duration", type=float, default=None, help="Run for this many seconds instead")
+    parser.add_argument("--chart", help="JSON file with pre-calculated chart_data (default: sample birth data)")
+    parser.add_argument("--no-stream", action="store_true", help="Use the non-streaming path")
+    parser.add_argument("--report", action="store_true", help="Request full multi-section reports")
+    parser.add_argument("--assemble", action="store_true", help="Request readings assembled from fragments")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--timeout", type=float, default=180.0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    payload: Dict[str, Any] = {
+        "language": args.language,
+        "stream": not args.no_stream,
+        "report": args.report,
+        "assemble": args.assemble,
+    }
+    if args.chart:
+        with open(args.chart, "r", encoding="utf-8") as f:
+            payload["chart_data"] = json.load(f)
+    else:
+        payload["birth_data"] = DEFAULT_BIRTH_DATA
+
+    total = args.requests if args.requests is not None or args.duration else 200
+    report = asyncio.run(load_test(
+        f"{args.url.rstrip('/')}/api/interpret",
+        payload,
+        max(1, args.concurrency),
+        total,
+        args.duration,
+        args.timeout,
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -17,6 +17,10 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Admission control (added first so CORS, added after it, also wraps 429s)
+from services.admission import AdmissionMiddleware, admission_controller
+app.add_middleware(AdmissionMiddleware)
+
 # Configure CORS
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
 app.add_middleware(
@@ -28,11 +32,46 @@ app.add_middleware(
 )
 
 # Import routers
-from routers import charts, interpret
+from routers import charts, interpret, jobs
+
+from services.geo_resolver import geo_resolver
+from services.jobs import job_queue
+from services.sky_now import sky_now
 
 # Register routers
 app.include_router(charts.router, prefix="/api/charts", tags=["Charts"])
 app.include_router(interpret.router, prefix="/api", tags=["Interpretation"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+
+
+@app.on_event("startup")
+async def build_geo_index():
+    """Build the timezone grid once so the first chart request does not pay for it"""
+    geo_resolver.build_index()
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Requeue jobs interrupted by the last shutdown and start the lane workers"""
+    await job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    """Stop the job workers; unfinished jobs resume on the next start"""
+    await job_queue.stop()
+
+
+@app.on_event("startup")
+async def start_sky_now():
+    """Start precomputing the current-sky charts"""
+    await sky_now.start()
+
+
+@app.on_event("shutdown")
+async def stop_sky_now():
+    """Stop the current-sky recalculation"""
+    await sky_now.stop()
 
 
 @app.get("/")
@@ -55,6 +94,12 @@ async def health_check():
     }
 
 
+@app.get("/api/admission")
+async def admission_stats():
+    """Admission limits, requests in flight and rejections"""
+    return admission_controller.stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
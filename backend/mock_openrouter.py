@@ -0,0 +1,162 @@
+"""
+Local stand-in for the OpenRouter chat completions API
+
+Serves POST /api/v1/chat/completions with generated text, streamed as
+Server-Sent Events or returned whole, at a configurable latency and token
+rate, and can inject 429 rate limits and failures. Point the backend at it
+to exercise the interpretation path without spending OpenRouter quota:
+
+    python mock_openrouter.py --port 8001 --latency 0.4 --token-rate 60
+    OPENROUTER_BASE_URL=http://127.0.0.1:8001/api/v1 OPENROUTER_API_KEY=mock \\
+        uvicorn main:app --port 8000
+
+Prompts asking for a JSON object of numbered items (fragment generation)
+get one, so assembled readings work against the mock as well.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Dict, Any, AsyncIterator, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+WORDS = (
+    "your chart suggests a reflective nature with strong drive toward growth and meaning "
+    "this placement invites you to balance ambition with care for the people around you "
+    "the tension here can become a source of creativity when it is met with patience"
+).split()
+
+
+class MockSettings:
+    """Behaviour of the mock, set from the command line"""
+
+    def __init__(
+        self,
+        latency: float = 0.3,
+        token_rate: float = 50.0,
+        tokens: int = 300,
+        rate_limit_ratio: float = 0.0,
+        failure_ratio: float = 0.0,
+        drop_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ):
+        """Initialize settings"""
+        self.latency = latency
+        self.token_rate = token_rate
+        self.tokens = tokens
+        self.rate_limit_ratio = rate_limit_ratio
+        self.failure_ratio = failure_ratio
+        self.drop_ratio = drop_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts: Dict[str, int] = {"requests": 0, "rate_limited": 0, "failed": 0, "dropped": 0}
+
+
+def completion_tokens(messages: List[Dict[str, Any]], limit: int) -> List[str]:
+    """Response text as a list of tokens (words with their trailing space)"""
+    prompt = messages[-1].get("content", "") if messages else ""
+    numbered = re.findall(r"^(\d+)\. (.+)$", prompt, re.M)
+    if numbered and "JSON object" in prompt:
+        text = json.dumps({number: f"{placement}: " + " ".join(WORDS[:24]) for number, placement in numbered})
+        return [token + " " for token in text.split(" ")]
+    return [WORDS[i % len(WORDS)] + " " for i in range(limit)]
+
+
+def create_app(settings: MockSettings) -> FastAPI:
+    """Mock API application"""
+    app = FastAPI(title="Mock OpenRouter")
+
+    async def stream_tokens(model: str, tokens: List[str], drop: bool) -> AsyncIterator[bytes]:
+        completion_id = f"gen-{uuid.uuid4().hex[:12]}"
+        await asyncio.sleep(settings.latency)
+        interval = 1.0 / settings.token_rate if settings.token_rate > 0 else 0.0
+        for position, token in enumerate(tokens):
+            if drop and position == len(tokens) // 2:
+                settings.counts["dropped"] += 1
+                raise ConnectionError("Injected mid-stream disconnect")
+            chunk = {"id": completion_id, "model": model, "choices": [{"index": 0, "delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            if interval:
+                await asyncio.sleep(interval)
+        done = {"id": completion_id, "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode()
+
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        """OpenRouter-compatible chat completion"""
+        body = await request.json()
+        settings.counts["requests"] += 1
+        roll = settings.random.random()
+        if roll < settings.rate_limit_ratio:
+            settings.counts["rate_limited"] += 1
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Rate limit exceeded (mock)"}},
+                status_code=429,
+                headers={"Retry-After": str(settings.retry_after)},
+            )
+        if roll < settings.rate_limit_ratio + settings.failure_ratio:
+            settings.counts["failed"] += 1
+            await asyncio.sleep(settings.latency)
+            return JSONResponse({"error": {"code": 502, "message": "Upstream failure (mock)"}}, status_code=502)
+
+        model = body.get("model", "mock")
+        tokens = completion_tokens(body.get("messages", []), min(settings.tokens, int(body.get("max_tokens", 2000))))
+        if body.get("stream"):
+            drop = settings.random.random() < settings.drop_ratio
+            return StreamingResponse(stream_tokens(model, tokens, drop), media_type="text/event-stream")
+
+        await asyncio.sleep(settings.latency + (len(tokens) / settings.token_rate if settings.token_rate > 0 else 0))
+        return {
+            "id": f"gen-{uuid.uuid4().hex[:12]}",
+            "model": model,
+            "created": int(time.time()),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": {"completion_tokens": len(tokens)},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        """Requests served and faults injected"""
+        return settings.counts
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local mock of the OpenRouter chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Tokens per second (0: no delay)")
+    parser.add_argument("--tokens", type=int, default=300, help="Tokens per response (capped by max_tokens)")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--failure-ratio", type=float, default=0.0, help="Share of requests answered with 502")
+    parser.add_argument("--drop-ratio", type=float, default=0.0, help="Share of streams cut off halfway")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockSettings(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        tokens=args.tokens,
+        rate_limit_ratio=args.rate_limit_ratio,
+        failure_ratio=args.failure_ratio,
+        drop_ratio=args.drop_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
@@ -1,14 +1,75 @@
 """
 Charts Router - API endpoints for chart calculations
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from sse_starlette.sse import EventSourceResponse
+from typing import Optional, List, Tuple, Type
 from services.chart_service import chart_service
+from services.chart_store import canonical_input, chart_store
+from services.compatibility import compatibility_service
+from services.geo_resolver import geo_resolver
+from services.http_cache import encoded_json_response, json_response, json_response_async, not_modified
+from services.sky_now import sky_now
+from services.streaming import HEARTBEAT_INTERVAL, encode_event
 
 
 router = APIRouter()
 
+# Query parameters of the canonical GET chart URLs, in canonical order,
+# and the request fields they stand for
+PERSON_PAIR_PARAMETERS = [
+    ("dt1", "person1_date_time"), ("lat1", "person1_latitude"), ("lon1", "person1_longitude"),
+    ("dt2", "person2_date_time"), ("lat2", "person2_latitude"), ("lon2", "person2_longitude"),
+    ("hs", "house_system"), ("fmt", "formatting"),
+]
+GET_PARAMETERS = {
+    "natal": [
+        ("dt", "date_time"), ("lat", "latitude"), ("lon", "longitude"), ("hs", "house_system"), ("fmt", "formatting"),
+    ],
+    "transit": [
+        ("dt", "natal_date_time"), ("lat", "natal_latitude"), ("lon", "natal_longitude"),
+        ("tdt", "transit_date_time"), ("hs", "house_system"), ("fmt", "formatting"),
+    ],
+    "synastry": PERSON_PAIR_PARAMETERS,
+    "composite": PERSON_PAIR_PARAMETERS,
+    "solar_return": [
+        ("dt", "natal_date_time"), ("lat", "latitude"), ("lon", "longitude"), ("year", "year"), ("hs", "house_system"),
+        ("fmt", "formatting"),
+    ],
+    "progressed": [
+        ("dt", "natal_date_time"), ("lat", "latitude"), ("lon", "longitude"),
+        ("pdt", "progressed_date_time"), ("hs", "house_system"), ("fmt", "formatting"),
+    ],
+}
+
+# Angle formatting of a chart request: "full" (the default) serializes every
+# angle with its D°M'S" string and split fields, "raw" as decimal degrees only
+FORMATTING_FIELD = Field(
+    default="full",
+    pattern="^(full|raw)$",
+    description="'raw' returns angles as decimal degrees, without formatted strings"
+)
+
+# Redirects to the canonical URL are themselves cacheable
+REDIRECT_CACHE_CONTROL = "public, max-age=86400"
+
+# Seconds a chart may take, including the wait for a worker, before the
+# request fails with 504 and the calculation is abandoned
+CHART_TIMEOUT = float(os.getenv("CHART_TIMEOUT", "30"))
+
+# How often a pending calculation checks whether its client is still there
+DISCONNECT_POLL_INTERVAL = 0.25
+
+# Chart types a dashboard request can combine
+DASHBOARD_CHARTS = ("natal", "transit", "solar_return", "progressed")
+
 
 class NatalChartRequest(BaseModel):
     """Request model for natal chart calculation"""
@@ -16,6 +77,12 @@ class NatalChartRequest(BaseModel):
     latitude: float = Field(..., ge=-90, le=90, description="Latitude in decimal degrees")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude in decimal degrees")
     house_system: str = Field(default="placidus", description="House system to use")
+    precision: str = Field(
+        default="full",
+        pattern="^(full|preview)$",
+        description="'preview' returns a fast approximate chart (major aspects only)"
+    )
+    formatting: str = FORMATTING_FIELD
 
 
 class TransitChartRequest(BaseModel):
@@ -25,6 +92,7 @@ class TransitChartRequest(BaseModel):
     natal_longitude: float = Field(..., ge=-180, le=180)
     transit_date_time: str
     house_system: str = "placidus"
+    formatting: str = FORMATTING_FIELD
 
 
 class SynastryChartRequest(BaseModel):
@@ -36,6 +104,7 @@ class SynastryChartRequest(BaseModel):
     person2_latitude: float = Field(..., ge=-90, le=90)
     person2_longitude: float = Field(..., ge=-180, le=180)
     house_system: str = "placidus"
+    formatting: str = FORMATTING_FIELD
 
 
 class CompositeChartRequest(BaseModel):
@@ -47,6 +116,28 @@ class CompositeChartRequest(BaseModel):
     person2_latitude: float = Field(..., ge=-90, le=90)
     person2_longitude: float = Field(..., ge=-180, le=180)
     house_system: str = "placidus"
+    compact: bool = Field(
+        default=False,
+        description="Build from cached natal positions (objects, houses and aspects only)"
+    )
+    formatting: str = FORMATTING_FIELD
+
+
+class ChartVariant(BaseModel):
+    """One rendering of a chart in a variants request"""
+    house_system: str = "placidus"
+    zodiac: str = Field(default="tropical", pattern="^(tropical|sidereal)$")
+    ayanamsa: str = Field(default="lahiri", description="Sidereal ayanamsa (lahiri, fagan_bradley, ...)")
+    harmonic: int = Field(default=1, ge=1, le=360, description="Harmonic number (1 = the chart itself)")
+
+
+class ChartVariantsRequest(BaseModel):
+    """Request model for several renderings of one natal chart"""
+    date_time: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    variants: List[ChartVariant] = Field(..., min_length=1, max_length=50)
+    aspects: bool = Field(default=True, description="Include each variant's aspects")
 
 
 class SolarReturnRequest(BaseModel):
@@ -56,6 +147,7 @@ class SolarReturnRequest(BaseModel):
     longitude: float = Field(..., ge=-180, le=180)
     year: int = Field(..., ge=1800, le=2400)
     house_system: str = "placidus"
+    formatting: str = FORMATTING_FIELD
 
 
 class ProgressedChartRequest(BaseModel):
@@ -65,129 +157,543 @@ class ProgressedChartRequest(BaseModel):
     longitude: float = Field(..., ge=-180, le=180)
     progressed_date_time: str
     house_system: str = "placidus"
+    formatting: str = FORMATTING_FIELD
+
+
+class ProgressedTimelineRequest(BaseModel):
+    """Request model for a secondary-progression timeline"""
+    natal_date_time: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    start_date_time: str = Field(..., description="First progression date")
+    end_date_time: str = Field(..., description="Last progression date (inclusive)")
+    step: str = Field(default="month", pattern="^(day|week|month|year)$")
+    interval: int = Field(default=1, ge=1, le=1000)
+    objects: Optional[List[str]] = Field(default=None, description="Object names to include (default: all)")
+    precision: int = Field(default=2, ge=0, le=6, description="Decimal places for longitudes")
+    house_system: str = "placidus"
+
+
+class ReturnsRequest(BaseModel):
+    """Request model for a range of solar or lunar returns"""
+    natal_date_time: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    body: str = Field(default="sun", pattern="^(sun|moon)$", description="sun (solar) or moon (lunar) returns")
+    start_year: Optional[int] = Field(default=None, ge=1800, le=2400, description="First year (default: current year)")
+    years: int = Field(default=1, ge=1, le=50, description="Number of years to cover")
+    include_charts: bool = Field(
+        default=False,
+        description=f"Build the full chart for each return (at most {chart_service.MAX_RETURN_CHARTS} returns)"
+    )
+    house_system: str = "placidus"
+
+
+class CompatibilitySubject(BaseModel):
+    """Birth data of one subject or candidate in a compatibility request"""
+    id: Optional[str] = Field(default=None, description="Caller's identifier, echoed in the results")
+    date_time: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+class CompatibilityRequest(BaseModel):
+    """Request model for ranking candidates against one or more subjects"""
+    subjects: List[CompatibilitySubject] = Field(..., min_length=1, max_length=1000)
+    candidates: List[CompatibilitySubject] = Field(..., min_length=1, max_length=100000)
+    top_k: int = Field(default=10, ge=1, le=1000, description="Matches returned per subject")
+
+
+class CompositePair(BaseModel):
+    """Two subjects of a bulk composite request"""
+    person1: CompatibilitySubject
+    person2: CompatibilitySubject
+
+
+class BulkCompositeRequest(BaseModel):
+    """Request model for compact composites of many pairs"""
+    pairs: List[CompositePair] = Field(..., min_length=1, max_length=10000)
+    house_system: str = "placidus"
+    aspects: bool = Field(default=True, description="Include composite aspects")
+
+
+class DashboardRequest(BaseModel):
+    """Request model for several charts of one subject"""
+    date_time: str = Field(..., description="Birth date/time in ISO format (YYYY-MM-DD HH:MM)")
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    house_system: str = "placidus"
+    charts: List[str] = Field(
+        default=["natal", "transit", "solar_return"],
+        min_length=1,
+        description="Chart types: natal, transit, solar_return, progressed"
+    )
+    transit_date_time: Optional[str] = Field(default=None, description="Default: now, local time at the location")
+    year: Optional[int] = Field(default=None, ge=1800, le=2400, description="Solar return year (default: current year)")
+    progressed_date_time: Optional[str] = Field(default=None, description="Default: the transit date/time")
+    formatting: str = FORMATTING_FIELD
+
+
+async def _calculate(http_request: Request, calculate, **params) -> dict:
+    """
+    Await an async ChartService calculation on behalf of a client
+
+    The calculation is cancelled when the client disconnects (499) or after
+    CHART_TIMEOUT seconds (504); a call still waiting for a worker is then
+    dropped instead of being run for nobody.
+    """
+    task = asyncio.ensure_future(calculate(timeout=CHART_TIMEOUT, **params))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Chart calculation exceeded {CHART_TIMEOUT:g} seconds")
+    finally:
+        task.cancel()
+
+
+def _chart_params(request: BaseModel, exclude: Tuple[str, ...] = ()) -> dict:
+    """
+    Calculation parameters of a stored chart
+
+    The default formatting is left out, so full charts keep the IDs and
+    URLs they had before raw charts existed; raw charts are stored apart.
+    """
+    params = request.model_dump(exclude=set(exclude))
+    if params.get("formatting") == "full":
+        del params["formatting"]
+    return params
+
+
+async def _stored_chart(http_request: Request, chart_type: str, params: dict, calculate) -> Response:
+    """
+    Serve a chart from the store, calculating and persisting it on a miss
+
+    `calculate` is a ChartService *_async method. A client already holding
+    the chart (If-None-Match) gets 304 before the store is even read.
+    """
+    cached = not_modified(http_request, chart_store.chart_id(chart_type, params))
+    if cached is not None:
+        return cached
+    chart_id, chart = await chart_store.get_or_calculate_async(
+        chart_type, params, lambda **kwargs: _calculate(http_request, calculate, **kwargs)
+    )
+    return json_response(http_request, {"success": True, "chart_id": chart_id, "chart": chart}, chart_id)
+
+
+def _canonical_query(chart_type: str, params: dict) -> str:
+    """Canonical query string of a chart: normalized values in a fixed order"""
+    normalized = canonical_input(chart_type, params, chart_store.COORDINATE_PRECISION)
+    return urlencode(
+        [(name, normalized[field]) for name, field in GET_PARAMETERS[chart_type] if field in normalized],
+        safe=":",
+    )
+
+
+async def _canonical_chart(
+    http_request: Request,
+    chart_type: str,
+    model: Type[BaseModel],
+    calculate,
+    exclude: Tuple[str, ...] = ()
+) -> Response:
+    """
+    Serve a chart by its canonical GET URL
+
+    Query parameters are validated against the POST request model. Any
+    other spelling of the same chart (unrounded coordinates, another date
+    format, missing defaults, other order or extra parameters) is
+    redirected to the canonical URL, so caches see one URL per chart.
+    """
+    query = http_request.query_params
+    fields = {field: query[name] for name, field in GET_PARAMETERS[chart_type] if name in query}
+    try:
+        params = _chart_params(model(**fields), exclude)
+        canonical = _canonical_query(chart_type, params)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if http_request.url.query != canonical:
+        return RedirectResponse(
+            f"{http_request.url.path}?{canonical}",
+            status_code=301,
+            headers={"Cache-Control": REDIRECT_CACHE_CONTROL},
+        )
+    try:
+        return await _stored_chart(http_request, chart_type, params, calculate)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/natal")
-async def calculate_natal_chart(request: NatalChartRequest):
+async def calculate_natal_chart(request: NatalChartRequest, http_request: Request):
     """
     Calculate a natal (birth) chart
     
     Returns complete chart data including planets, houses, aspects, and dignities.
+    With precision=preview, returns approximate positions, houses and major
+    aspects only; preview charts are cheap and are not persisted.
     """
     try:
-        chart = chart_service.calculate_natal(
-            date_time=request.date_time,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            house_system=request.house_system
+        if request.precision == "preview":
+            chart = await _calculate(http_request, chart_service.natal_async, **request.model_dump())
+            return json_response(http_request, {"success": True, "chart": chart})
+        return await _stored_chart(
+            http_request, "natal", _chart_params(request, exclude=("precision",)), chart_service.natal_async
         )
-        return {"success": True, "chart": chart}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/natal")
+async def get_natal_chart(http_request: Request):
+    """
+    Natal chart by canonical URL: /natal?dt=&lat=&lon=&hs=[&fmt=raw]
+
+    `dt` is an ISO date/time; other spellings redirect to the canonical URL.
+    """
+    return await _canonical_chart(
+        http_request, "natal", NatalChartRequest, chart_service.natal_async, exclude=("precision",)
+    )
+
+
 @router.post("/transit")
-async def calculate_transit_chart(request: TransitChartRequest):
+async def calculate_transit_chart(request: TransitChartRequest, http_request: Request):
     """
     Calculate transits to a natal chart
     
     Shows current planetary positions and their aspects to natal placements.
     """
     try:
-        chart = chart_service.calculate_transit(
-            natal_date_time=request.natal_date_time,
-            natal_latitude=request.natal_latitude,
-            natal_longitude=request.natal_longitude,
-            transit_date_time=request.transit_date_time,
-            house_system=request.house_system
-        )
-        return {"success": True, "chart": chart}
+        return await _stored_chart(http_request, "transit", _chart_params(request), chart_service.transit_async)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/transit")
+async def get_transit_chart(http_request: Request):
+    """Transit chart by canonical URL: /transit?dt=&lat=&lon=&tdt=&hs=[&fmt=raw]"""
+    return await _canonical_chart(http_request, "transit", TransitChartRequest, chart_service.transit_async)
+
+
 @router.post("/synastry")
-async def calculate_synastry_chart(request: SynastryChartRequest):
+async def calculate_synastry_chart(request: SynastryChartRequest, http_request: Request):
     """
     Calculate synastry between two people
     
     Shows both natal charts and inter-aspects.
     """
     try:
-        chart = chart_service.calculate_synastry(
-            person1_date_time=request.person1_date_time,
-            person1_latitude=request.person1_latitude,
-            person1_longitude=request.person1_longitude,
-            person2_date_time=request.person2_date_time,
-            person2_latitude=request.person2_latitude,
-            person2_longitude=request.person2_longitude,
-            house_system=request.house_system
-        )
-        return {"success": True, "chart": chart}
+        return await _stored_chart(http_request, "synastry", _chart_params(request), chart_service.synastry_async)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/synastry")
+async def get_synastry_chart(http_request: Request):
+    """Synastry chart by canonical URL: /synastry?dt1=&lat1=&lon1=&dt2=&lat2=&lon2=&hs=[&fmt=raw]"""
+    return await _canonical_chart(http_request, "synastry", SynastryChartRequest, chart_service.synastry_async)
+
+
 @router.post("/composite")
-async def calculate_composite_chart(request: CompositeChartRequest):
+async def calculate_composite_chart(request: CompositeChartRequest, http_request: Request):
     """
     Calculate composite chart (midpoint method)
     
-    Creates a single chart representing the relationship.
+    Creates a single chart representing the relationship. With compact=true,
+    the chart is derived from cached natal positions and is not persisted.
     """
     try:
-        chart = chart_service.calculate_composite(
-            person1_date_time=request.person1_date_time,
-            person1_latitude=request.person1_latitude,
-            person1_longitude=request.person1_longitude,
-            person2_date_time=request.person2_date_time,
-            person2_latitude=request.person2_latitude,
-            person2_longitude=request.person2_longitude,
-            house_system=request.house_system
+        if request.compact:
+            chart = await _calculate(http_request, chart_service.composite_async, **request.model_dump())
+            return json_response(http_request, {"success": True, "chart": chart})
+        return await _stored_chart(
+            http_request, "composite", _chart_params(request, exclude=("compact",)), chart_service.composite_async
         )
-        return {"success": True, "chart": chart}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/composite")
+async def get_composite_chart(http_request: Request):
+    """Composite chart by canonical URL: /composite?dt1=&lat1=&lon1=&dt2=&lat2=&lon2=&hs=[&fmt=raw]"""
+    return await _canonical_chart(
+        http_request, "composite", CompositeChartRequest, chart_service.composite_async, exclude=("compact",)
+    )
+
+
+@router.post("/composite/bulk")
+async def calculate_bulk_composites(request: BulkCompositeRequest, http_request: Request):
+    """
+    Compact composite charts for many pairs
+    
+    Each distinct subject's natal positions are computed (or taken from the
+    cache) once; midpoints for all pairs are evaluated together.
+    """
+    try:
+        pairs = [
+            (
+                (pair.person1.date_time, pair.person1.latitude, pair.person1.longitude),
+                (pair.person2.date_time, pair.person2.latitude, pair.person2.longitude),
+            )
+            for pair in request.pairs
+        ]
+        charts = await chart_service.composites_async(pairs, request.house_system, request.aspects)
+        return await json_response_async(http_request, {
+            "success": True,
+            "results": [
+                {"person1": pair.person1.id, "person2": pair.person2.id, "chart": chart}
+                for pair, chart in zip(request.pairs, charts)
+            ],
+        })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/variants")
+async def calculate_chart_variants(request: ChartVariantsRequest, http_request: Request):
+    """
+    Calculate several variants of a natal chart
+    
+    House systems, sidereal zodiacs and harmonic charts are all derived from
+    one set of ephemeris positions.
+    """
+    try:
+        return await _stored_chart(http_request, "variants", request.model_dump(), chart_service.variants_async)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/solar-return")
-async def calculate_solar_return(request: SolarReturnRequest):
+async def calculate_solar_return(request: SolarReturnRequest, http_request: Request):
     """
     Calculate solar return chart for a specific year
     
     Shows the chart for when the Sun returns to its natal position.
     """
     try:
-        chart = chart_service.calculate_solar_return(
-            natal_date_time=request.natal_date_time,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            year=request.year,
-            house_system=request.house_system
-        )
-        return {"success": True, "chart": chart}
+        return await _stored_chart(http_request, "solar_return", _chart_params(request), chart_service.solar_return_async)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/solar-return")
+async def get_solar_return(http_request: Request):
+    """Solar return by canonical URL: /solar-return?dt=&lat=&lon=&year=&hs=[&fmt=raw]"""
+    return await _canonical_chart(
+        http_request, "solar_return", SolarReturnRequest, chart_service.solar_return_async
+    )
+
+
 @router.post("/progressed")
-async def calculate_progressed_chart(request: ProgressedChartRequest):
+async def calculate_progressed_chart(request: ProgressedChartRequest, http_request: Request):
     """
     Calculate secondary progressions
     
     Shows the symbolic progression of the natal chart.
     """
     try:
-        chart = chart_service.calculate_progressed(
-            natal_date_time=request.natal_date_time,
-            latitude=request.latitude,
-            longitude=request.longitude,
-            progressed_date_time=request.progressed_date_time,
-            house_system=request.house_system
+        return await _stored_chart(http_request, "progressed", _chart_params(request), chart_service.progressed_async)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/progressed")
+async def get_progressed_chart(http_request: Request):
+    """Progressed chart by canonical URL: /progressed?dt=&lat=&lon=&pdt=&hs=[&fmt=raw]"""
+    return await _canonical_chart(
+        http_request, "progressed", ProgressedChartRequest, chart_service.progressed_async
+    )
+
+
+def _local_now(latitude: float, longitude: float) -> str:
+    """Current local time at a location, to the minute"""
+    zone = geo_resolver.timezone_at(latitude, longitude)
+    now = datetime.now(ZoneInfo(zone)) if zone else datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%d %H:%M")
+
+
+@router.post("/dashboard")
+async def calculate_dashboard(request: DashboardRequest, http_request: Request):
+    """
+    Several charts of one subject in one response
+
+    The natal chart is calculated once and shared with the transit chart;
+    the other charts are built concurrently in the worker pool, and charts
+    already in the store are not recalculated. Each chart is returned with
+    its chart_id; transit charts omit `natal_chart` when the natal chart is
+    part of the response.
+    """
+    unknown = [chart_type for chart_type in request.charts if chart_type not in DASHBOARD_CHARTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported chart types: {', '.join(unknown)}")
+    requested = list(dict.fromkeys(request.charts))
+
+    try:
+        transit_date_time = request.transit_date_time or _local_now(request.latitude, request.longitude)
+        # Left out when "full", as in _chart_params
+        formatting = {"formatting": request.formatting} if request.formatting != "full" else {}
+        subject = {
+            "latitude": request.latitude, "longitude": request.longitude, "house_system": request.house_system,
+            **formatting,
+        }
+        params = {
+            "natal": {"date_time": request.date_time, **subject},
+            "transit": {
+                "natal_date_time": request.date_time,
+                "natal_latitude": request.latitude,
+                "natal_longitude": request.longitude,
+                "transit_date_time": transit_date_time,
+                "house_system": request.house_system,
+                **formatting,
+            },
+            "solar_return": {
+                "natal_date_time": request.date_time, "year": request.year or datetime.now().year, **subject,
+            },
+            "progressed": {
+                "natal_date_time": request.date_time,
+                "progressed_date_time": request.progressed_date_time or transit_date_time,
+                **subject,
+            },
+        }
+        chart_ids = {chart_type: chart_store.chart_id(chart_type, params[chart_type]) for chart_type in requested}
+        charts = {chart_type: chart_store.get(chart_id) for chart_type, chart_id in chart_ids.items()}
+        missing = {chart_type for chart_type, chart in charts.items() if chart is None}
+
+        calculations = {}
+        if "transit" in missing:
+            calculations["natal_with_transit"] = (chart_service.natal_with_transit_async, {
+                "date_time": request.date_time, "transit_date_time": transit_date_time, **subject,
+            })
+        elif "natal" in missing:
+            calculations["natal"] = (chart_service.natal_async, params["natal"])
+        if "solar_return" in missing:
+            calculations["solar_return"] = (chart_service.solar_return_async, params["solar_return"])
+        if "progressed" in missing:
+            calculations["progressed"] = (chart_service.progressed_async, params["progressed"])
+
+        tasks = {
+            name: asyncio.ensure_future(_calculate(http_request, calculate, **kwargs))
+            for name, (calculate, kwargs) in calculations.items()
+        }
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        for name, task in tasks.items():
+            calculated = task.result() if name == "natal_with_transit" else {name: task.result()}
+            for chart_type, chart in calculated.items():
+                chart_store.save(chart_type, params[chart_type], chart)
+                if chart_type in charts:
+                    charts[chart_type] = chart
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results = {}
+    for chart_type in requested:
+        chart = charts[chart_type]
+        if chart_type == "transit" and "natal" in charts:
+            chart = {key: value for key, value in chart.items() if key != "natal_chart"}
+        results[chart_type] = {"chart_id": chart_ids[chart_type], "chart": chart}
+    return json_response(http_request, {"success": True, "charts": results})
+
+
+@router.post("/progressed/timeline")
+async def calculate_progressed_timeline(request: ProgressedTimelineRequest):
+    """
+    Stream secondary progressions over a date range as NDJSON
+    
+    The first line is a header listing the objects; each following line is
+    one step with only the fields that changed plus ingress/station events.
+    """
+    try:
+        timeline = await chart_service.progressed_timeline_async(**request.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(chart_service.timeline_lines(timeline), media_type="application/x-ndjson")
+
+
+@router.post("/returns")
+async def calculate_returns(request: ReturnsRequest, http_request: Request):
+    """
+    Calculate all solar or lunar returns in a range of years
+    
+    Finds every exact return moment in one batched search, sharing a single
+    natal computation. With include_charts, the return charts are built in
+    parallel in the worker pool.
+    """
+    try:
+        params = request.model_dump()
+        # Stored under the year actually searched, not "the current year"
+        params["start_year"] = params["start_year"] or datetime.now().year
+        return await _stored_chart(http_request, "returns", params, chart_service.returns_async)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/compatibility")
+async def rank_compatibility(request: CompatibilityRequest, http_request: Request):
+    """
+    Rank candidates by synastry compatibility with each subject
+    
+    Scores cross-aspects between cached natal positions in batches and
+    returns only the top-K candidates per subject with their scores.
+    """
+    try:
+        ranked = await _calculate(
+            http_request,
+            compatibility_service.top_matches_async,
+            subjects=[(s.date_time, s.latitude, s.longitude) for s in request.subjects],
+            candidates=[(c.date_time, c.latitude, c.longitude) for c in request.candidates],
+            top_k=request.top_k,
         )
-        return {"success": True, "chart": chart}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    def label(items, index):
+        return items[index].id if items[index].id is not None else index
+    
+    return json_response(http_request, {
+        "success": True,
+        "results": [
+            {
+                "subject": label(request.subjects, row),
+                "matches": [
+                    {"candidate": label(request.candidates, index), "score": round(score, 3)}
+                    for index, score in matches
+                ],
+            }
+            for row, matches in enumerate(ranked)
+        ],
+    })
 
 
 @router.get("/house-systems")
@@ -204,3 +710,84 @@ async def get_house_systems():
             {"id": "porphyry", "name": "Porphyry", "description": "Simple trisection method"},
         ]
     }
+
+
+# How long a request for "now" waits for the first calculation after startup
+SKY_NOW_READY_TIMEOUT = 30.0
+
+
+@router.get("/now")
+async def get_sky_now(http_request: Request, location: Optional[str] = None):
+    """
+    Current-sky chart of a configured location
+
+    Charts are recalculated in the background every SKY_NOW_INTERVAL
+    seconds and cached until then. Without `location`, lists the locations.
+    """
+    if not await sky_now.wait_ready(SKY_NOW_READY_TIMEOUT):
+        raise HTTPException(status_code=503, detail="Current-sky charts are not available yet")
+    if location is None:
+        content = {"success": True, **sky_now.stats()}
+        del content["errors"], content["memory"]
+        response = json_response(http_request, content)
+    else:
+        if location not in sky_now.locations:
+            raise HTTPException(status_code=404, detail=f"Unknown location: {location}")
+        encoded = sky_now.encoded(location)
+        if encoded is None:
+            raise HTTPException(status_code=503, detail=f"No current-sky chart for {location} yet")
+        response = encoded_json_response(http_request, encoded.encode("utf-8"))
+    response.headers["Cache-Control"] = f"public, max-age={sky_now.seconds_until_update()}"
+    return response
+
+
+@router.get("/now/events")
+async def subscribe_sky_now(location: str):
+    """Server-Sent Events with the current-sky chart of a location, again after each recalculation"""
+    if location not in sky_now.locations:
+        raise HTTPException(status_code=404, detail=f"Unknown location: {location}")
+
+    async def generate():
+        version, sent = 0, None
+        while True:
+            version = await sky_now.wait_for_update(version, HEARTBEAT_INTERVAL)
+            data = sky_now.encoded(location)
+            if data is not None and data is not sent:
+                yield encode_event(data, event="chart", event_id=str(version))
+                sent = data
+
+    return EventSourceResponse(generate(), ping=HEARTBEAT_INTERVAL)
+
+
+@router.get("/by-subject")
+async def list_stored_charts(
+    date_time: str,
+    latitude: float,
+    longitude: float,
+    house_system: Optional[str] = None,
+    chart_type: Optional[str] = None
+):
+    """List stored charts for a subject's birth data"""
+    try:
+        charts = chart_store.find_by_subject(date_time, latitude, longitude, house_system, chart_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"charts": charts}
+
+
+@router.get("/{chart_id}")
+async def get_stored_chart(chart_id: str, http_request: Request):
+    """
+    Fetch a previously calculated chart by ID
+
+    Served directly from the chart store without recalculation. Charts
+    never change, so responses are cacheable indefinitely and revalidated
+    by ETag.
+    """
+    cached = not_modified(http_request, chart_id)
+    if cached is not None:
+        return cached
+    chart = chart_store.get(chart_id)
+    if chart is None:
+        raise HTTPException(status_code=404, detail="Chart not found")
+    return json_response(http_request, {"success": True, "chart_id": chart_id, "chart": chart}, chart_id)
@@ -1,12 +1,17 @@
 """
 Interpretation Router - AI-powered chart interpretation
 """
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-from services.ai_service import ai_service
+from sse_starlette.sse import EventSourceResponse
+from typing import Optional, Dict, Any, List
+from routers.charts import _calculate
+from services.ai_service import FOCUS_AREAS, ai_service
 from services.chart_service import chart_service
+from services.fragments import fragment_library
+from services.streaming import (
+    HEARTBEAT_INTERVAL, BufferedStream, StreamExpired, encode_event, parse_event_id, stream_registry
+)
 
 
 router = APIRouter()
@@ -34,10 +39,55 @@ class InterpretationRequest(BaseModel):
         default=False,
         description="Whether to stream the response"
     )
+    report: bool = Field(
+        default=False,
+        description="Full report: one section per focus area, generated concurrently"
+    )
+    focus_areas: Optional[List[str]] = Field(
+        default=None,
+        description="Focus area IDs to include in a report (default: all)"
+    )
+    assemble: bool = Field(
+        default=False,
+        description="Compose the reading from stored placement fragments; only the synthesis is generated"
+    )
+    synthesis: bool = Field(
+        default=True,
+        description="Whether an assembled reading ends with a generated synthesis paragraph"
+    )
+
+
+def _event_response(stream: BufferedStream, after: int = 0) -> EventSourceResponse:
+    """SSE response replaying a buffered stream's events after `after`, then following it"""
+    async def generate():
+        try:
+            async for seq, text in stream.events(after):
+                frame = encode_event(text, event_id=stream.event_id(seq))
+                stream.metrics.record_event(len(frame))
+                yield frame
+        except StreamExpired:
+            yield encode_event("Stream events are no longer buffered", event="error")
+            return
+        if stream.metrics.status == "completed":
+            yield encode_event("[DONE]", event_id=stream.event_id(stream.last_seq))
+        elif stream.metrics.error:
+            yield encode_event(f"Stream error: {stream.metrics.error}", event="error")
+        else:
+            yield encode_event(f"Stream {stream.metrics.status}", event="error")
+    
+    return EventSourceResponse(
+        generate(),
+        ping=HEARTBEAT_INTERVAL,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Stream-Id": stream.stream_id,
+        }
+    )
 
 
 @router.post("/interpret")
-async def interpret_chart(request: InterpretationRequest):
+async def interpret_chart(request: InterpretationRequest, http_request: Request):
     """
     Generate AI interpretation for an astrological chart
     
@@ -48,12 +98,17 @@ async def interpret_chart(request: InterpretationRequest):
     
     if not chart_data and request.birth_data:
         try:
-            chart_data = chart_service.calculate_natal(
+            # In the worker pool, with the chart deadline and disconnect handling
+            chart_data = await _calculate(
+                http_request,
+                chart_service.natal_async,
                 date_time=request.birth_data.get("date_time"),
                 latitude=request.birth_data.get("latitude"),
                 longitude=request.birth_data.get("longitude"),
                 house_system=request.birth_data.get("house_system", "placidus")
             )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Chart calculation error: {str(e)}")
     
@@ -63,25 +118,81 @@ async def interpret_chart(request: InterpretationRequest):
             detail="Either chart_data or birth_data must be provided"
         )
     
+    if request.report:
+        try:
+            ai_service.focus_areas(request.focus_areas)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     # Stream or regular response
-    if request.stream:
-        async def generate():
-            async for chunk in ai_service.interpret_chart_stream(
+    if request.stream and request.assemble:
+        stream = stream_registry.start(
+            "assembled",
+            lambda metrics: ai_service.interpret_assembled_stream(
+                chart_data=chart_data,
+                language=request.language,
+                synthesis=request.synthesis
+            )
+        )
+        return _event_response(stream)
+    elif request.stream and request.report:
+        # Sections are sent whole, in the order they finish
+        stream = stream_registry.start(
+            "report",
+            lambda metrics: ai_service.interpret_report_stream(
+                chart_data=chart_data,
+                focus_areas=request.focus_areas,
+                language=request.language
+            )
+        )
+        return _event_response(stream)
+    elif request.stream:
+        # Generation runs in the background and is buffered under a stream
+        # ID; this connection is only one reader of it
+        stream = stream_registry.start(
+            "interpret",
+            lambda metrics: ai_service.interpret_chart_stream(
                 chart_data=chart_data,
                 focus=request.focus,
+                language=request.language,
+                metrics=metrics
+            )
+        )
+        return _event_response(stream)
+    elif request.assemble:
+        try:
+            reading = await ai_service.interpret_assembled(
+                chart_data=chart_data,
+                language=request.language,
+                synthesis=request.synthesis
+            )
+            return {
+                "success": True,
+                **reading,
+                "chart_summary": {
+                    "type": chart_data.get("chart_type", "natal"),
+                    "input": chart_data.get("input", {})
+                }
+            }
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    elif request.report:
+        try:
+            report = await ai_service.interpret_report(
+                chart_data=chart_data,
+                focus_areas=request.focus_areas,
                 language=request.language
-            ):
-                yield f"data: {chunk}\n\n"
-            yield "data: [DONE]\n\n"
-        
-        return StreamingResponse(
-            generate(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
+            )
+            return {
+                "success": True,
+                **report,
+                "chart_summary": {
+                    "type": chart_data.get("chart_type", "natal"),
+                    "input": chart_data.get("input", {})
+                }
             }
-        )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
     else:
         try:
             interpretation = await ai_service.interpret_chart(
@@ -101,18 +212,48 @@ async def interpret_chart(request: InterpretationRequest):
             raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/interpret/streams")
+async def get_stream_metrics():
+    """Metrics of active and recently finished interpretation streams"""
+    return stream_registry.snapshot()
+
+
+@router.get("/interpret/fragments")
+async def get_fragment_stats():
+    """Number of stored interpretation fragments per language"""
+    return fragment_library.stats()
+
+
+@router.get("/interpret/streams/{stream_id}")
+async def resume_interpretation_stream(
+    stream_id: str,
+    last_event_id: Optional[str] = Header(default=None),
+    after: Optional[int] = Query(default=None, ge=0, description="Resume after this event number")
+):
+    """
+    Reconnect to an interpretation stream
+    
+    Replays the events after the one named by the Last-Event-ID header (or
+    `after`), then continues live until the generation finishes.
+    """
+    stream = stream_registry.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+    if after is None:
+        event_stream, after = parse_event_id(last_event_id)
+        if event_stream not in (None, stream_id):
+            raise HTTPException(status_code=400, detail="Last-Event-ID belongs to another stream")
+    if not stream.can_resume(after):
+        raise HTTPException(status_code=410, detail="Stream events are no longer buffered")
+    return _event_response(stream, after)
+
+
 @router.get("/focus-areas")
 async def get_focus_areas():
     """Get list of available focus areas for interpretation"""
     return {
         "focus_areas": [
-            {"id": "personality", "name": "Personality & Core Self", "description": "Sun, Moon, Ascendant analysis"},
-            {"id": "career", "name": "Career & Life Purpose", "description": "10th house, MC, Saturn focus"},
-            {"id": "relationships", "name": "Relationships & Love", "description": "Venus, 7th house, synastry"},
-            {"id": "communication", "name": "Communication & Learning", "description": "Mercury, 3rd house focus"},
-            {"id": "home", "name": "Home & Family", "description": "Moon, 4th house, IC focus"},
-            {"id": "creativity", "name": "Creativity & Self-Expression", "description": "5th house, Sun, Leo placements"},
-            {"id": "spirituality", "name": "Spirituality & Higher Purpose", "description": "12th house, Neptune, Jupiter"},
-            {"id": "challenges", "name": "Challenges & Growth", "description": "Saturn, Pluto, difficult aspects"},
+            {"id": area["id"], "name": area["name"], "description": area["description"]}
+            for area in FOCUS_AREAS
         ]
     }
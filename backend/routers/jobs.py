@@ -0,0 +1,203 @@
+"""
+Jobs Router - background interpretation and bulk chart jobs
+"""
+import asyncio
+import json
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from sse_starlette.sse import EventSourceResponse
+from typing import Optional, Dict, Any, List
+from services.ai_service import ai_service
+from services.chart_service import chart_service
+from services.chart_store import chart_store
+from services.jobs import (
+    PRIORITIES, TERMINAL_STATUSES, RetryableJobError, RetryPolicy, job_queue, job_summary
+)
+from services.streaming import HEARTBEAT_INTERVAL, encode_event
+from services.workers import CHART_WORKERS
+
+
+router = APIRouter()
+
+CHART_TYPES = ("natal", "transit", "synastry", "composite", "solar_return", "progressed")
+
+PRIORITY_PATTERN = "^(" + "|".join(PRIORITIES) + ")$"
+
+# Charts of one batch job in flight at once: enough to keep every worker
+# busy while the next chart's store lookup runs
+BATCH_CONCURRENCY = 2 * max(1, CHART_WORKERS)
+
+
+class InterpretationJobRequest(BaseModel):
+    """Request model for a background interpretation"""
+    chart_data: Optional[Dict[str, Any]] = Field(default=None, description="Pre-calculated chart data")
+    birth_data: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Birth data to calculate a natal chart: {date_time, latitude, longitude, house_system}"
+    )
+    focus: Optional[str] = None
+    language: str = "en"
+    priority: str = Field(default="normal", pattern=PRIORITY_PATTERN)
+
+
+class ChartJobRequest(BaseModel):
+    """Request model for a background batch of charts"""
+    charts: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        description="Each item: chart_type plus the fields of the matching /api/charts request"
+    )
+    priority: str = Field(default="normal", pattern=PRIORITY_PATTERN)
+
+
+async def run_interpretation(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: calculate the chart if needed, then interpret it"""
+    chart_data = params.get("chart_data")
+    if not chart_data:
+        birth_data = params["birth_data"]
+        chart_data = await chart_service.natal_async(
+            date_time=birth_data.get("date_time"),
+            latitude=birth_data.get("latitude"),
+            longitude=birth_data.get("longitude"),
+            house_system=birth_data.get("house_system", "placidus"),
+        )
+    interpretation = await ai_service.interpret_chart(
+        chart_data=chart_data,
+        focus=params.get("focus"),
+        language=params.get("language", "en")
+    )
+    # AIService reports failures as text; only unavailable models are worth
+    # another attempt, a missing API key fails the job at once
+    if interpretation.startswith(ai_service.UNAVAILABLE):
+        raise RetryableJobError(interpretation)
+    if interpretation.startswith("Error:"):
+        raise RuntimeError(interpretation)
+    return {
+        "interpretation": interpretation,
+        "chart_summary": {
+            "type": chart_data.get("chart_type", "natal"),
+            "input": chart_data.get("input", {})
+        }
+    }
+
+
+async def run_chart_batch(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Job handler: calculate and store a batch of charts in the worker pool
+
+    At most BATCH_CONCURRENCY charts are in flight at once, however large
+    the batch.
+    """
+    async def build(item: Dict[str, Any]) -> str:
+        kwargs = dict(item)
+        chart_type = kwargs.pop("chart_type", "natal")
+        chart_id = chart_store.chart_id(chart_type, kwargs)
+        if chart_store.get(chart_id) is None:
+            chart = await getattr(chart_service, f"{chart_type}_async")(**kwargs)
+            chart_store.save(chart_type, kwargs, chart)
+        return chart_id
+
+    items = iter(enumerate(params["charts"]))
+    results: List[Any] = [None] * len(params["charts"])
+
+    async def consume() -> None:
+        # Consumers share one iterator, so each item is built exactly once
+        for index, item in items:
+            try:
+                results[index] = await build(item)
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*(consume() for _ in range(BATCH_CONCURRENCY)))
+    for result in results:
+        if isinstance(result, BrokenProcessPool):
+            raise result
+    return {
+        "chart_ids": [None if isinstance(result, Exception) else result for result in results],
+        "errors": {
+            str(index): str(result) for index, result in enumerate(results) if isinstance(result, Exception)
+        },
+    }
+
+
+job_queue.register("interpret", "llm", run_interpretation)
+job_queue.register("charts", "cpu", run_chart_batch, RetryPolicy(retry_on=(BrokenProcessPool,)))
+
+
+@router.post("/interpret", status_code=202)
+async def submit_interpretation(request: InterpretationJobRequest):
+    """
+    Queue an interpretation
+
+    Returns a job ID right away; poll GET /api/jobs/{job_id} or subscribe to
+    GET /api/jobs/{job_id}/events for the result.
+    """
+    if not request.chart_data and not request.birth_data:
+        raise HTTPException(status_code=400, detail="Either chart_data or birth_data must be provided")
+    params = request.model_dump(exclude={"priority"})
+    return {"success": True, "job_id": job_queue.submit("interpret", params, request.priority)}
+
+
+@router.post("/charts", status_code=202)
+async def submit_chart_batch(request: ChartJobRequest):
+    """
+    Queue a batch of chart calculations
+
+    Charts are stored as they are calculated; the job result lists their
+    chart IDs (null where a chart failed, with the error under `errors`).
+    """
+    for index, item in enumerate(request.charts):
+        if item.get("chart_type", "natal") not in CHART_TYPES:
+            raise HTTPException(status_code=400, detail=f"charts[{index}]: unknown chart_type")
+    return {"success": True, "job_id": job_queue.submit("charts", request.model_dump(exclude={"priority"}), request.priority)}
+
+
+@router.get("")
+async def get_job_stats():
+    """Lane concurrency and job counts by status"""
+    return job_queue.stats()
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=60, description="Seconds to wait for the job to finish")
+):
+    """Job status, and its result once it has succeeded"""
+    job = await job_queue.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
+
+@router.get("/{job_id}/events")
+async def subscribe_job(job_id: str):
+    """Server-Sent Events with each status change of a job, ending with its final state"""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def generate():
+        current, sent = job, None
+        while current is not None:
+            state = (current["status"], current["attempts"])
+            if state != sent:
+                yield encode_event(json.dumps(job_summary(current)), event="status")
+                sent = state
+            if current["status"] in TERMINAL_STATUSES:
+                return
+            current = await job_queue.wait(job_id, HEARTBEAT_INTERVAL, since=sent)
+
+    return EventSourceResponse(generate(), ping=HEARTBEAT_INTERVAL)
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job that has not started yet"""
+    if job_queue.cancel(job_id):
+        return {"success": True}
+    if job_queue.store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    raise HTTPException(status_code=409, detail="Job has already started or finished")
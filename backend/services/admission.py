@@ -0,0 +1,296 @@
+"""
+Admission Control
+Per-client token buckets and per-class concurrency caps checked before a
+request reaches the routers, so excess load is turned away with 429 and
+Retry-After instead of queueing on the chart workers or the OpenRouter budget
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+
+ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+
+# Take the client address from X-Forwarded-For (only behind a trusted proxy)
+TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "false").lower() == "true"
+
+# Buckets are shared through this SQLite file when set (e.g. between
+# uvicorn workers on one host); otherwise they live in process memory
+STORE_PATH = os.getenv("ADMISSION_STORE_PATH", "")
+
+# Clients tracked by the in-memory store (least recently seen are dropped)
+MAX_CLIENTS = 100_000
+
+
+class EndpointClass(NamedTuple):
+    """Budget of one group of endpoints"""
+    rate: float          # tokens refilled per second, per client
+    burst: float         # bucket capacity, per client
+    max_concurrent: int  # requests in flight across all clients
+
+
+def _env_class(name: str, rate: float, burst: float, max_concurrent: int) -> EndpointClass:
+    """Endpoint class with ADMISSION_<NAME>_RATE/_BURST/_CONCURRENCY overrides"""
+    prefix = f"ADMISSION_{name.upper()}"
+    return EndpointClass(
+        rate=float(os.getenv(f"{prefix}_RATE", str(rate))),
+        burst=float(os.getenv(f"{prefix}_BURST", str(burst))),
+        max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", str(max_concurrent))),
+    )
+
+
+ENDPOINT_CLASSES: Dict[str, EndpointClass] = {
+    "charts": _env_class("charts", rate=5.0, burst=30.0, max_concurrent=32),
+    "interpret": _env_class("interpret", rate=0.2, burst=5.0, max_concurrent=16),
+}
+
+
+class Rule(NamedTuple):
+    """Cost of the requests matching a method and path prefix"""
+    method: str
+    path: str
+    endpoint_class: str
+    cost: float
+
+
+# First match wins, so longer paths come before their prefixes. Costs are
+# in natal-chart units: a synastry builds two charts and cross-aspects them
+RULES: List[Rule] = [
+    Rule("POST", "/api/charts/natal", "charts", 1),
+    Rule("POST", "/api/charts/transit", "charts", 2),
+    Rule("POST", "/api/charts/synastry", "charts", 3),
+    Rule("POST", "/api/charts/composite/bulk", "charts", 10),
+    Rule("POST", "/api/charts/composite", "charts", 3),
+    Rule("POST", "/api/charts/variants", "charts", 2),
+    Rule("POST", "/api/charts/solar-return", "charts", 2),
+    Rule("POST", "/api/charts/progressed/timeline", "charts", 5),
+    Rule("POST", "/api/charts/progressed", "charts", 2),
+    Rule("POST", "/api/charts/returns", "charts", 5),
+    Rule("POST", "/api/charts/compatibility", "charts", 10),
+    Rule("POST", "/api/charts/dashboard", "charts", 5),
+    Rule("POST", "/api/jobs/charts", "charts", 10),
+    # Canonical GET chart URLs (see routers/charts.py); their 304s and
+    # redirects are cheap, but a cache miss calculates like the POST
+    Rule("GET", "/api/charts/natal", "charts", 1),
+    Rule("GET", "/api/charts/transit", "charts", 2),
+    Rule("GET", "/api/charts/synastry", "charts", 3),
+    Rule("GET", "/api/charts/composite", "charts", 3),
+    Rule("GET", "/api/charts/solar-return", "charts", 2),
+    Rule("GET", "/api/charts/progressed", "charts", 2),
+    Rule("POST", "/api/interpret", "interpret", 1),
+    Rule("POST", "/api/jobs/interpret", "interpret", 1),
+]
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory"""
+
+    def __init__(self, max_clients: int = MAX_CLIENTS):
+        """Initialize an empty store"""
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, bucket: EndpointClass) -> float:
+        """Spend `cost` tokens; returns 0 when admitted, else seconds until it would be"""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (bucket.burst, now))
+            tokens = min(bucket.burst, tokens + (now - updated) * bucket.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / bucket.rate if bucket.rate > 0 else math.inf
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def size(self) -> int:
+        """Number of tracked buckets"""
+        with self._lock:
+            return len(self._buckets)
+
+
+class SqliteBucketStore:
+    """Token buckets in a local SQLite file shared by processes on one host"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+    """
+
+    # Buckets idle this long are full again and can be deleted
+    IDLE_TTL = 3600.0
+
+    def __init__(self, path: str):
+        """Initialize bucket store (the database is opened lazily)"""
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def take(self, key: str, cost: float, bucket: EndpointClass) -> float:
+        """Spend `cost` tokens; returns 0 when admitted, else seconds until it would be"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (bucket.burst, now)
+                tokens = min(bucket.burst, tokens + max(0.0, now - updated) * bucket.rate)
+                wait = 0.0
+                if tokens >= cost:
+                    tokens -= cost
+                else:
+                    wait = (cost - tokens) / bucket.rate if bucket.rate > 0 else math.inf
+                conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (key, tokens, now))
+                self._takes += 1
+                if self._takes % 10_000 == 0:
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.IDLE_TTL,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def size(self) -> int:
+        """Number of tracked buckets"""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+class AdmissionController:
+    """Classifies requests and admits or rejects them"""
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, EndpointClass]] = None,
+        rules: Optional[List[Rule]] = None,
+        store=None
+    ):
+        """Initialize controller"""
+        self.classes = dict(classes or ENDPOINT_CLASSES)
+        self.rules = list(rules or RULES)
+        self.store = store or (SqliteBucketStore(STORE_PATH) if STORE_PATH else MemoryBucketStore())
+        self.in_flight: Dict[str, int] = {name: 0 for name in self.classes}
+        self.counts: Dict[str, int] = {"admitted": 0, "rate_limited": 0, "over_capacity": 0}
+
+    def classify(self, method: str, path: str) -> Optional[Rule]:
+        """The rule a request falls under, or None for unmetered requests"""
+        for rule in self.rules:
+            if method == rule.method and (path == rule.path or path.startswith(rule.path + "/")):
+                return rule
+        return None
+
+    def admit(self, client: str, rule: Rule) -> Tuple[bool, float, str]:
+        """
+        Reserve a concurrency slot and spend the client's tokens
+
+        Returns (admitted, retry_after seconds, reason). An admitted request
+        must be followed by release().
+        """
+        endpoint_class = self.classes[rule.endpoint_class]
+        if self.in_flight[rule.endpoint_class] >= endpoint_class.max_concurrent:
+            self.counts["over_capacity"] += 1
+            return False, 1.0, f"Too many concurrent {rule.endpoint_class} requests"
+        wait = self.store.take(f"{rule.endpoint_class}:{client}", min(rule.cost, endpoint_class.burst), endpoint_class)
+        if wait > 0:
+            self.counts["rate_limited"] += 1
+            return False, wait, f"Rate limit exceeded for {rule.endpoint_class} requests"
+        self.in_flight[rule.endpoint_class] += 1
+        self.counts["admitted"] += 1
+        return True, 0.0, ""
+
+    def release(self, rule: Rule) -> None:
+        """Free the concurrency slot of a finished request"""
+        self.in_flight[rule.endpoint_class] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits, requests in flight and admission outcomes"""
+        return {
+            "enabled": ENABLED,
+            "store": "sqlite" if isinstance(self.store, SqliteBucketStore) else "memory",
+            "clients": self.store.size(),
+            "classes": {
+                name: {**endpoint_class._asdict(), "in_flight": self.in_flight[name]}
+                for name, endpoint_class in self.classes.items()
+            },
+            "counts": dict(self.counts),
+        }
+
+
+def client_id(scope: Dict[str, Any], trust_proxy: bool = TRUST_PROXY) -> str:
+    """Client address of an ASGI request"""
+    if trust_proxy:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware rejecting requests before any routing or body parsing"""
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        """Wrap an ASGI app"""
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        """Admit, reject or pass through one request"""
+        rule = self.controller.classify(scope.get("method", ""), scope.get("path", "")) \
+            if ENABLED and scope["type"] == "http" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        admitted, retry_after, reason = self.controller.admit(client_id(scope), rule)
+        if not admitted:
+            body = json.dumps({"detail": reason}).encode()
+            retry = str(max(1, math.ceil(min(retry_after, 86400.0))))
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Streaming responses hold their slot until the body is complete
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(rule)
+
+
+# Singleton instance
+admission_controller = AdmissionController()
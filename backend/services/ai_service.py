@@ -3,9 +3,53 @@ AI Interpretation Service using OpenRouter API
 Provides grounded astrology interpretations based on chart data
 """
 import os
+import json
 import asyncio
 import httpx
 from typing import Dict, Any, AsyncGenerator, Optional, List
+from services.fragments import fragment_library
+from services.serialization import angle_text
+from services.streaming import StreamMetrics
+
+
+# Upstream requests in flight at once, shared by all interpretations
+MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "4"))
+
+# Token cap of one report section (a single reading allows 2000)
+SECTION_MAX_TOKENS = int(os.getenv("OPENROUTER_SECTION_MAX_TOKENS", "800"))
+
+# Placements per fragment-generation request, and the token caps of that
+# request and of the synthesis paragraph
+FRAGMENT_BATCH_SIZE = 12
+FRAGMENT_MAX_TOKENS = 1800
+SYNTHESIS_MAX_TOKENS = 400
+
+# Headings of assembled readings
+ASSEMBLY_HEADINGS: Dict[str, Dict[str, str]] = {
+    "en": {"objects": "Placements", "aspects": "Aspects", "synthesis": "Synthesis"},
+    "es": {"objects": "Posiciones", "aspects": "Aspectos", "synthesis": "Síntesis"},
+    "no": {"objects": "Plasseringer", "aspects": "Aspekter", "synthesis": "Syntese"},
+}
+
+# Focus areas, with the placements each report section is given
+FOCUS_AREAS: List[Dict[str, Any]] = [
+    {"id": "personality", "name": "Personality & Core Self", "description": "Sun, Moon, Ascendant analysis",
+     "objects": ["Sun", "Moon", "Asc"], "houses": [1]},
+    {"id": "career", "name": "Career & Life Purpose", "description": "10th house, MC, Saturn focus",
+     "objects": ["MC", "Saturn", "Jupiter", "Sun"], "houses": [2, 6, 10]},
+    {"id": "relationships", "name": "Relationships & Love", "description": "Venus, 7th house, synastry",
+     "objects": ["Venus", "Mars", "Desc", "Juno"], "houses": [5, 7]},
+    {"id": "communication", "name": "Communication & Learning", "description": "Mercury, 3rd house focus",
+     "objects": ["Mercury"], "houses": [3, 9]},
+    {"id": "home", "name": "Home & Family", "description": "Moon, 4th house, IC focus",
+     "objects": ["Moon", "IC"], "houses": [4]},
+    {"id": "creativity", "name": "Creativity & Self-Expression", "description": "5th house, Sun, Leo placements",
+     "objects": ["Sun", "Venus"], "houses": [5]},
+    {"id": "spirituality", "name": "Spirituality & Higher Purpose", "description": "12th house, Neptune, Jupiter",
+     "objects": ["Neptune", "Jupiter", "True North Node", "True South Node"], "houses": [9, 12]},
+    {"id": "challenges", "name": "Challenges & Growth", "description": "Saturn, Pluto, difficult aspects",
+     "objects": ["Saturn", "Pluto", "Chiron", "Mars"], "houses": [8, 12]},
+]
 
 
 class AIService:
@@ -19,6 +63,11 @@ class AIService:
     MAX_RETRIES = 2
     RETRY_BASE_DELAY = 2.0  # seconds
     
+    # Failures reported as text: a missing key lasts until the deployment is
+    # fixed, unavailable models (rate limits, timeouts) recover on their own
+    NOT_CONFIGURED = "Error: OpenRouter API key not configured. Please set OPENROUTER_API_KEY."
+    UNAVAILABLE = "Error: All AI models are currently rate-limited. Please try again in a minute."
+    
     # System prompt for grounded astrology interpretation
     SYSTEM_PROMPT = """You are ASTRAEA, a professional astrology interpreter. Your role is to provide insightful, grounded interpretations of astrological charts.
 
@@ -41,10 +90,17 @@ When interpreting aspects, consider:
 
 Languages: Respond in the same language the user uses (English, Spanish, or Norwegian)."""
 
-    def __init__(self):
-        """Initialize AI service"""
-        self.api_key = os.getenv("OPENROUTER_API_KEY")
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        """
+        Initialize AI service
+        
+        `base_url` (or OPENROUTER_BASE_URL) points the service at another
+        OpenRouter-compatible API, such as the local mock in mock_openrouter.py.
+        """
+        self.base_url = (base_url or os.getenv("OPENROUTER_BASE_URL") or self.OPENROUTER_BASE_URL).rstrip("/")
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         self.openai_key = os.getenv("OPENAI_API_KEY")
+        self._budget = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
     def _get_headers(self) -> Dict[str, str]:
         """Get API headers for OpenRouter"""
@@ -55,8 +111,13 @@ Languages: Respond in the same language the user uses (English, Spanish, or Norw
             "X-Title": "ASTRAEA Astrology Platform"
         }
     
-    def _format_chart_summary(self, chart_data: Dict[str, Any]) -> str:
-        """Format chart data into a readable summary for the AI"""
+    def _format_chart_summary(self, chart_data: Dict[str, Any], names: Optional[Dict[str, str]] = None) -> str:
+        """
+        Format chart data into a readable summary for the AI
+        
+        `names` maps object indices to names for aspects whose objects are
+        not in `chart_data` (defaults to the chart's own objects).
+        """
         lines = []
         
         chart_type = chart_data.get("chart_type", "natal")
@@ -78,7 +139,7 @@ Languages: Respond in the same language the user uses (English, Spanish, or Norw
                     name = obj["name"]
                     sign = obj.get("sign", {}).get("name", "Unknown")
                     house = obj.get("house", {}).get("number", "?")
-                    sign_long = obj.get("sign_longitude", {}).get("formatted", "?")
+                    sign_long = angle_text(obj.get("sign_longitude"))
                     movement = obj.get("movement", {}).get("formatted", "Direct")
                     
                     line = f"- {name}: {sign_long} {sign}, House {house}"
@@ -93,42 +154,150 @@ Languages: Respond in the same language the user uses (English, Spanish, or Norw
                 if isinstance(house, dict) and "number" in house:
                     num = house["number"]
                     sign = house.get("sign", {}).get("name", "Unknown")
-                    deg = house.get("sign_longitude", {}).get("formatted", "?")
+                    deg = angle_text(house.get("sign_longitude"))
                     lines.append(f"- House {num}: {deg} {sign}")
         
         # Aspects
         if "aspects" in chart_data:
             lines.append("\n### ASPECTS")
-            for key, aspect in chart_data["aspects"].items():
-                if isinstance(aspect, dict) and "active" in aspect:
-                    active = aspect.get("active", {}).get("name", "?")
-                    passive = aspect.get("passive", {}).get("name", "?")
-                    aspect_type = aspect.get("type", {}).get("name", "?")
-                    orb = aspect.get("orb", {}).get("formatted", "?")
-                    lines.append(f"- {active} {aspect_type} {passive} (orb: {orb})")
+            names = names or self._object_names(chart_data)
+            seen = set()
+
+            def label(value: Any) -> str:
+                if isinstance(value, dict):
+                    return value.get("name", "?")
+                return names.get(str(value), str(value))
+
+            for aspect in self._iter_aspects(chart_data["aspects"]):
+                active = label(aspect.get("active"))
+                passive = label(aspect.get("passive"))
+                # Nested aspects list each pair under both of its objects
+                if frozenset((active, passive)) in seen:
+                    continue
+                seen.add(frozenset((active, passive)))
+                aspect_type = label(aspect.get("type"))
+                # Formatted here when the chart was serialized with raw angles
+                orb = angle_text(aspect.get("difference", aspect.get("orb")))
+                lines.append(f"- {active} {aspect_type} {passive} (orb: {orb})")
         
         return "\n".join(lines)
     
+    @staticmethod
+    def _object_names(chart_data: Dict[str, Any]) -> Dict[str, str]:
+        """Object names by index"""
+        return {
+            str(obj.get("index", key)): obj["name"]
+            for key, obj in chart_data.get("objects", {}).items()
+            if isinstance(obj, dict) and "name" in obj
+        }
+    
+    @staticmethod
+    def _iter_aspects(aspects: Dict[str, Any]):
+        """Aspect dicts from a flat or nested ({active: {passive: aspect}}) mapping"""
+        for aspect in aspects.values():
+            if not isinstance(aspect, dict):
+                continue
+            if "active" in aspect:
+                yield aspect
+            else:
+                yield from (item for item in aspect.values() if isinstance(item, dict) and "active" in item)
+    
+    @staticmethod
+    def _section_chart_data(chart_data: Dict[str, Any], area: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The part of a chart a focus area draws on: its objects, objects in
+        its houses, those house cusps, and aspects touching the selected objects
+        """
+        houses = set(area["houses"])
+        objects = {
+            key: obj for key, obj in chart_data.get("objects", {}).items()
+            if isinstance(obj, dict) and (
+                obj.get("name") in area["objects"] or obj.get("house", {}).get("number") in houses
+            )
+        }
+        selected = {str(obj.get("index", key)) for key, obj in objects.items()}
+        aspects: Dict[str, Any] = {}
+        for key, aspect in chart_data.get("aspects", {}).items():
+            if not isinstance(aspect, dict):
+                continue
+            if "active" in aspect:
+                ends = (aspect["active"], aspect["passive"])
+                ends = [end.get("index") if isinstance(end, dict) else end for end in ends]
+                if any(str(end) in selected for end in ends):
+                    aspects[key] = aspect
+            else:
+                passives = {
+                    passive: item for passive, item in aspect.items()
+                    if str(key) in selected or str(passive) in selected
+                }
+                if passives:
+                    aspects[key] = passives
+        return {
+            **{key: value for key, value in chart_data.items() if key not in ("objects", "houses", "aspects")},
+            "objects": objects,
+            "houses": {
+                key: house for key, house in chart_data.get("houses", {}).items()
+                if isinstance(house, dict) and house.get("number") in houses
+            },
+            "aspects": aspects,
+        }
+    
+    def _language_instruction(self, language: str) -> str:
+        """Prompt suffix asking for a non-English reply"""
+        return {
+            "es": "\n\nPlease respond in Spanish.",
+            "no": "\n\nPlease respond in Norwegian.",
+        }.get(language, "")
+    
+    def _build_messages(
+        self,
+        chart_summary: str,
+        focus: Optional[str] = None,
+        language: str = "en",
+        section: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Chat messages asking for a reading (or one report section) of a chart summary"""
+        user_prompt = f"""Please interpret the following astrological chart:
+
+{chart_summary}
+
+"""
+        if section:
+            user_prompt += (
+                f"\nWrite only the section of a longer report on: {section}. "
+                "Start directly with the interpretation, without a title, introduction or closing summary."
+            )
+        elif focus:
+            user_prompt += f"\nFocus particularly on: {focus}"
+        user_prompt += self._language_instruction(language)
+        
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
     async def _request_with_retry(
         self,
         client: httpx.AsyncClient,
         model: str,
         messages: list,
-        stream: bool = False
+        stream: bool = False,
+        max_tokens: int = 2000
     ):
         """Make a request with retry on 429 rate limit errors"""
         for attempt in range(self.MAX_RETRIES + 1):
-            response = await client.post(
-                f"{self.OPENROUTER_BASE_URL}/chat/completions",
-                headers=self._get_headers(),
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 2000,
-                    **(({"stream": True}) if stream else {})
-                }
-            )
+            async with self._budget:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=self._get_headers(),
+                    json={
+                        "model": model,
+                        "messages": messages,
+                        "temperature": 0.7,
+                        "max_tokens": max_tokens,
+                        **(({"stream": True}) if stream else {})
+                    }
+                )
             if response.status_code == 429 and attempt < self.MAX_RETRIES:
                 delay = self.RETRY_BASE_DELAY * (2 ** attempt)
                 await asyncio.sleep(delay)
@@ -147,86 +316,269 @@ Languages: Respond in the same language the user uses (English, Spanish, or Norw
         Tries multiple models with retry on 429 rate limits.
         """
         if not self.api_key:
-            return "Error: OpenRouter API key not configured. Please set OPENROUTER_API_KEY."
+            return self.NOT_CONFIGURED
         
-        chart_summary = self._format_chart_summary(chart_data)
+        messages = self._build_messages(self._format_chart_summary(chart_data), focus, language)
         
-        user_prompt = f"""Please interpret the following astrological chart:
-
-{chart_summary}
-
-"""
-        if focus:
-            user_prompt += f"\nFocus particularly on: {focus}"
+        async with httpx.AsyncClient(timeout=90.0) as client:
+            try:
+                return await self._complete(client, messages)
+            except RuntimeError as e:
+                return f"{self.UNAVAILABLE} Last error: {e}"
+    
+    async def _complete(
+        self,
+        client: httpx.AsyncClient,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 2000
+    ) -> str:
+        """
+        Completion text from the first model that answers
         
-        if language == "es":
-            user_prompt += "\n\nPlease respond in Spanish."
-        elif language == "no":
-            user_prompt += "\n\nPlease respond in Norwegian."
+        Raises:
+            RuntimeError: With the last error when every model failed
+        """
+        last_error = ""
+        for model in self.MODELS:
+            try:
+                response = await self._request_with_retry(client, model, messages, max_tokens=max_tokens)
+                if response.status_code == 200:
+                    data = response.json()
+                    content = data.get("choices", [{}])[0].get("message", {}).get("content")
+                    if content:
+                        return content
+                last_error = f"Model {model}: status {response.status_code}"
+            except Exception as e:
+                last_error = f"Model {model}: {str(e)}"
+        raise RuntimeError(last_error)
+    
+    @staticmethod
+    def focus_areas(ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Focus areas by ID, in report order (all of them when `ids` is empty)
         
-        messages = [
-            {"role": "system", "content": self.SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ]
+        Raises:
+            ValueError: For an unknown focus area
+        """
+        if not ids:
+            return list(FOCUS_AREAS)
+        known = {area["id"] for area in FOCUS_AREAS}
+        unknown = [area_id for area_id in ids if area_id not in known]
+        if unknown:
+            raise ValueError(f"Unknown focus areas: {', '.join(unknown)}")
+        return [area for area in FOCUS_AREAS if area["id"] in ids]
+    
+    async def interpret_sections(
+        self,
+        chart_data: Dict[str, Any],
+        focus_areas: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Report sections, one per focus area, in the order they complete
+        
+        Each section is a separate request with only the placements of its
+        focus area, so all of them run concurrently within the shared
+        upstream budget. Yields {id, title, content, error}.
+        """
+        areas = self.focus_areas(focus_areas)
+        names = self._object_names(chart_data)
         
-        last_error = ""
         async with httpx.AsyncClient(timeout=90.0) as client:
-            for model in self.MODELS:
+            async def generate(area: Dict[str, Any]) -> Dict[str, Any]:
+                summary = self._format_chart_summary(self._section_chart_data(chart_data, area), names)
+                messages = self._build_messages(
+                    summary, language=language, section=f"{area['name']} ({area['description']})"
+                )
+                section = {"id": area["id"], "title": area["name"], "content": None, "error": None}
+                if not self.api_key:
+                    section["error"] = "OpenRouter API key not configured. Please set OPENROUTER_API_KEY."
+                    return section
                 try:
-                    response = await self._request_with_retry(client, model, messages)
-                    if response.status_code == 200:
-                        data = response.json()
-                        content = data.get("choices", [{}])[0].get("message", {}).get("content")
-                        if content:
-                            return content
-                    last_error = f"Model {model}: status {response.status_code}"
-                except Exception as e:
-                    last_error = f"Model {model}: {str(e)}"
+                    section["content"] = await self._complete(client, messages, SECTION_MAX_TOKENS)
+                except RuntimeError as e:
+                    section["error"] = f"All AI models are currently rate-limited. Last error: {e}"
+                return section
             
-            return f"Error: All AI models are currently rate-limited. Please try again in a minute. Last error: {last_error}"
+            tasks = [asyncio.create_task(generate(area)) for area in areas]
+            try:
+                for next_section in asyncio.as_completed(tasks):
+                    yield await next_section
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    @staticmethod
+    def _format_section(section: Dict[str, Any]) -> str:
+        """Markdown block of one report section"""
+        body = section["content"] or f"_{section['error']}_"
+        return f"## {section['title']}\n\n{body.strip()}\n\n"
+    
+    async def interpret_report(
+        self,
+        chart_data: Dict[str, Any],
+        focus_areas: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> Dict[str, Any]:
+        """Full report: all sections generated concurrently, merged in focus area order"""
+        order = {area["id"]: position for position, area in enumerate(FOCUS_AREAS)}
+        sections = [section async for section in self.interpret_sections(chart_data, focus_areas, language)]
+        sections.sort(key=lambda section: order[section["id"]])
+        return {
+            "interpretation": "".join(self._format_section(section) for section in sections).rstrip(),
+            "sections": sections,
+        }
+    
+    async def interpret_report_stream(
+        self,
+        chart_data: Dict[str, Any],
+        focus_areas: Optional[List[str]] = None,
+        language: str = "en"
+    ) -> AsyncGenerator[str, None]:
+        """Full report as markdown, each section sent whole as soon as it completes"""
+        async for section in self.interpret_sections(chart_data, focus_areas, language):
+            yield self._format_section(section)
+    
+    async def _generate_fragments(
+        self,
+        client: httpx.AsyncClient,
+        placements: List[str],
+        language: str
+    ) -> Dict[str, str]:
+        """
+        General-purpose fragments for placements, a batch per request
+        
+        Placements whose batch fails or is answered incompletely are left
+        out and retried on the next reading that needs them.
+        """
+        async def batch(chunk: List[str]) -> Dict[str, str]:
+            numbered = "\n".join(f"{number}. {placement}" for number, placement in enumerate(chunk, 1))
+            prompt = (
+                "Write a general interpretation of 2-3 sentences for each placement below, "
+                "valid for any chart that has it. Reply with only a JSON object mapping each "
+                f"number to its text.\n\n{numbered}{self._language_instruction(language)}"
+            )
+            messages = [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+            try:
+                content = await self._complete(client, messages, FRAGMENT_MAX_TOKENS)
+                data = json.loads(content[content.index("{"):content.rindex("}") + 1])
+            except (RuntimeError, ValueError):
+                return {}
+            return {
+                placement: str(data[str(number)]).strip()
+                for number, placement in enumerate(chunk, 1)
+                if str(data.get(str(number), "")).strip()
+            }
+        
+        results = await asyncio.gather(*(
+            batch(placements[start:start + FRAGMENT_BATCH_SIZE])
+            for start in range(0, len(placements), FRAGMENT_BATCH_SIZE)
+        ))
+        return {placement: text for result in results for placement, text in result.items()}
+    
+    async def _assemble(
+        self,
+        chart_data: Dict[str, Any],
+        language: str,
+        synthesis: bool,
+        stats: Dict[str, int]
+    ) -> AsyncGenerator[str, None]:
+        """Assembled reading in pieces: placement and aspect fragments, then the synthesis"""
+        placements = fragment_library.placements(chart_data)
+        keys = placements["objects"] + placements["aspects"]
+        fragments = fragment_library.get_many(keys, language)
+        stats.update(placements=len(keys), cached=len(fragments), generated=0)
+        headings = ASSEMBLY_HEADINGS.get(language, ASSEMBLY_HEADINGS["en"])
+        
+        async with httpx.AsyncClient(timeout=90.0) as client:
+            missing = [key for key in keys if key not in fragments]
+            if missing and self.api_key:
+                generated = await self._generate_fragments(client, missing, language)
+                fragment_library.put_many(generated, language)
+                fragments.update(generated)
+                stats["generated"] = len(generated)
+            stats["missing"] = len(keys) - len(fragments)
+            
+            for group in ("objects", "aspects"):
+                lines = [f"**{key}.** {fragments[key]}" for key in placements[group] if key in fragments]
+                if lines:
+                    yield f"## {headings[group]}\n\n" + "\n\n".join(lines) + "\n\n"
+            
+            if not synthesis:
+                return
+            if not self.api_key:
+                yield self.NOT_CONFIGURED
+                return
+            # The synthesis sees placements, not fragment texts, to keep the prompt short
+            messages = self._build_messages(
+                "\n".join(f"- {key}" for key in keys),
+                language=language,
+                section="a synthesis of about 150 words tying the main themes of these placements together, "
+                        "rather than describing them one by one"
+            )
+            try:
+                paragraph = await self._complete(client, messages, SYNTHESIS_MAX_TOKENS)
+            except RuntimeError as e:
+                yield f"_{headings['synthesis']}: {e}_"
+                return
+            yield f"## {headings['synthesis']}\n\n{paragraph.strip()}"
+    
+    async def interpret_assembled(
+        self,
+        chart_data: Dict[str, Any],
+        language: str = "en",
+        synthesis: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Reading composed from stored placement and aspect fragments
+        
+        Only fragments not yet in the library are generated (once per
+        language); the one per-chart LLM call is the synthesis paragraph.
+        """
+        stats: Dict[str, int] = {}
+        pieces = [piece async for piece in self._assemble(chart_data, language, synthesis, stats)]
+        return {"interpretation": "".join(pieces).rstrip(), "fragments": stats}
+    
+    async def interpret_assembled_stream(
+        self,
+        chart_data: Dict[str, Any],
+        language: str = "en",
+        synthesis: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """Assembled reading, the fragments first and the synthesis once generated"""
+        async for piece in self._assemble(chart_data, language, synthesis, {}):
+            yield piece
     
     async def interpret_chart_stream(
         self,
         chart_data: Dict[str, Any],
         focus: Optional[str] = None,
-        language: str = "en"
+        language: str = "en",
+        metrics: Optional[StreamMetrics] = None
     ) -> AsyncGenerator[str, None]:
         """
         Generate streaming AI interpretation for a chart.
         Tries multiple models with retry on 429 rate limits.
+        Closing the generator closes the upstream request.
         """
         if not self.api_key:
-            yield "Error: OpenRouter API key not configured. Please set OPENROUTER_API_KEY."
+            yield self.NOT_CONFIGURED
             return
         
-        chart_summary = self._format_chart_summary(chart_data)
-        
-        user_prompt = f"""Please interpret the following astrological chart:
-
-{chart_summary}
-
-"""
-        if focus:
-            user_prompt += f"\nFocus particularly on: {focus}"
-        
-        if language == "es":
-            user_prompt += "\n\nPlease respond in Spanish."
-        elif language == "no":
-            user_prompt += "\n\nPlease respond in Norwegian."
-        
-        messages = [
-            {"role": "system", "content": self.SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ]
+        messages = self._build_messages(self._format_chart_summary(chart_data), focus, language)
         
         last_error = ""
         async with httpx.AsyncClient(timeout=120.0) as client:
             for model in self.MODELS:
                 for attempt in range(self.MAX_RETRIES + 1):
+                    rate_limited = False
                     try:
-                        async with client.stream(
+                        async with self._budget, client.stream(
                             "POST",
-                            f"{self.OPENROUTER_BASE_URL}/chat/completions",
+                            f"{self.base_url}/chat/completions",
                             headers=self._get_headers(),
                             json={
                                 "model": model,
@@ -237,39 +589,41 @@ Languages: Respond in the same language the user uses (English, Spanish, or Norw
                             }
                         ) as response:
                             if response.status_code == 429:
-                                if attempt < self.MAX_RETRIES:
-                                    delay = self.RETRY_BASE_DELAY * (2 ** attempt)
-                                    await asyncio.sleep(delay)
-                                    continue
-                                last_error = f"Model {model}: rate limited (429)"
-                                break  # try next model
-                            
-                            if response.status_code != 200:
+                                rate_limited = True
+                            elif response.status_code != 200:
                                 last_error = f"Model {model}: status {response.status_code}"
                                 break  # try next model
-                            
-                            # Success - stream the response
-                            async for line in response.aiter_lines():
-                                if line.startswith("data: "):
-                                    data_str = line[6:]
-                                    if data_str == "[DONE]":
-                                        return
-                                    try:
-                                        import json
-                                        data = json.loads(data_str)
-                                        if "choices" in data and len(data["choices"]) > 0:
-                                            delta = data["choices"][0].get("delta", {})
-                                            content = delta.get("content", "")
-                                            if content:
-                                                yield content
-                                    except:
-                                        pass
-                            return  # successfully streamed
+                            else:
+                                # Success - stream the response
+                                async for line in response.aiter_lines():
+                                    if line.startswith("data: "):
+                                        data_str = line[6:]
+                                        if data_str == "[DONE]":
+                                            return
+                                        try:
+                                            data = json.loads(data_str)
+                                        except json.JSONDecodeError:
+                                            if metrics is not None:
+                                                metrics.parse_errors += 1
+                                            continue
+                                        choices = data.get("choices") or [{}]
+                                        content = (choices[0].get("delta") or {}).get("content")
+                                        if content:
+                                            yield content
+                                return  # successfully streamed
                     except Exception as e:
                         last_error = f"Model {model}: {str(e)}"
                         break  # try next model
+                    
+                    # Rate limited: back off after releasing the budget slot and the response
+                    if rate_limited and attempt < self.MAX_RETRIES:
+                        delay = self.RETRY_BASE_DELAY * (2 ** attempt)
+                        await asyncio.sleep(delay)
+                        continue
+                    last_error = f"Model {model}: rate limited (429)"
+                    break  # try next model
             
-            yield f"Error: All AI models are currently rate-limited. Please try again in a minute. ({last_error})"
+            yield f"{self.UNAVAILABLE} ({last_error})"
 
 
 # Singleton instance
@@ -0,0 +1,263 @@
+"""
+Aspect Engine
+Vectorized aspect detection over compact position arrays, following the
+aspect rules, orbs and movement/condition logic of Immanuel's settings
+"""
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from immanuel.const import calc, names
+from immanuel.setup import settings
+
+from services import positions
+from services.serialization import angle_raw
+
+
+# Named aspect sets, in Immanuel's precedence order (the first aspect
+# within orb wins)
+ASPECT_SETS: Dict[str, Tuple[float, ...]] = {
+    "major": (calc.CONJUNCTION, calc.OPPOSITION, calc.SQUARE, calc.TRINE, calc.SEXTILE),
+    "minor": (
+        calc.QUINCUNX, calc.SEMISEXTILE, calc.SEMISQUARE, calc.SESQUISQUARE,
+        calc.QUINTILE, calc.BIQUINTILE, calc.SEPTILE,
+    ),
+    "all": (
+        calc.CONJUNCTION, calc.OPPOSITION, calc.SQUARE, calc.TRINE, calc.SEXTILE,
+        calc.QUINCUNX, calc.SEMISEXTILE, calc.SEMISQUARE, calc.SESQUISQUARE,
+        calc.QUINTILE, calc.BIQUINTILE, calc.SEPTILE,
+    ),
+}
+
+NO_ASPECT = -1
+
+
+class PositionSet(NamedTuple):
+    """Compact positions of one chart: parallel arrays over its objects"""
+    indices: np.ndarray
+    lon: np.ndarray
+    speed: np.ndarray
+
+    @classmethod
+    def from_chart(cls, chart: Dict[str, Any]) -> "PositionSet":
+        """Extract positions from a serialized chart (its `objects` block)"""
+        objects = list(chart["objects"].values())
+        return cls(
+            indices=np.array([obj["index"] for obj in objects]),
+            lon=np.array([angle_raw(obj["longitude"]) for obj in objects], dtype=float),
+            speed=np.array([obj.get("speed", 0.0) for obj in objects], dtype=float),
+        )
+
+    @classmethod
+    def from_points(cls, points: Dict[int, Tuple[float, float]]) -> "PositionSet":
+        """Build from an {index: (longitude, speed)} mapping"""
+        return cls(
+            indices=np.array(list(points)),
+            lon=np.array([lon for lon, _ in points.values()], dtype=float),
+            speed=np.array([speed for _, speed in points.values()], dtype=float),
+        )
+
+
+class AspectMatch(NamedTuple):
+    """
+    Aspect grid between two object sets
+
+    `aspect` holds the index into the engine's aspect tuple (NO_ASPECT where
+    none), the other arrays are only meaningful where an aspect exists. All
+    arrays share the broadcast shape (..., n_a, n_b).
+    """
+    aspect: np.ndarray
+    distance: np.ndarray
+    difference: np.ndarray
+    orb: np.ndarray
+    a_active: np.ndarray
+
+
+class AspectEngine:
+    """Pairwise aspects for natal, transit, synastry and composite positions"""
+
+    def __init__(
+        self,
+        aspects: Sequence[float] = None,
+        orbs: Optional[Dict[int, Dict[float, float]]] = None,
+        default_orb: Optional[float] = None,
+        rules: Optional[Dict[int, Dict[str, Iterable[float]]]] = None,
+        orb_calculation: Optional[int] = None
+    ):
+        """
+        Initialize the engine
+
+        Args:
+            aspects: Aspect angles or the name of an ASPECT_SETS entry
+                (default: Immanuel's configured aspects)
+            orbs: {object index: {aspect: orb}} (default: Immanuel's orbs)
+            default_orb: Orb for objects missing from `orbs`
+            rules: {object index: {"initiate": [...], "receive": [...]}}
+            orb_calculation: calc.MEAN or calc.MAX of the two objects' orbs
+        """
+        if isinstance(aspects, str):
+            aspects = ASPECT_SETS[aspects]
+        self.aspects = np.array(aspects if aspects is not None else settings.aspects, dtype=float)
+        self.orbs = orbs if orbs is not None else settings.orbs
+        self.default_orb = default_orb if default_orb is not None else settings.default_orb
+        self.rules = rules if rules is not None else settings.aspect_rules
+        self.orb_calculation = orb_calculation if orb_calculation is not None else settings.orb_calculation
+        self._tables: Dict[Tuple[int, ...], Tuple[np.ndarray, ...]] = {}
+
+    def tables(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(orbs, may initiate, may receive) per object and aspect, shape (n, n_aspects)"""
+        key = tuple(int(index) for index in indices)
+        tables = self._tables.get(key)
+        if tables is None:
+            orbs = np.empty((len(key), len(self.aspects)))
+            initiate = np.empty(orbs.shape, dtype=bool)
+            receive = np.empty(orbs.shape, dtype=bool)
+            for row, index in enumerate(key):
+                object_orbs = self.orbs.get(index)
+                rule = self.rules.get(index, settings.default_aspect_rule)
+                for column, aspect in enumerate(self.aspects.tolist()):
+                    orbs[row, column] = object_orbs[aspect] if object_orbs else self.default_orb
+                    initiate[row, column] = aspect in rule["initiate"]
+                    receive[row, column] = aspect in rule["receive"]
+            tables = (orbs, initiate, receive)
+            self._tables[key] = tables
+        return tables
+
+    def match(self, a: PositionSet, b: PositionSet) -> AspectMatch:
+        """
+        Aspects between every object of `a` and every object of `b`
+
+        Longitudes and speeds may carry leading batch dimensions, e.g.
+        (N, 1, n_a) against (1, M, n_b) for a whole compatibility matrix;
+        object indices are shared across the batch.
+        """
+        orbs_a, initiate_a, receive_a = self.tables(a.indices)
+        orbs_b, initiate_b, receive_b = self.tables(b.indices)
+        lon_a, lon_b = a.lon[..., :, None], b.lon[..., None, :]
+        speed_a, speed_b = np.abs(a.speed[..., :, None]), np.abs(b.speed[..., None, :])
+
+        # The faster object is active; distance is measured passive - active
+        a_active = speed_a > speed_b
+        distance = positions.angular_difference(lon_b, lon_a)
+        np.negative(distance, out=distance, where=~a_active)
+        separation = np.abs(distance)
+
+        if self.orb_calculation == calc.MEAN:
+            orbs = (orbs_a[:, None, :] + orbs_b[None, :, :]) / 2
+        else:
+            orbs = np.maximum(orbs_a[:, None, :], orbs_b[None, :, :])
+        # Rules per (object in a, object in b, aspect) for each orientation;
+        # Immanuel stops at the first aspect a pair's rules disallow
+        rules_ab = np.cumprod(initiate_a[:, None, :] & receive_b[None, :, :], axis=-1).astype(bool)
+        rules_ba = np.cumprod(initiate_b[None, :, :] & receive_a[:, None, :], axis=-1).astype(bool)
+        symmetric_rules = np.array_equal(rules_ab, rules_ba)
+
+        aspect = np.full(distance.shape, NO_ASPECT, dtype=np.int8)
+        orb = np.zeros(distance.shape, dtype=np.float32)
+        unmatched = np.ones(distance.shape, dtype=bool)
+        for k, angle in enumerate(self.aspects.tolist()):
+            hit = np.abs(separation - angle) <= orbs[..., k]
+            if symmetric_rules:
+                hit &= rules_ab[..., k]
+            else:
+                hit &= np.where(a_active, rules_ab[..., k], rules_ba[..., k])
+            hit &= unmatched
+            np.copyto(aspect, k, where=hit)
+            np.copyto(orb, orbs[..., k], where=hit, casting="same_kind")
+            unmatched &= ~hit
+
+        angle = self.aspects[np.maximum(aspect, 0)]
+        return AspectMatch(
+            aspect=aspect,
+            distance=distance,
+            difference=separation - angle,
+            orb=orb,
+            a_active=a_active,
+        )
+
+    def _describe(self, a: PositionSet, b: PositionSet, found: AspectMatch,
+                  pairs: Iterable[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Aspect dicts for matched (row in a, row in b) pairs"""
+        results = []
+        for i, j in pairs:
+            a_active = bool(found.a_active[i, j])
+            active, passive = (a, i), (b, j)
+            if not a_active:
+                active, passive = passive, active
+            active_lon = float(active[0].lon[active[1]])
+            active_speed = float(active[0].speed[active[1]])
+            passive_lon = float(passive[0].lon[passive[1]])
+            angle = float(self.aspects[found.aspect[i, j]])
+            distance = float(found.distance[i, j])
+            difference = float(found.difference[i, j])
+
+            exact_lon = (passive_lon + (angle if distance < 0 else -angle)) % 360.0
+            exact = abs(float(positions.angular_difference(active_lon, exact_lon))) <= settings.exact_orb
+            applicative = not exact and (
+                (difference < 0 if distance < 0 else difference > 0)
+                or active_speed < -calc.STATION_SPEED
+            )
+            movement = calc.EXACT if exact else calc.APPLICATIVE if applicative else calc.SEPARATIVE
+            associate = int(exact_lon // 30) == int(active_lon // 30)
+            result = {
+                "active": positions.object_name(int(active[0].indices[active[1]])),
+                "passive": positions.object_name(int(passive[0].indices[passive[1]])),
+                "type": names.ASPECTS[angle],
+                "aspect": angle,
+                "orb": float(found.orb[i, j]),
+                "distance": round(distance, 4),
+                "difference": round(difference, 4),
+                "movement": names.ASPECT_MOVEMENTS[movement],
+                "condition": names.ASPECT_CONDITIONS[calc.ASSOCIATE if associate else calc.DISSOCIATE],
+            }
+            if a is not b:
+                # Which chart the active object belongs to (1 = a, 2 = b)
+                result["active_chart"] = 1 if a_active else 2
+            results.append(result)
+        return results
+
+    def natal(self, chart: PositionSet) -> List[Dict[str, Any]]:
+        """Aspects within one chart (natal or composite), each pair once"""
+        found = self.match(chart, chart)
+        rows, columns = np.nonzero(np.triu(found.aspect != NO_ASPECT, k=1))
+        return self._describe(chart, chart, found, zip(rows.tolist(), columns.tolist()))
+
+    def cross(self, a: PositionSet, b: PositionSet) -> List[Dict[str, Any]]:
+        """Aspects between two charts (transit or synastry), every pair of objects"""
+        found = self.match(a, b)
+        rows, columns = np.nonzero(found.aspect != NO_ASPECT)
+        return self._describe(a, b, found, zip(rows.tolist(), columns.tolist()))
+
+    def iter_cross_batch(
+        self,
+        lon_a: np.ndarray, speed_a: np.ndarray, indices_a: np.ndarray,
+        lon_b: np.ndarray, speed_b: np.ndarray, indices_b: np.ndarray,
+        chunk_size: int = 64
+    ) -> Iterator[Tuple[slice, AspectMatch]]:
+        """
+        Cross-aspect grids for every pairing of N charts with M charts
+
+        Args:
+            lon_a, speed_a: Shape (N, n_a) positions of the first chart set
+            lon_b, speed_b: Shape (M, n_b) positions of the second chart set
+            indices_a, indices_b: Object indices of the columns
+            chunk_size: Rows of the first set evaluated at a time, bounding
+                memory to chunk_size x M x n_a x n_b per array
+
+        Yields:
+            (rows of the first set, AspectMatch of shape (rows, M, n_a, n_b))
+        """
+        lon_a, speed_a = np.asarray(lon_a, dtype=float), np.asarray(speed_a, dtype=float)
+        b = PositionSet(indices_b, np.asarray(lon_b, dtype=float)[None], np.asarray(speed_b, dtype=float)[None])
+        for start in range(0, len(lon_a), chunk_size):
+            rows = slice(start, start + chunk_size)
+            a = PositionSet(indices_a, lon_a[rows, None, :], speed_a[rows, None, :])
+            yield rows, self.match(a, b)
+
+    def cross_batch(self, *args, **kwargs) -> AspectMatch:
+        """All chunks of iter_cross_batch joined into (N, M, n_a, n_b) arrays"""
+        chunks = [found for _, found in self.iter_cross_batch(*args, **kwargs)]
+        return AspectMatch(*(np.concatenate(parts) for parts in zip(*chunks)))
+
+
+# Singleton instance (Immanuel's configured aspects and orbs)
+aspect_engine = AspectEngine()
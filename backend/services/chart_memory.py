@@ -0,0 +1,124 @@
+"""
+Chart Memory
+Byte accounting for charts held in memory, section by section, next to the
+compressed payload the chart store keeps for the same chart.
+
+    python -m services.chart_memory carta_hoy.json
+    python -m services.chart_memory --store charts.db --limit 200
+"""
+import json
+import sys
+from typing import Dict, Any, Iterable, Optional, Set
+
+from services.chart_store import encode_payload
+
+
+def deep_sizeof(value: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Bytes held by a value and everything it references
+
+    Objects already in `seen` (e.g. counted for another section) are not
+    counted again.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+    return total
+
+
+def footprint(chart: Dict[str, Any]) -> Dict[str, int]:
+    """Bytes per section of a chart, plus the "total" of all of them"""
+    seen: Set[int] = set()
+    result = {"total": sys.getsizeof(chart)}
+    for key, value in chart.items():
+        result[key] = deep_sizeof(value, seen)
+        result["total"] += result[key]
+    return result
+
+
+def report(charts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Average bytes per chart and section, as dicts and as compressed store payloads"""
+    count = 0
+    full: Dict[str, int] = {}
+    compressed: Dict[str, int] = {}
+    serialized = 0
+    for chart in charts:
+        count += 1
+        for key, size in footprint(chart).items():
+            full[key] = full.get(key, 0) + size
+        for key, value in chart.items():
+            compressed[key] = compressed.get(key, 0) + len(encode_payload({key: value}))
+        compressed["total"] = compressed.get("total", 0) + len(encode_payload(chart))
+        serialized += len(json.dumps(chart, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    if not count:
+        return {"charts": 0}
+    return {
+        "charts": count,
+        "sections": {
+            key: {"dict": full[key] // count, "compressed": compressed.get(key, 0) // count}
+            for key in full
+        },
+        "json": serialized // count,
+        "charts_per_gb": {
+            "dict": (1 << 30) // max(1, full["total"] // count),
+            "compressed": (1 << 30) // max(1, compressed["total"] // count),
+        },
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    """Human-readable report"""
+    if not result["charts"]:
+        print("no charts")
+        return
+    print(f"{result['charts']} charts, average bytes per chart")
+    print(f"{'section':<14}{'dict':>10}{'compressed':>12}")
+    sections = result["sections"]
+    for key in sorted(sections, key=lambda key: (key == "total", -sections[key]["dict"])):
+        print(f"{key:<14}{sections[key]['dict']:>10}{sections[key]['compressed']:>12}")
+    print(f"minified JSON {result['json']} bytes")
+    per_gb = result["charts_per_gb"]
+    print(f"charts per GB: {per_gb['dict']} as dicts, {per_gb['compressed']} compressed "
+          f"({per_gb['compressed'] / max(1, per_gb['dict']):.1f}x)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Memory footprint of charts, as dicts and as compressed store payloads")
+    parser.add_argument("files", nargs="*", help="Chart JSON files (a chart, or a response with 'chart')")
+    parser.add_argument("--store", help="Measure charts from this chart store database")
+    parser.add_argument("--chart-type", help="Only charts of this type (with --store)")
+    parser.add_argument("--limit", type=int, default=100, help="Charts to read from the store")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    def load() -> Iterable[Dict[str, Any]]:
+        for file in args.files:
+            with open(file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            yield data.get("chart", data)
+        if args.store:
+            from services.chart_store import ChartStore
+
+            for position, (_, chart) in enumerate(ChartStore(args.store).iter_charts(args.chart_type)):
+                if position >= args.limit:
+                    break
+                yield chart
+
+    result = report(load())
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
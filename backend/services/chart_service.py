@@ -2,13 +2,31 @@
 Chart Calculation Service using Immanuel library
 Provides natal, transit, synastry, composite, solar return, and progression charts
 """
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import partial
+from itertools import islice
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterator, Tuple
+import numpy as np
+import swisseph as swe
 from immanuel import charts
-from immanuel.classes.serialize import ToJSON
 from immanuel.const import chart as chart_const
 from immanuel.setup import settings
+from services import positions, preview_ephemeris, progressions, returns, serialization, workers
+from services.aspects import AspectEngine, PositionSet
+from services.compatibility import compatibility_service
+from services.composite import composite_service
+from services.ephemeris_table import ephemeris_table
+from services.geo_resolver import geo_resolver
+from services.progressions import ProgressionTimeline
+from services.variants import AYANAMSAS, Variant, variant_service
+
+
+# Angles are formatted when serialized, not when charts are built; imported
+# by every chart worker process too
+serialization.install()
 
 
 class ChartService:
@@ -25,10 +43,27 @@ class ChartService:
         "porphyry": chart_const.PORPHYRIUS,
     }
     
+    # Aspect engine for preview charts (major aspects, configured orbs)
+    PREVIEW_ASPECTS = AspectEngine("major")
+    
+    # Nominal daily motion of the angles in preview charts; only needs to
+    # exceed every body so angles act as the active object, as in Immanuel
+    ANGLE_SPEED = 360.0
+    
+    # Most return charts one returns request may build (about two years of
+    # lunar returns); longer ranges list the return moments only
+    MAX_RETURN_CHARTS = 30
+    
     def __init__(self):
         """Initialize chart service with default settings"""
         # Configure default objects to include
         self._configure_default_objects()
+        # Progression timelines are built and streamed here, off the event
+        # loop; the Swiss Ephemeris path is per thread, so the thread sets
+        # Immanuel's first
+        self._timeline_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="timeline", initializer=settings.set_swe_filepath
+        )
     
     def _configure_default_objects(self):
         """Set up default celestial objects"""
@@ -71,22 +106,135 @@ class ChartService:
         house_const = self.HOUSE_SYSTEMS.get(house_system.lower(), chart_const.PLACIDUS)
         settings.house_system = house_const
         
+        # Resolve the timezone from the cached grid instead of letting
+        # Immanuel run a fresh polygon lookup for every subject
+        if isinstance(date_time, str):
+            timezone = geo_resolver.resolve(date_time, latitude, longitude).timezone
+        else:
+            timezone = geo_resolver.timezone_at(latitude, longitude)
+        
         return charts.Subject(
             date_time=date_time,
             latitude=latitude,
             longitude=longitude,
+            timezone=timezone,
         )
     
-    def _chart_to_dict(self, chart_obj) -> Dict[str, Any]:
-        """Convert chart object to dictionary using JSON serialization"""
-        return json.loads(json.dumps(chart_obj, cls=ToJSON))
+    def _chart_to_dict(self, chart_obj, formatting: str = "full") -> Dict[str, Any]:
+        """
+        Convert chart object to dictionary using JSON serialization
+        
+        With formatting="raw" every angle is its decimal degrees, skipping
+        the D°M'S" strings and split fields (see services.serialization).
+        """
+        return serialization.to_dict(chart_obj, formatting)
+    
+    def _remember(self, subject: Tuple[str, float, float], house_system: int, chart: Dict[str, Any]) -> None:
+        """Cache a natal chart's positions for compact composites and compatibility rankings"""
+        composite_service.remember(subject, house_system, chart)
+        compatibility_service.remember(subject, chart)
+    
+    def _input(self, chart_input: Dict[str, Any], formatting: str = "full") -> Dict[str, Any]:
+        """
+        `input` block of a chart
+        
+        A non-default formatting is echoed, so charts keyed by their input
+        (chart store imports) stay apart from the full charts.
+        """
+        if formatting != "full":
+            chart_input["formatting"] = formatting
+        return chart_input
+    
+    def _calculate_preview(self, subject: charts.Subject) -> Dict[str, Any]:
+        """
+        Approximate chart from the analytical preview ephemeris
+        
+        Returns longitudes, signs, houses and major aspects only, each object
+        carrying its validated worst-case error in degrees.
+        """
+        jd = subject.julian_date
+        latitude, longitude = subject.latitude, subject.longitude
+        validated = preview_ephemeris.is_validated(jd, latitude)
+        
+        house_code = positions.HOUSE_SYSTEM_CODES.get(settings.house_system, b"P")
+        if validated:
+            asc, mc = preview_ephemeris.angles(jd, latitude, longitude)
+            armc = float(preview_ephemeris.armc(jd, longitude))
+            cusps = np.array(swe.houses_armc(
+                armc, latitude, float(preview_ephemeris.obliquity(jd)), house_code
+            )[0][:12])
+        else:
+            house_cusps, ascmc = swe.houses(jd, latitude, longitude, house_code)
+            cusps = np.array(house_cusps[:12])
+            asc, mc = ascmc[0], ascmc[1]
+        
+        # Planets come from the interpolated table where it is built, then the
+        # analytical ephemeris, then (outside its validated range) the Swiss Ephemeris
+        jds = np.array([jd])
+        table = ephemeris_table.info()
+        analytic = preview_ephemeris.positions(jd) if validated else {}
+        points, errors = {}, {}
+        for index in preview_ephemeris.PLANETS:
+            if ephemeris_table.covers(index, jds):
+                lon, speed = ephemeris_table.longitudes(index, jds)
+                points[index] = (float(lon[0]), float(speed[0]))
+                errors[index] = table[index]["max_error"]
+            elif validated:
+                points[index] = analytic[index]
+                errors[index] = preview_ephemeris.ERROR_BOUNDS[index]
+            else:
+                lon, speed = positions.swe_longitudes(index, jds)
+                points[index] = (float(lon[0]), float(speed[0]))
+                errors[index] = 0.0
+        # Angles move faster than any body, so they always act as the active object
+        points[chart_const.ASC] = (float(asc), self.ANGLE_SPEED)
+        points[chart_const.MC] = (float(mc), self.ANGLE_SPEED)
+        for index in (chart_const.ASC, chart_const.MC):
+            errors[index] = preview_ephemeris.ERROR_BOUNDS[index] if validated else 0.0
+        
+        indices = list(points)
+        lons = np.array([points[index][0] for index in indices])
+        signs = positions.sign_numbers(lons)
+        houses = positions.house_numbers(lons, cusps)
+        
+        objects = {}
+        for row, index in enumerate(indices):
+            lon, speed = points[index]
+            objects[positions.object_name(index)] = {
+                "longitude": round(lon, 4),
+                "sign": positions.SIGN_NAMES[signs[row] - 1],
+                "sign_longitude": round(lon % 30.0, 4),
+                "house": int(houses[row]),
+                "retrograde": speed < 0,
+                "max_error": errors[index],
+            }
+        
+        aspects = self.PREVIEW_ASPECTS.natal(PositionSet.from_points(points))
+        
+        return {
+            "precision": "preview",
+            "validated": validated,
+            "julian_date": jd,
+            "objects": objects,
+            "houses": {
+                str(number): {
+                    "number": number,
+                    "longitude": round(float(cusp), 4),
+                    "sign": positions.SIGN_NAMES[int(cusp // 30) % 12],
+                }
+                for number, cusp in enumerate(cusps, start=1)
+            },
+            "aspects": aspects,
+        }
     
     def calculate_natal(
         self,
         date_time: str,
         latitude: float,
         longitude: float,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        precision: str = "full",
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate a natal chart
@@ -96,21 +244,38 @@ class ChartService:
             latitude: Latitude in decimal degrees
             longitude: Longitude in decimal degrees
             house_system: House system to use (placidus, koch, whole_sign, etc.)
+            precision: "full" for the complete Immanuel chart, "preview" for a
+                fast approximate chart (see preview_ephemeris.ERROR_BOUNDS)
+            formatting: "full" for formatted angles, "raw" for angles as
+                decimal degrees only (see services.serialization)
         
         Returns:
             Complete natal chart data as dictionary
         """
         subject = self._create_subject(date_time, latitude, longitude, house_system)
+        if precision == "preview":
+            chart_data = self._calculate_preview(subject)
+            chart_data["chart_type"] = "natal"
+            chart_data["input"] = {
+                "date_time": date_time,
+                "latitude": latitude,
+                "longitude": longitude,
+                "house_system": house_system,
+                "precision": precision
+            }
+            return chart_data
+        
         natal = charts.Natal(subject)
         
-        chart_data = self._chart_to_dict(natal)
+        chart_data = self._chart_to_dict(natal, formatting)
+        self._remember((date_time, latitude, longitude), settings.house_system, chart_data)
         chart_data["chart_type"] = "natal"
-        chart_data["input"] = {
+        chart_data["input"] = self._input({
             "date_time": date_time,
             "latitude": latitude,
             "longitude": longitude,
             "house_system": house_system
-        }
+        }, formatting)
         
         return chart_data
     
@@ -120,7 +285,8 @@ class ChartService:
         natal_latitude: float,
         natal_longitude: float,
         transit_date_time: str,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate transits to a natal chart
@@ -131,6 +297,7 @@ class ChartService:
             natal_longitude: Birth longitude
             transit_date_time: Transit datetime
             house_system: House system to use
+            formatting: "full" or "raw" angles (see calculate_natal)
         
         Returns:
             Transit chart data with aspects to natal
@@ -146,19 +313,61 @@ class ChartService:
         # Use Natal class for comparison to avoid Transits class bug
         transits = charts.Natal(transit_subject, natal)
         
-        chart_data = self._chart_to_dict(transits)
+        chart_data = self._chart_to_dict(transits, formatting)
         chart_data["chart_type"] = "transit"
-        chart_data["natal_chart"] = self._chart_to_dict(natal)
-        chart_data["input"] = {
+        chart_data["natal_chart"] = self._chart_to_dict(natal, formatting)
+        chart_data["input"] = self._input({
             "natal_date_time": natal_date_time,
             "transit_date_time": transit_date_time,
             "latitude": natal_latitude,
             "longitude": natal_longitude,
             "house_system": house_system
-        }
+        }, formatting)
         
         return chart_data
     
+    def calculate_natal_with_transit(
+        self,
+        date_time: str,
+        latitude: float,
+        longitude: float,
+        transit_date_time: str,
+        house_system: str = "placidus",
+        formatting: str = "full"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate a natal chart and transits to it from one natal calculation
+        
+        Returns {"natal": ..., "transit": ...} in the formats of
+        calculate_natal and calculate_transit.
+        """
+        natal_subject = self._create_subject(date_time, latitude, longitude, house_system)
+        transit_subject = self._create_subject(transit_date_time, latitude, longitude, house_system)
+        
+        natal = charts.Natal(natal_subject)
+        natal_chart = self._chart_to_dict(natal, formatting)
+        self._remember((date_time, latitude, longitude), settings.house_system, natal_chart)
+        
+        transit_chart = self._chart_to_dict(charts.Natal(transit_subject, natal), formatting)
+        transit_chart["chart_type"] = "transit"
+        transit_chart["natal_chart"] = dict(natal_chart)
+        transit_chart["input"] = self._input({
+            "natal_date_time": date_time,
+            "transit_date_time": transit_date_time,
+            "latitude": latitude,
+            "longitude": longitude,
+            "house_system": house_system
+        }, formatting)
+        
+        natal_chart["chart_type"] = "natal"
+        natal_chart["input"] = self._input({
+            "date_time": date_time,
+            "latitude": latitude,
+            "longitude": longitude,
+            "house_system": house_system
+        }, formatting)
+        return {"natal": natal_chart, "transit": transit_chart}
+    
     def calculate_synastry(
         self,
         person1_date_time: str,
@@ -167,11 +376,14 @@ class ChartService:
         person2_date_time: str,
         person2_latitude: float,
         person2_longitude: float,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate synastry between two charts
         
+        Angles are serialized per `formatting` (see calculate_natal).
+        
         Returns:
             Both natal charts with inter-aspects
         """
@@ -189,12 +401,22 @@ class ChartService:
         # Calculate synastry (aspects from chart1 to chart2)
         synastry = charts.Natal(subject1, natal2)
         
+        person1 = self._chart_to_dict(natal1, formatting)
+        person2 = self._chart_to_dict(natal2, formatting)
+        # Keep both position sets so a follow-up composite or ranking needs no ephemeris pass
+        self._remember(
+            (person1_date_time, person1_latitude, person1_longitude), settings.house_system, person1
+        )
+        self._remember(
+            (person2_date_time, person2_latitude, person2_longitude), settings.house_system, person2
+        )
+        
         chart_data = {
             "chart_type": "synastry",
-            "person1": self._chart_to_dict(natal1),
-            "person2": self._chart_to_dict(natal2),
-            "synastry_aspects": self._chart_to_dict(synastry).get("aspects", []),
-            "input": {
+            "person1": person1,
+            "person2": person2,
+            "synastry_aspects": self._chart_to_dict(synastry, formatting).get("aspects", []),
+            "input": self._input({
                 "person1": {
                     "date_time": person1_date_time,
                     "latitude": person1_latitude,
@@ -206,7 +428,7 @@ class ChartService:
                     "longitude": person2_longitude
                 },
                 "house_system": house_system
-            }
+            }, formatting)
         }
         
         return chart_data
@@ -219,11 +441,28 @@ class ChartService:
         person2_date_time: str,
         person2_latitude: float,
         person2_longitude: float,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        compact: bool = False,
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate composite chart (midpoint method)
+        
+        With compact=True the chart is built from cached natal positions
+        (see services.composite) and holds objects, houses and aspects only;
+        its angles are always decimal degrees, so `formatting` only applies
+        to full charts.
         """
+        pair = (
+            (person1_date_time, person1_latitude, person1_longitude),
+            (person2_date_time, person2_latitude, person2_longitude),
+        )
+        chart_input = self._pair_input(pair, house_system)
+        if compact:
+            chart_data = self.calculate_composites([pair], house_system)[0]
+            chart_data["input"] = {**chart_input, "compact": True}
+            return chart_data
+        
         subject1 = self._create_subject(
             person1_date_time, person1_latitude, person1_longitude, house_system
         )
@@ -233,31 +472,122 @@ class ChartService:
         
         composite = charts.Composite(subject1, subject2)
         
-        chart_data = self._chart_to_dict(composite)
+        chart_data = self._chart_to_dict(composite, formatting)
         chart_data["chart_type"] = "composite"
-        chart_data["input"] = {
-            "person1": {
-                "date_time": person1_date_time,
-                "latitude": person1_latitude,
-                "longitude": person1_longitude
-            },
-            "person2": {
-                "date_time": person2_date_time,
-                "latitude": person2_latitude,
-                "longitude": person2_longitude
-            },
-            "house_system": house_system
-        }
+        chart_data["input"] = self._input(chart_input, formatting)
         
         return chart_data
     
+    @staticmethod
+    def _pair_input(pair: tuple, house_system: str) -> Dict[str, Any]:
+        """`input` block of a chart of two subjects"""
+        chart_input: Dict[str, Any] = {
+            person: {"date_time": date_time, "latitude": latitude, "longitude": longitude}
+            for person, (date_time, latitude, longitude) in zip(("person1", "person2"), pair)
+        }
+        chart_input["house_system"] = house_system
+        return chart_input
+    
+    def calculate_composites(
+        self,
+        pairs: List[tuple],
+        house_system: str = "placidus",
+        aspects: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Compact composite charts for many pairs of subjects
+        
+        Args:
+            pairs: ((date_time, latitude, longitude), (date_time, latitude, longitude)) tuples
+            house_system: House system to use
+            aspects: Whether to include composite aspects
+        
+        Returns:
+            One chart per pair, with objects, houses and (optionally) aspects
+        """
+        house_const = self.HOUSE_SYSTEMS.get(house_system.lower(), chart_const.PLACIDUS)
+        results = composite_service.composites(pairs, house_const, aspects=aspects)
+        for chart_data in results:
+            chart_data["chart_type"] = "composite"
+        return results
+    
+    async def composites_async(
+        self,
+        pairs: List[tuple],
+        house_system: str = "placidus",
+        aspects: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        calculate_composites off the event loop
+        
+        Runs on the composite service's thread rather than in the worker
+        pool, since the natal position cache it draws on lives in this
+        process (see natal_async).
+        """
+        house_const = self.HOUSE_SYSTEMS.get(house_system.lower(), chart_const.PLACIDUS)
+        results = await composite_service.composites_async(pairs, house_const, aspects=aspects)
+        for chart_data in results:
+            chart_data["chart_type"] = "composite"
+        return results
+    
+    def calculate_variants(
+        self,
+        date_time: str,
+        latitude: float,
+        longitude: float,
+        variants: List[Dict[str, Any]],
+        aspects: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Several renderings of one natal chart from a single ephemeris pass
+        
+        Args:
+            date_time: Birth datetime
+            latitude: Birth latitude
+            longitude: Birth longitude
+            variants: Dicts with optional house_system, zodiac
+                ("tropical"/"sidereal"), ayanamsa (see AYANAMSAS) and harmonic
+            aspects: Whether to include each variant's aspects
+        
+        Returns:
+            Compact charts (objects, houses, aspects) in request order
+        """
+        specs = []
+        for spec in variants:
+            house_system = spec.get("house_system", "placidus")
+            if house_system.lower() not in self.HOUSE_SYSTEMS:
+                raise ValueError(f"Unknown house system: {house_system}")
+            sidereal = spec.get("zodiac", "tropical") == "sidereal"
+            ayanamsa = spec.get("ayanamsa", "lahiri") if sidereal else None
+            if ayanamsa is not None and ayanamsa not in AYANAMSAS:
+                raise ValueError(f"Unknown ayanamsa: {ayanamsa}")
+            specs.append(Variant(
+                house_system=self.HOUSE_SYSTEMS[house_system.lower()],
+                ayanamsa=ayanamsa,
+                harmonic=spec.get("harmonic", 1),
+            ))
+        
+        results = variant_service.variants((date_time, latitude, longitude), specs, aspects)
+        return {
+            "chart_type": "variants",
+            "variants": [
+                {"variant": spec, **chart} for spec, chart in zip(variants, results)
+            ],
+            "input": {
+                "date_time": date_time,
+                "latitude": latitude,
+                "longitude": longitude
+            }
+        }
+    
     def calculate_solar_return(
         self,
         natal_date_time: str,
         latitude: float,
         longitude: float,
         year: int,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate solar return chart for a specific year
@@ -268,15 +598,15 @@ class ChartService:
         
         solar_return = charts.SolarReturn(subject, year)
         
-        chart_data = self._chart_to_dict(solar_return)
+        chart_data = self._chart_to_dict(solar_return, formatting)
         chart_data["chart_type"] = "solar_return"
-        chart_data["input"] = {
+        chart_data["input"] = self._input({
             "natal_date_time": natal_date_time,
             "latitude": latitude,
             "longitude": longitude,
             "year": year,
             "house_system": house_system
-        }
+        }, formatting)
         
         return chart_data
     
@@ -286,7 +616,8 @@ class ChartService:
         latitude: float,
         longitude: float,
         progressed_date_time: str,
-        house_system: str = "placidus"
+        house_system: str = "placidus",
+        formatting: str = "full"
     ) -> Dict[str, Any]:
         """
         Calculate secondary progressions
@@ -297,17 +628,295 @@ class ChartService:
         
         progressed = charts.Progressed(natal_subject, progressed_date_time)
         
-        chart_data = self._chart_to_dict(progressed)
+        chart_data = self._chart_to_dict(progressed, formatting)
         chart_data["chart_type"] = "progressed"
-        chart_data["input"] = {
+        chart_data["input"] = self._input({
             "natal_date_time": natal_date_time,
             "progressed_date_time": progressed_date_time,
             "latitude": latitude,
             "longitude": longitude,
             "house_system": house_system
+        }, formatting)
+        
+        return chart_data
+
+    def progressed_timeline(
+        self,
+        natal_date_time: str,
+        latitude: float,
+        longitude: float,
+        start_date_time: str,
+        end_date_time: str,
+        step: str = "month",
+        interval: int = 1,
+        objects: Optional[List[str]] = None,
+        precision: int = 2,
+        house_system: str = "placidus"
+    ) -> ProgressionTimeline:
+        """
+        Build an incremental secondary-progression timeline
+        
+        Args:
+            start_date_time: First progression date (natal local time)
+            end_date_time: Last progression date (inclusive)
+            step: day, week, month or year
+            interval: Number of step units between samples
+            objects: Object names to include (default: all batch-capable objects)
+            precision: Decimal places for longitudes
+        
+        Returns:
+            Iterable of header and frame records (see ProgressionTimeline)
+        """
+        subject = self._create_subject(natal_date_time, latitude, longitude, house_system)
+        indices = [index for index in settings.objects if positions.is_supported(index)]
+        if objects:
+            wanted = {name.lower() for name in objects}
+            indices = [index for index in indices if positions.object_name(index).lower() in wanted]
+        
+        return ProgressionTimeline(
+            natal_jd=subject.julian_date,
+            latitude=subject.latitude,
+            longitude=subject.longitude,
+            tzinfo=subject.date_time.tzinfo,
+            start=start_date_time,
+            end=end_date_time,
+            house_system=settings.house_system,
+            step=step,
+            interval=interval,
+            objects=indices,
+            precision=precision,
+            method=settings.mc_progression_method,
+        )
+    
+    async def progressed_timeline_async(self, **kwargs) -> ProgressionTimeline:
+        """progressed_timeline in the timeline thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._timeline_executor, partial(self.progressed_timeline, **kwargs))
+    
+    async def timeline_lines(self, timeline: ProgressionTimeline) -> AsyncIterator[str]:
+        """
+        NDJSON of a timeline, one batch of steps per chunk
+        
+        Each batch is evaluated and encoded in the timeline thread, so a long
+        timeline never holds the event loop for more than a hand-off.
+        """
+        loop = asyncio.get_running_loop()
+        records = iter(timeline)
+        while True:
+            chunk = await loop.run_in_executor(self._timeline_executor, _encode_records, records)
+            if not chunk:
+                return
+            yield chunk
+    
+    def calculate_moment(
+        self,
+        julian_date: float,
+        latitude: float,
+        longitude: float,
+        house_system: str = "placidus"
+    ) -> Dict[str, Any]:
+        """
+        Calculate the chart of an exact moment given as a Julian date (UT)
+        """
+        subject = self._create_subject(float(julian_date), latitude, longitude, house_system)
+        return self._chart_to_dict(charts.Natal(subject))
+    
+    def calculate_returns(
+        self,
+        natal_date_time: str,
+        latitude: float,
+        longitude: float,
+        body: str = "sun",
+        start_year: Optional[int] = None,
+        years: int = 1,
+        house_system: str = "placidus",
+        include_charts: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Calculate every solar or lunar return in a range of years
+        
+        The natal position is computed once and all return moments are found
+        in a single batched search. Return charts are built one after another
+        here; returns_async builds them in parallel in the worker pool.
+        
+        Args:
+            body: "sun" for solar returns, "moon" for lunar returns
+            start_year: First calendar year to search (default: current year)
+            years: Number of calendar years to cover
+            include_charts: Whether to build the full chart for each return
+                (at most MAX_RETURN_CHARTS)
+        """
+        index = returns.RETURN_BODIES.get(body.lower())
+        if index is None:
+            raise ValueError(f"Unsupported return body: {body}")
+        start_year = start_year or datetime.now().year
+        
+        natal_subject = self._create_subject(natal_date_time, latitude, longitude, house_system)
+        natal_longitude = float(positions.swe_longitudes(index, [natal_subject.julian_date])[0][0])
+        
+        return_jds = returns.find_returns(
+            index,
+            natal_longitude,
+            returns.year_start_jd(start_year),
+            returns.year_start_jd(start_year + years),
+        )
+        
+        if include_charts:
+            self._check_return_charts(len(return_jds))
+        
+        chart_type = "solar_return" if index == chart_const.SUN else "lunar_return"
+        results = []
+        for jd in return_jds:
+            item = {"julian_date": float(jd), "date_time": returns.jd_to_iso(jd)}
+            if include_charts:
+                item["chart"] = self.calculate_moment(float(jd), latitude, longitude, house_system)
+                item["chart"]["chart_type"] = chart_type
+            results.append(item)
+        
+        return {
+            "chart_type": f"{chart_type}s",
+            "natal_longitude": natal_longitude,
+            "returns": results,
+            "input": {
+                "natal_date_time": natal_date_time,
+                "latitude": latitude,
+                "longitude": longitude,
+                "body": body.lower(),
+                "start_year": start_year,
+                "years": years,
+                "house_system": house_system
+            }
         }
+    
+    def _check_return_charts(self, count: int) -> None:
+        """Refuse to build more than MAX_RETURN_CHARTS return charts"""
+        if count > self.MAX_RETURN_CHARTS:
+            raise ValueError(
+                f"{count} returns found; charts are built for at most {self.MAX_RETURN_CHARTS}, "
+                "request fewer years or set include_charts to false"
+            )
+    
+    async def run_async(self, method: str, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Run a calculation method in the chart worker pool
         
+        The event loop stays free while the chart is built. Cancelling the
+        awaiting task (or passing `timeout` seconds) drops a call that is
+        still waiting for a worker; see workers.submit_chart_service.
+        Calls compose with asyncio.gather, e.g. natal, transit and solar
+        return for one subject in parallel.
+        """
+        return await workers.submit_chart_service(method, kwargs, timeout)
+    
+    async def natal_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_natal in the worker pool"""
+        chart = await self.run_async("calculate_natal", timeout, **kwargs)
+        if kwargs.get("precision", "full") != "preview":
+            # Built in a worker process; keep the position caches served here warm
+            house_system = self.HOUSE_SYSTEMS.get(kwargs.get("house_system", "placidus").lower(), chart_const.PLACIDUS)
+            self._remember(
+                (kwargs["date_time"], kwargs["latitude"], kwargs["longitude"]), house_system, chart
+            )
+        return chart
+    
+    async def transit_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_transit in the worker pool"""
+        return await self.run_async("calculate_transit", timeout, **kwargs)
+    
+    async def natal_with_transit_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Dict[str, Any]]:
+        """calculate_natal_with_transit in the worker pool"""
+        charts_data = await self.run_async("calculate_natal_with_transit", timeout, **kwargs)
+        house_system = self.HOUSE_SYSTEMS.get(kwargs.get("house_system", "placidus").lower(), chart_const.PLACIDUS)
+        self._remember(
+            (kwargs["date_time"], kwargs["latitude"], kwargs["longitude"]), house_system, charts_data["natal"]
+        )
+        return charts_data
+    
+    async def synastry_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_synastry in the worker pool"""
+        chart = await self.run_async("calculate_synastry", timeout, **kwargs)
+        # Built in a worker process; seed the position caches served here
+        house_system = self.HOUSE_SYSTEMS.get(kwargs.get("house_system", "placidus").lower(), chart_const.PLACIDUS)
+        for person in ("person1", "person2"):
+            self._remember(
+                (kwargs[f"{person}_date_time"], kwargs[f"{person}_latitude"], kwargs[f"{person}_longitude"]),
+                house_system,
+                chart[person]
+            )
+        return chart
+    
+    async def composite_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """
+        calculate_composite in the worker pool
+        
+        Compact composites are built on the composite service's thread
+        instead, from the position cache of this process (see composites_async).
+        """
+        if not kwargs.get("compact"):
+            return await self.run_async("calculate_composite", timeout, **kwargs)
+        pair = tuple(
+            (kwargs[f"{person}_date_time"], kwargs[f"{person}_latitude"], kwargs[f"{person}_longitude"])
+            for person in ("person1", "person2")
+        )
+        house_system = kwargs.get("house_system", "placidus")
+        chart_data = (await asyncio.wait_for(self.composites_async([pair], house_system), timeout))[0]
+        chart_data["input"] = {**self._pair_input(pair, house_system), "compact": True}
         return chart_data
+    
+    async def variants_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_variants in the worker pool"""
+        return await self.run_async("calculate_variants", timeout, **kwargs)
+    
+    async def solar_return_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_solar_return in the worker pool"""
+        return await self.run_async("calculate_solar_return", timeout, **kwargs)
+    
+    async def progressed_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """calculate_progressed in the worker pool"""
+        return await self.run_async("calculate_progressed", timeout, **kwargs)
+    
+    async def returns_async(self, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """
+        calculate_returns in the worker pool
+        
+        The return moments are found in one call; with include_charts, each
+        return chart is then built as a call of its own, so the charts share
+        the pool with other requests and are dropped if the caller goes away.
+        """
+        include_charts = kwargs.pop("include_charts", False)
+        result = await self.run_async("calculate_returns", timeout, include_charts=False, **kwargs)
+        if not include_charts:
+            return result
+        self._check_return_charts(len(result["returns"]))
+        
+        chart_input = result["input"]
+        tasks = [
+            asyncio.ensure_future(self.run_async(
+                "calculate_moment",
+                timeout,
+                julian_date=item["julian_date"],
+                latitude=chart_input["latitude"],
+                longitude=chart_input["longitude"],
+                house_system=chart_input["house_system"],
+            ))
+            for item in result["returns"]
+        ]
+        try:
+            return_charts = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        chart_type = result["chart_type"].removesuffix("s")
+        for item, chart in zip(result["returns"], return_charts):
+            chart["chart_type"] = chart_type
+            item["chart"] = chart
+        return result
+
+
+def _encode_records(records: Iterator[Dict[str, Any]], count: int = progressions.BATCH_SIZE) -> str:
+    """Next `count` records as NDJSON lines ("" once exhausted)"""
+    return "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in islice(records, count))
 
 
 # Singleton instance
@@ -0,0 +1,314 @@
+"""
+Chart Store - local persistence for calculated charts
+Stores compressed chart payloads in SQLite, indexed by normalized birth data
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+
+def _round_coordinate(value: float, precision: int) -> float:
+    """Round a coordinate, folding -0.0 into 0.0"""
+    return round(float(value), precision) + 0.0
+
+
+def normalize_date_time(date_time: str) -> str:
+    """Canonical ISO form of a date/time string (seconds precision)"""
+    return datetime.fromisoformat(str(date_time).strip()).isoformat(timespec="seconds")
+
+
+def normalize_input(params: Dict[str, Any], precision: int = 4) -> Dict[str, Any]:
+    """
+    Normalize chart calculation parameters so equivalent requests share a key
+
+    Date/times become canonical ISO strings, coordinates are rounded to
+    `precision` decimals and the house system is lower-cased.
+    """
+    normalized = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if key.endswith("date_time"):
+            normalized[key] = normalize_date_time(value)
+        elif key.endswith("latitude") or key.endswith("longitude"):
+            normalized[key] = _round_coordinate(value, precision)
+        elif key == "house_system":
+            normalized[key] = str(value).lower()
+        else:
+            normalized[key] = value
+    return normalized
+
+
+# ChartService echoes some inputs under different names than the request
+# fields; map them back so imported dumps and live requests share chart IDs
+INPUT_ALIASES = {
+    "transit": {"latitude": "natal_latitude", "longitude": "natal_longitude"},
+}
+
+
+def canonical_input(chart_type: str, params: Dict[str, Any], precision: int = 4) -> Dict[str, Any]:
+    """
+    Flatten and normalize chart parameters into the request-field form
+
+    Accepts both the flat keyword arguments of ChartService methods and the
+    nested `input` blocks (`person1: {date_time, ...}`) found in chart dumps.
+    """
+    aliases = INPUT_ALIASES.get(chart_type, {})
+    flat = {}
+    for key, value in params.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat[aliases.get(key, key)] = value
+    return normalize_input(flat, precision)
+
+
+def subject_key(date_time: str, latitude: float, longitude: float, precision: int = 4) -> str:
+    """Index key for a subject's normalized birth data"""
+    return "{}|{:.{p}f}|{:.{p}f}".format(
+        normalize_date_time(date_time),
+        _round_coordinate(latitude, precision),
+        _round_coordinate(longitude, precision),
+        p=precision,
+    )
+
+
+def _primary_subject(params: Dict[str, Any]) -> Tuple[str, float, float]:
+    """Pick the subject that owns a chart out of its calculation parameters"""
+    for prefix in ("", "natal_", "person1_"):
+        if f"{prefix}date_time" in params:
+            latitude = params.get(f"{prefix}latitude", params.get("latitude"))
+            longitude = params.get(f"{prefix}longitude", params.get("longitude"))
+            return params[f"{prefix}date_time"], latitude, longitude
+    raise KeyError("date_time")
+
+
+def encode_payload(chart: Dict[str, Any]) -> bytes:
+    """Compact storage form of a chart: minified JSON, zlib-compressed"""
+    raw = json.dumps(chart, separators=(",", ":"), ensure_ascii=False)
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Inverse of encode_payload"""
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class ChartStore:
+    """SQLite-backed store for calculated charts"""
+
+    COORDINATE_PRECISION = 4
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS charts (
+            id TEXT PRIMARY KEY,
+            chart_type TEXT NOT NULL,
+            subject_key TEXT NOT NULL,
+            house_system TEXT NOT NULL,
+            input TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_charts_subject
+            ON charts (subject_key, house_system, chart_type);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize chart store (the database is opened lazily)"""
+        self.path = path or os.getenv("CHART_STORE_PATH", "charts.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def chart_id(self, chart_type: str, params: Dict[str, Any]) -> str:
+        """Deterministic chart ID derived from the normalized inputs"""
+        normalized = canonical_input(chart_type, params, self.COORDINATE_PRECISION)
+        key = json.dumps([chart_type, normalized], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+    def get(self, chart_id: str) -> Optional[Dict[str, Any]]:
+        """Load a stored chart by ID"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload FROM charts WHERE id = ?", (chart_id,)
+            ).fetchone()
+        return decode_payload(row[0]) if row else None
+
+    def _row(self, chart_type: str, params: Dict[str, Any], chart: Dict[str, Any]) -> tuple:
+        """Build the database row for a chart"""
+        normalized = canonical_input(chart_type, params, self.COORDINATE_PRECISION)
+        date_time, latitude, longitude = _primary_subject(normalized)
+        return (
+            self.chart_id(chart_type, params),
+            chart_type,
+            subject_key(date_time, latitude, longitude, self.COORDINATE_PRECISION),
+            normalized.get("house_system", "placidus"),
+            json.dumps(normalized, sort_keys=True),
+            encode_payload(chart),
+            time.time(),
+        )
+
+    def save(self, chart_type: str, params: Dict[str, Any], chart: Dict[str, Any]) -> str:
+        """Store a chart and return its ID"""
+        row = self._row(chart_type, params, chart)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            conn.commit()
+        return row[0]
+
+    def get_or_calculate(self, chart_type: str, params: Dict[str, Any], calculate) -> Tuple[str, Dict[str, Any]]:
+        """Return (chart_id, chart), calling `calculate(**params)` only on a miss"""
+        chart_id = self.chart_id(chart_type, params)
+        chart = self.get(chart_id)
+        if chart is None:
+            chart = calculate(**params)
+            self.save(chart_type, params, chart)
+        return chart_id, chart
+
+    async def get_or_calculate_async(
+        self,
+        chart_type: str,
+        params: Dict[str, Any],
+        calculate
+    ) -> Tuple[str, Dict[str, Any]]:
+        """get_or_calculate with an async `calculate`, e.g. a ChartService *_async method"""
+        chart_id = self.chart_id(chart_type, params)
+        chart = self.get(chart_id)
+        if chart is None:
+            chart = await calculate(**params)
+            self.save(chart_type, params, chart)
+        return chart_id, chart
+
+    def find_by_subject(
+        self,
+        date_time: str,
+        latitude: float,
+        longitude: float,
+        house_system: Optional[str] = None,
+        chart_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """List stored charts (metadata only) for a subject's birth data"""
+        query = "SELECT id, chart_type, house_system, input, created_at FROM charts WHERE subject_key = ?"
+        args: List[Any] = [subject_key(date_time, latitude, longitude, self.COORDINATE_PRECISION)]
+        if house_system:
+            query += " AND house_system = ?"
+            args.append(house_system.lower())
+        if chart_type:
+            query += " AND chart_type = ?"
+            args.append(chart_type)
+        with self._lock:
+            rows = self._connect().execute(query, args).fetchall()
+        return [
+            {
+                "chart_id": row[0],
+                "chart_type": row[1],
+                "house_system": row[2],
+                "input": json.loads(row[3]),
+                "created_at": row[4],
+            }
+            for row in rows
+        ]
+
+    def iter_charts(self, chart_type: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (chart_id, chart) for every stored chart"""
+        query = "SELECT id, payload FROM charts"
+        args: List[Any] = []
+        if chart_type:
+            query += " WHERE chart_type = ?"
+            args.append(chart_type)
+        with self._lock:
+            rows = self._connect().execute(query, args).fetchall()
+        for chart_id, payload in rows:
+            yield chart_id, decode_payload(payload)
+
+    def import_charts(self, charts: Iterator[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Bulk-import chart dicts as produced by ChartService
+
+        Charts without `chart_type` and `input` cannot be keyed and are skipped.
+        """
+        imported = skipped = 0
+        rows = []
+        for chart in charts:
+            chart_type = chart.get("chart_type")
+            params = chart.get("input")
+            if not chart_type or not isinstance(params, dict):
+                skipped += 1
+                continue
+            try:
+                rows.append(self._row(chart_type, params, chart))
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+            imported += 1
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO charts VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+        return {"imported": imported, "skipped": skipped}
+
+    def import_file(self, path: str) -> Dict[str, int]:
+        """Import a JSON dump (single chart or list) or an NDJSON file"""
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+            charts = data if isinstance(data, list) else [data]
+        except json.JSONDecodeError:
+            charts = [json.loads(line) for line in text.splitlines() if line.strip()]
+        return self.import_charts(iter(charts))
+
+    def export_file(self, path: str, chart_type: Optional[str] = None) -> int:
+        """Export stored charts as NDJSON, one chart per line"""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for chart_id, chart in self.iter_charts(chart_type):
+                chart["chart_id"] = chart_id
+                f.write(json.dumps(chart, separators=(",", ":"), ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+
+# Singleton instance
+chart_store = ChartStore()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import or export stored charts")
+    parser.add_argument("--db", help="Database path (default: $CHART_STORE_PATH or charts.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import", help="Import JSON/NDJSON chart dumps")
+    import_cmd.add_argument("files", nargs="+")
+    export_cmd = commands.add_parser("export", help="Export charts as NDJSON")
+    export_cmd.add_argument("file")
+    export_cmd.add_argument("--chart-type")
+    args = parser.parse_args()
+
+    store = ChartStore(args.db) if args.db else chart_store
+    if args.command == "import":
+        for file in args.files:
+            result = store.import_file(file)
+            print(f"{file}: {result['imported']} imported, {result['skipped']} skipped")
+    else:
+        print(f"{store.export_file(args.file, args.chart_type)} charts exported to {args.file}")
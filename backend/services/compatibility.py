@@ -0,0 +1,266 @@
+"""
+Compatibility Service
+Ranks candidates against one or more subjects by batched synastry scoring
+over cached natal positions
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import calc
+from immanuel.const import chart as chart_const
+from immanuel.setup import settings
+
+from services import positions
+from services.aspects import AspectEngine, PositionSet
+from services.chart_store import subject_key
+from services.geo_resolver import geo_resolver
+from services.serialization import angle_raw
+
+
+# Bodies scored for compatibility, followed by the two angles
+BODIES: Tuple[int, ...] = (
+    chart_const.SUN,
+    chart_const.MOON,
+    chart_const.MERCURY,
+    chart_const.VENUS,
+    chart_const.MARS,
+    chart_const.JUPITER,
+    chart_const.SATURN,
+    chart_const.URANUS,
+    chart_const.NEPTUNE,
+    chart_const.PLUTO,
+    chart_const.TRUE_NORTH_NODE,
+)
+ANGLES: Tuple[int, ...] = (chart_const.ASC, chart_const.MC)
+OBJECTS = np.array(BODIES + ANGLES)
+
+# Angles move faster than any body, so they always act as the active object
+ANGLE_SPEED = 360.0
+
+# Contribution of an exact aspect; harmonious aspects add, hard ones subtract
+ASPECT_WEIGHTS: Dict[float, float] = {
+    calc.CONJUNCTION: 1.0,
+    calc.TRINE: 1.0,
+    calc.SEXTILE: 0.75,
+    calc.SQUARE: -0.5,
+    calc.OPPOSITION: -0.25,
+}
+
+# Relationship significance of each object (others weigh 1.0)
+OBJECT_WEIGHTS: Dict[int, float] = {
+    chart_const.SUN: 2.0,
+    chart_const.MOON: 2.0,
+    chart_const.VENUS: 2.0,
+    chart_const.MARS: 1.5,
+    chart_const.ASC: 1.5,
+}
+
+# Upper bound on pair-grid elements evaluated at once (subjects x candidates x objects²)
+MAX_GRID_ELEMENTS = 2_000_000
+
+CACHE_SIZE = 200_000
+
+# Uncached subjects calculated per pass; a cancelled request stops between
+# passes, keeping what it has calculated so far cached
+COLD_CHUNK = 1000
+
+
+class CompatibilityService:
+    """Batched synastry scoring with a cache of natal positions per subject"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        """Initialize service with an empty position cache"""
+        self.engine = AspectEngine(tuple(ASPECT_WEIGHTS))
+        object_weights = np.array([OBJECT_WEIGHTS.get(int(index), 1.0) for index in OBJECTS])
+        aspect_weights = np.array(list(ASPECT_WEIGHTS.values()))
+        # weights[k, i * n + j]: score of an exact aspect k between objects i and j,
+        # plus a zero layer for pairs without an aspect
+        pair_weights = np.outer(object_weights, object_weights).ravel()
+        self.weights = np.vstack([aspect_weights[:, None] * pair_weights, np.zeros(len(pair_weights))])
+        self._pairs = np.arange(len(pair_weights))
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Rankings run here, one at a time, off the event loop; the Swiss
+        # Ephemeris path is per thread, so the thread sets Immanuel's first
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="compatibility", initializer=settings.set_swe_filepath
+        )
+
+    def _store(self, items: Sequence[Tuple[str, np.ndarray, np.ndarray]]) -> None:
+        """Add (key, longitudes, speeds) to the cache, evicting the least recently used"""
+        with self._lock:
+            for key, lon, speed in items:
+                self._cache[key] = (lon, speed)
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def remember(self, subject: Tuple[str, float, float], chart: Dict[str, Any]) -> None:
+        """Cache the positions of a natal chart that has already been calculated"""
+        objects = {obj.get("index"): obj for obj in chart.get("objects", {}).values()}
+        if not all(int(index) in objects for index in OBJECTS):
+            return  # calculated without one of the scored objects
+        lon = np.array([angle_raw(objects[int(index)]["longitude"]) for index in OBJECTS], dtype=float)
+        speed = np.array(
+            [objects[int(index)].get("speed", 0.0) for index in BODIES] + [ANGLE_SPEED] * len(ANGLES),
+            dtype=float,
+        )
+        self._store([(subject_key(*subject), lon, speed)])
+
+    def natal_positions(
+        self,
+        subjects: Sequence[Tuple[str, float, float]],
+        cancelled: Optional[threading.Event] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Longitudes and speeds of OBJECTS for many subjects, shape (N, n_objects)
+
+        Cached subjects are reused; the rest are computed in batches of
+        COLD_CHUNK, stopping with CancelledError once `cancelled` is set.
+        """
+        keys = [subject_key(*subject) for subject in subjects]
+        lon = np.empty((len(subjects), len(OBJECTS)))
+        speed = np.empty((len(subjects), len(OBJECTS)))
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for row, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(row)
+                else:
+                    self._cache.move_to_end(key)
+                    lon[row], speed[row] = cached
+
+        groups = list(missing.items())
+        for start in range(0, len(groups), COLD_CHUNK):
+            if cancelled is not None and cancelled.is_set():
+                raise CancelledError()
+            chunk = groups[start:start + COLD_CHUNK]
+            computed_lon, computed_speed = self._calculate([subjects[group[0]] for _, group in chunk])
+            for (_, group), new_lon, new_speed in zip(chunk, computed_lon, computed_speed):
+                lon[group], speed[group] = new_lon, new_speed
+            self._store([(key, new_lon, new_speed) for (key, _), new_lon, new_speed
+                         in zip(chunk, computed_lon, computed_speed)])
+        return lon, speed
+
+    @staticmethod
+    def _calculate(subjects: Sequence[Tuple[str, float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of OBJECTS for subjects not in the cache"""
+        jds = np.array([resolution.julian_date for resolution in geo_resolver.resolve_many(subjects)])
+        body_lon, body_speed = positions.positions(BODIES, jds)
+        angles = np.empty((len(subjects), len(ANGLES)))
+        for row, ((_, latitude, longitude), jd) in enumerate(zip(subjects, jds)):
+            # Asc and MC do not depend on the house system
+            ascmc = swe.houses(float(jd), float(latitude), float(longitude), b"A")[1]
+            angles[row] = ascmc[0], ascmc[1]
+        lon = np.concatenate([body_lon.T, angles], axis=1)
+        speed = np.concatenate([body_speed.T, np.full(angles.shape, ANGLE_SPEED)], axis=1)
+        return lon, speed
+
+    def score(self, lon_a: np.ndarray, speed_a: np.ndarray,
+              lon_b: np.ndarray, speed_b: np.ndarray) -> np.ndarray:
+        """
+        Compatibility scores for every pairing, shape (N, M)
+
+        Each cross-aspect contributes its aspect weight times both objects'
+        weights, scaled by tightness (1 at exact, 0 at the edge of the orb).
+        """
+        found = self.engine.match(
+            PositionSet(OBJECTS, lon_a[:, None, :], speed_a[:, None, :]),
+            PositionSet(OBJECTS, lon_b[None, :, :], speed_b[None, :, :]),
+        )
+        tightness = 1.0 - np.abs(found.difference) / np.maximum(found.orb, 1e-9)
+        # Gather each pair's weight by aspect code; code NO_ASPECT (-1) wraps
+        # to the trailing all-zero layer
+        n = len(OBJECTS)
+        weights = self.weights[found.aspect.reshape(*found.aspect.shape[:2], n * n), self._pairs]
+        return (weights * tightness.reshape(weights.shape)).sum(axis=-1)
+
+    def top_matches(
+        self,
+        subjects: Sequence[Tuple[str, float, float]],
+        candidates: Sequence[Tuple[str, float, float]],
+        top_k: int = 10,
+        cancelled: Optional[threading.Event] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Best `top_k` candidates for each subject as (candidate index, score)
+
+        Candidates are scored in chunks sized to MAX_GRID_ELEMENTS, keeping
+        only a running top-K per subject, so memory stays bounded for any N×M.
+        Uncached positions are calculated in chunks; setting `cancelled`
+        stops the calculation after the current one.
+        """
+        lon_a, speed_a = self.natal_positions(subjects, cancelled)
+        lon_b, speed_b = self.natal_positions(candidates, cancelled)
+        top_k = min(top_k, len(candidates))
+        pairs = len(OBJECTS) ** 2
+        rows = max(1, min(len(subjects), MAX_GRID_ELEMENTS // pairs))
+        columns = max(1, MAX_GRID_ELEMENTS // (pairs * rows))
+
+        results = []
+        for row in range(0, len(subjects), rows):
+            best_index = np.empty((min(rows, len(subjects) - row), 0), dtype=int)
+            best_score = np.empty(best_index.shape)
+            for column in range(0, len(candidates), columns):
+                scores = self.score(
+                    lon_a[row:row + rows], speed_a[row:row + rows],
+                    lon_b[column:column + columns], speed_b[column:column + columns],
+                )
+                indices = np.broadcast_to(
+                    np.arange(column, column + scores.shape[1]), scores.shape
+                )
+                merged_score = np.concatenate([best_score, scores], axis=1)
+                merged_index = np.concatenate([best_index, indices], axis=1)
+                if merged_score.shape[1] > top_k:
+                    keep = np.argpartition(-merged_score, top_k - 1, axis=1)[:, :top_k]
+                    merged_score = np.take_along_axis(merged_score, keep, axis=1)
+                    merged_index = np.take_along_axis(merged_index, keep, axis=1)
+                best_score, best_index = merged_score, merged_index
+            order = np.argsort(-best_score, axis=1, kind="stable")
+            best_score = np.take_along_axis(best_score, order, axis=1)
+            best_index = np.take_along_axis(best_index, order, axis=1)
+            results.extend(
+                list(zip(indices.tolist(), scores.tolist()))
+                for indices, scores in zip(best_index, best_score)
+            )
+        return results
+
+    async def top_matches_async(
+        self,
+        subjects: Sequence[Tuple[str, float, float]],
+        candidates: Sequence[Tuple[str, float, float]],
+        top_k: int = 10,
+        timeout: Optional[float] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        top_matches in the service's own thread, keeping the event loop free
+
+        A cancelled caller (e.g. a disconnected client) or one past its
+        `timeout` stops the thread after the chunk of positions it is
+        calculating.
+        """
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(
+                self._executor, partial(self.top_matches, subjects, candidates, top_k, cancelled)
+            ), timeout)
+        finally:
+            cancelled.set()
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Size of the natal position cache"""
+        with self._lock:
+            return {"subjects": len(self._cache), "max_subjects": self.cache_size}
+
+
+# Singleton instance
+compatibility_service = CompatibilityService()
@@ -0,0 +1,239 @@
+"""
+Composite Service
+Midpoint (composite) charts built from cached natal positions, following
+Immanuel's midpoint rules, for single pairs or many pairs at once
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import chart as chart_const
+from immanuel.setup import settings
+from immanuel.tools import ephemeris
+
+from services import positions
+from services.aspects import AspectEngine, PositionSet, aspect_engine
+from services.chart_store import subject_key
+from services.geo_resolver import geo_resolver
+from services.serialization import angle_raw
+
+
+CACHE_SIZE = 50_000
+
+Subject = Tuple[str, float, float]
+
+
+class NatalPositions(NamedTuple):
+    """Everything a composite needs from one natal chart"""
+    julian_date: float
+    latitude: float
+    obliquity: float
+    armc: float
+    indices: np.ndarray
+    lon: np.ndarray
+    speed: np.ndarray
+    cusps: np.ndarray
+
+    @classmethod
+    def from_chart(cls, chart: Dict[str, Any]) -> "NatalPositions":
+        """Extract positions from a serialized full natal chart"""
+        native = chart["native"]
+        objects = list(chart["objects"].values())
+        houses = sorted(chart["houses"].values(), key=lambda house: house["number"])
+        jd = native["date_time"]["julian"]
+        latitude = angle_raw(native["coordinates"]["latitude"])
+        longitude = angle_raw(native["coordinates"]["longitude"])
+        return cls(
+            julian_date=jd,
+            latitude=latitude,
+            obliquity=ephemeris.earth_obliquity(jd),
+            armc=swe.houses(jd, latitude, longitude, b"A")[1][2],
+            indices=np.array([obj["index"] for obj in objects]),
+            lon=np.array([angle_raw(obj["longitude"]) for obj in objects], dtype=float),
+            speed=np.array([obj.get("speed", 0.0) for obj in objects], dtype=float),
+            cusps=np.array([angle_raw(house["longitude"]) for house in houses], dtype=float),
+        )
+
+
+def midpoints(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Midpoints of the shorter arcs between longitudes (as swe.deg_midp)"""
+    return np.mod(b + positions.angular_difference(a, b) / 2, 360.0)
+
+
+def declinations(lon: np.ndarray, obliquity: np.ndarray) -> np.ndarray:
+    """Declination of ecliptic longitudes with zero latitude"""
+    return np.degrees(np.arcsin(np.sin(np.radians(lon)) * np.sin(np.radians(obliquity))))
+
+
+class CompositeArrays(NamedTuple):
+    """Composite positions for N pairs: objects (N, n) and cusps (N, 12)"""
+    indices: np.ndarray
+    lon: np.ndarray
+    speed: np.ndarray
+    declination: np.ndarray
+    cusps: np.ndarray
+
+
+class CompositeService:
+    """Composite charts from an LRU cache of natal positions per subject"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE, engine: Optional[AspectEngine] = None):
+        """Initialize service with an empty position cache"""
+        self.engine = engine or aspect_engine
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, int], NatalPositions]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Batches run here, one at a time, off the event loop; the Swiss
+        # Ephemeris path is per thread, so the thread sets Immanuel's first
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="composite", initializer=settings.set_swe_filepath
+        )
+
+    def _store(self, key: Tuple[str, int], natal: NatalPositions) -> None:
+        """Add positions to the cache, evicting the least recently used"""
+        with self._lock:
+            self._cache[key] = natal
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def remember(self, subject: Subject, house_system: int, chart: Dict[str, Any]) -> NatalPositions:
+        """Cache the positions of a natal chart that has already been calculated"""
+        natal = NatalPositions.from_chart(chart)
+        self._store((subject_key(*subject), house_system), natal)
+        return natal
+
+    def natal_positions(self, subjects: Sequence[Subject], house_system: int) -> List[NatalPositions]:
+        """Positions of many subjects, from the cache or computed without a full chart"""
+        keys = [(subject_key(*subject), house_system) for subject in subjects]
+        results: List[Optional[NatalPositions]] = []
+        with self._lock:
+            for key in keys:
+                natal = self._cache.get(key)
+                if natal is not None:
+                    self._cache.move_to_end(key)
+                results.append(natal)
+
+        missing = [row for row, natal in enumerate(results) if natal is None]
+        if missing:
+            resolutions = geo_resolver.resolve_many([subjects[row] for row in missing])
+            for row, resolution in zip(missing, resolutions):
+                natal = self._calculate(resolution.julian_date, *subjects[row][1:], house_system)
+                self._store(keys[row], natal)
+                results[row] = natal
+        return results
+
+    @staticmethod
+    def _calculate(jd: float, latitude: float, longitude: float, house_system: int) -> NatalPositions:
+        """Ephemeris positions and house cusps of one subject, skipping chart assembly"""
+        objects = ephemeris.get_objects(
+            object_list=settings.objects,
+            jd=jd,
+            lat=latitude,
+            lon=longitude,
+            house_system=house_system,
+            part_formula=settings.part_formula,
+        )
+        houses = ephemeris.get_houses(jd=jd, lat=latitude, lon=longitude, house_system=house_system)
+        armc = ephemeris.get_angle(
+            index=chart_const.ARMC, jd=jd, lat=latitude, lon=longitude, house_system=house_system
+        )
+        return NatalPositions(
+            julian_date=jd,
+            latitude=latitude,
+            obliquity=ephemeris.earth_obliquity(jd),
+            armc=armc["lon"],
+            indices=np.array(list(objects)),
+            lon=np.array([obj["lon"] for obj in objects.values()], dtype=float),
+            speed=np.array([obj["speed"] for obj in objects.values()], dtype=float),
+            cusps=np.array([house["lon"] for house in houses.values()], dtype=float),
+        )
+
+    @staticmethod
+    def combine(first: Sequence[NatalPositions], second: Sequence[NatalPositions],
+                house_system: int) -> CompositeArrays:
+        """
+        Midpoint positions for many pairs in one set of array operations
+
+        Objects and cusps take the midpoint of the shorter arc and the mean
+        speed; declinations use the mean obliquity of both dates. Whole sign
+        houses are cast from the midpoint ARMC at the mean latitude instead.
+        """
+        indices = first[0].indices
+        for natal in (*first, *second):
+            if not np.array_equal(natal.indices, indices):
+                raise ValueError("Natal positions were computed for different object lists")
+
+        def stack(field: str, charts: Sequence[NatalPositions]) -> np.ndarray:
+            return np.array([getattr(natal, field) for natal in charts], dtype=float)
+
+        obliquity = (stack("obliquity", first) + stack("obliquity", second)) / 2
+        lon = midpoints(stack("lon", first), stack("lon", second))
+        speed = (stack("speed", first) + stack("speed", second)) / 2
+        if house_system == chart_const.WHOLE_SIGN:
+            armc = midpoints(stack("armc", first), stack("armc", second))
+            latitude = (stack("latitude", first) + stack("latitude", second)) / 2
+            cusps = np.array([
+                swe.houses_armc(float(a), float(lat), float(eps), b"W")[0][:12]
+                for a, lat, eps in zip(armc, latitude, obliquity)
+            ])
+        else:
+            cusps = midpoints(stack("cusps", first), stack("cusps", second))
+        return CompositeArrays(
+            indices=indices,
+            lon=lon,
+            speed=speed,
+            declination=declinations(lon, obliquity[:, None]),
+            cusps=cusps,
+        )
+
+    def _to_dict(self, arrays: CompositeArrays, row: int, aspects: bool) -> Dict[str, Any]:
+        """Serialize one composite from the batch arrays"""
+        lon, speed = arrays.lon[row], arrays.speed[row]
+        chart = positions.compact_chart(
+            arrays.indices, lon, speed, arrays.cusps[row], arrays.declination[row]
+        )
+        if aspects:
+            chart["aspects"] = self.engine.natal(PositionSet(arrays.indices, lon, speed))
+        return chart
+
+    def composites(
+        self,
+        pairs: Sequence[Tuple[Subject, Subject]],
+        house_system: int,
+        aspects: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Composite charts for many (person1, person2) pairs
+
+        Natal positions are looked up once per distinct subject, so a person
+        appearing in many pairs costs a single ephemeris pass.
+        """
+        if not pairs:
+            return []
+        natal = self.natal_positions([subject for pair in pairs for subject in pair], house_system)
+        arrays = self.combine(natal[0::2], natal[1::2], house_system)
+        return [self._to_dict(arrays, row, aspects) for row in range(len(pairs))]
+
+    async def composites_async(
+        self,
+        pairs: Sequence[Tuple[Subject, Subject]],
+        house_system: int,
+        aspects: bool = True
+    ) -> List[Dict[str, Any]]:
+        """composites in the service's own thread, keeping the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.composites, pairs, house_system, aspects)
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Size of the natal position cache"""
+        with self._lock:
+            return {"subjects": len(self._cache), "max_subjects": self.cache_size}
+
+
+# Singleton instance
+composite_service = CompositeService()
@@ -0,0 +1,256 @@
+"""
+Interpolated Ephemeris Table
+Precomputed geocentric longitudes at fixed intervals, stored as memory-mapped
+arrays and evaluated with four-point cubic (Lagrange) interpolation
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from immanuel.const import chart as chart_const
+
+
+# Sample interval in days per object; fast or wobbly bodies need finer grids
+DEFAULT_STEPS: Dict[int, float] = {
+    chart_const.SUN: 4.0,
+    chart_const.MOON: 0.25,
+    chart_const.MERCURY: 0.5,
+    chart_const.VENUS: 1.0,
+    chart_const.MARS: 2.0,
+    chart_const.JUPITER: 4.0,
+    chart_const.SATURN: 4.0,
+    chart_const.URANUS: 2.0,
+    chart_const.NEPTUNE: 2.0,
+    chart_const.PLUTO: 4.0,
+    chart_const.CHIRON: 4.0,
+    chart_const.CERES: 2.0,
+    chart_const.PALLAS: 2.0,
+    chart_const.JUNO: 2.0,
+    chart_const.VESTA: 2.0,
+    chart_const.TRUE_NORTH_NODE: 0.5,
+    chart_const.NORTH_NODE: 8.0,
+    chart_const.TRUE_LILITH: 0.25,
+    chart_const.LILITH: 8.0,
+}
+
+# Objects whose interpolation error exceeds this (degrees) are left out of the
+# table. The Swiss Ephemeris output itself jumps by a few arcseconds between
+# the internal segments of its files (up to ~5" for Uranus), so a tighter
+# bound only rejects objects whose interpolation error is already below that.
+DEFAULT_TOLERANCE = 6.0 / 3600.0
+
+DEFAULT_SPAN = (1900, 2100)
+
+
+def _year_jd(year: int) -> float:
+    """Julian date of January 1st of a year, 0h UT"""
+    import swisseph as swe
+    return swe.julday(year, 1, 1, 0.0)
+
+
+def interpolate(lon: np.ndarray, start: float, step: float,
+                jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cubic interpolation through the four samples around each date
+
+    Longitudes are unwrapped relative to the sample preceding each date, so
+    an object crossing 0° Aries interpolates correctly. Speeds are the
+    derivative of the same polynomial.
+    """
+    t = (jds - start) / step
+    i = np.clip(np.floor(t).astype(int), 1, len(lon) - 3)
+    u = t - i
+    p0 = lon[i]
+    pm, p1, p2 = (p0 + np.mod(lon[i + k] - p0 + 180.0, 360.0) - 180.0 for k in (-1, 1, 2))
+    u2 = u * u
+    value = (
+        -u * (u - 1) * (u - 2) / 6 * pm
+        + (u + 1) * (u - 1) * (u - 2) / 2 * p0
+        - (u + 1) * u * (u - 2) / 2 * p1
+        + (u + 1) * u * (u - 1) / 6 * p2
+    )
+    slope = (
+        -(3 * u2 - 6 * u + 2) / 6 * pm
+        + (3 * u2 - 4 * u - 1) / 2 * p0
+        - (3 * u2 - 2 * u - 2) / 2 * p1
+        + (3 * u2 - 1) / 6 * p2
+    ) / step
+    return np.mod(value, 360.0), slope
+
+
+class EphemerisTable:
+    """Memory-mapped longitude/speed table, loaded lazily from a directory"""
+
+    META_FILE = "meta.json"
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the table (nothing is read until the first lookup)"""
+        self.path = path or os.getenv("EPHEMERIS_TABLE_PATH", "ephemeris_table")
+        self._meta: Optional[Dict[int, Dict]] = None
+        self._arrays: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _objects(self) -> Dict[int, Dict]:
+        """Per-object metadata, or an empty dict if no table has been built"""
+        if self._meta is None:
+            with self._lock:
+                if self._meta is None:
+                    meta_path = os.path.join(self.path, self.META_FILE)
+                    meta = {}
+                    if os.path.exists(meta_path):
+                        with open(meta_path, "r", encoding="utf-8") as f:
+                            meta = {int(index): info for index, info in json.load(f)["objects"].items()}
+                    self._meta = meta
+        return self._meta
+
+    def _array(self, index: int) -> np.ndarray:
+        """Sampled longitudes of one object as a memory-mapped array"""
+        array = self._arrays.get(index)
+        if array is None:
+            array = np.load(os.path.join(self.path, f"{index}.npy"), mmap_mode="r")
+            self._arrays[index] = array
+        return array
+
+    def reload(self) -> None:
+        """Forget loaded metadata and arrays (after a rebuild)"""
+        with self._lock:
+            self._meta = None
+            self._arrays = {}
+
+    def covers(self, index: int, jds: np.ndarray) -> bool:
+        """Whether every Julian date lies inside the table span for an object"""
+        info = self._objects().get(index)
+        if info is None or len(jds) == 0:
+            return False
+        # The first and last intervals lack a neighbouring sample
+        return bool(info["start"] + info["step"] <= jds.min() and jds.max() <= info["end"] - info["step"])
+
+    def longitudes(self, index: int, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolated (longitudes, speeds) for dates inside the table span"""
+        info = self._objects()[index]
+        return interpolate(self._array(index), info["start"], info["step"], jds)
+
+    def info(self) -> Dict[int, Dict]:
+        """Span, step, validated error and measured speedup of each tabulated object"""
+        return dict(self._objects())
+
+
+def _sample(index: int, start: float, end: float, step: float) -> np.ndarray:
+    """Evaluate an object on the table grid with the Swiss Ephemeris"""
+    from services.positions import swe_longitudes
+
+    count = int(np.ceil((end - start) / step)) + 1
+    jds = start + step * np.arange(count)
+    return swe_longitudes(index, jds)[0]
+
+
+def _validate(index: int, samples: np.ndarray, start: float, step: float,
+              checks: int, rng: np.random.Generator) -> Tuple[float, float]:
+    """
+    Maximum longitude error against the Swiss Ephemeris at random dates,
+    and the speedup of the table lookup over direct evaluation
+    """
+    from services.positions import angular_difference, swe_longitudes
+
+    end = start + step * (len(samples) - 2)
+    jds = rng.uniform(start + step, end, checks)
+    began = time.perf_counter()
+    expected, _ = swe_longitudes(index, jds)
+    swe_time = time.perf_counter() - began
+    began = time.perf_counter()
+    actual, _ = interpolate(samples, start, step, jds)
+    table_time = time.perf_counter() - began
+    error = float(np.abs(angular_difference(actual, expected)).max())
+    return error, swe_time / table_time
+
+
+def build(
+    path: str,
+    start_year: int = DEFAULT_SPAN[0],
+    end_year: int = DEFAULT_SPAN[1],
+    objects: Optional[Iterable[int]] = None,
+    steps: Optional[Dict[int, float]] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+    checks: int = 20000,
+    log=print,
+) -> Dict[int, Dict]:
+    """
+    Build the table for a span of years and validate every object
+
+    Objects whose interpolation error exceeds `tolerance` degrees are
+    reported and left out, so lookups for them use the full ephemeris.
+    """
+    from immanuel.setup import settings
+    from services.positions import SWE_BODIES, object_name
+
+    settings.set_swe_filepath()
+    steps = {**DEFAULT_STEPS, **(steps or {})}
+    objects = list(objects) if objects is not None else list(SWE_BODIES)
+    start, end = _year_jd(start_year), _year_jd(end_year + 1)
+    rng = np.random.default_rng(0)
+    os.makedirs(path, exist_ok=True)
+
+    table: Dict[int, Dict] = {}
+    for index in objects:
+        step = steps.get(index, 1.0)
+        # One spare sample on each side keeps the whole span interpolable
+        samples = _sample(index, start - step, end + step, step)
+        error, speedup = _validate(index, samples, start - step, step, checks, rng)
+        accepted = error <= tolerance
+        log(
+            f"{object_name(index):16s} step {step:6.3f} d  {len(samples):7d} samples  "
+            f"max error {error * 3600:8.4f}\"  batch speedup {speedup:6.1f}x"
+            + ("" if accepted else "  (rejected)")
+        )
+        if not accepted:
+            continue
+        np.save(os.path.join(path, f"{index}.npy"), samples)
+        table[index] = {
+            "name": object_name(index),
+            "start": start - step,
+            "end": start + step * (len(samples) - 2),
+            "step": step,
+            "max_error": error,
+            "speedup": round(speedup, 1),
+        }
+
+    meta = {
+        "span": [start_year, end_year],
+        "tolerance": tolerance,
+        "objects": {str(index): info for index, info in table.items()},
+    }
+    with open(os.path.join(path, EphemerisTable.META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return table
+
+
+# Singleton instance
+ephemeris_table = EphemerisTable()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or inspect the interpolated ephemeris table")
+    parser.add_argument("--path", help="Table directory (default: $EPHEMERIS_TABLE_PATH or ephemeris_table)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="Precompute and validate the table")
+    build_cmd.add_argument("--start-year", type=int, default=DEFAULT_SPAN[0])
+    build_cmd.add_argument("--end-year", type=int, default=DEFAULT_SPAN[1])
+    build_cmd.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE * 3600,
+                           help="Maximum accepted error in arcseconds (default: 6)")
+    commands.add_parser("info", help="Show the tabulated objects")
+    args = parser.parse_args()
+
+    table = EphemerisTable(args.path) if args.path else ephemeris_table
+    if args.command == "build":
+        build(table.path, args.start_year, args.end_year, tolerance=args.tolerance / 3600)
+    else:
+        for index, info in table.info().items():
+            print(
+                f"{info['name']:16s} step {info['step']:6.3f} d  "
+                f"max error {info['max_error'] * 3600:8.4f}\"  batch speedup {info['speedup']:6.1f}x"
+            )
@@ -0,0 +1,163 @@
+"""
+Fragment Library
+Interpretation snippets per placement ("Sun in Capricorn in the 11th House")
+and per aspect ("Moon Square Saturn"), generated once per language and
+stored in SQLite so readings can be assembled without regenerating them
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+
+# Objects that get fragments, in reading order; aspect pairs follow it too
+FRAGMENT_OBJECTS = [
+    "Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
+    "Uranus", "Neptune", "Pluto", "Chiron", "True North Node", "Asc", "MC",
+]
+
+# Angles always sit on their own cusp, so their fragments omit the house
+ANGLES = ("Asc", "MC")
+
+MAJOR_ASPECTS = ("Conjunction", "Opposition", "Square", "Trine", "Sextile")
+
+
+def ordinal(number: int) -> str:
+    """1 -> '1st', 11 -> '11th'"""
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def _name(value: Any) -> Optional[str]:
+    """Name from a serialized {name: ...} block or a plain string"""
+    if isinstance(value, dict):
+        return value.get("name")
+    return value if isinstance(value, str) else None
+
+
+def _number(value: Any) -> Optional[int]:
+    """Number from a serialized {number: ...} block or a plain int"""
+    if isinstance(value, dict):
+        return value.get("number")
+    return value if isinstance(value, int) else None
+
+
+class FragmentLibrary:
+    """Placement keys of a chart and the stored fragments for them"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS fragments (
+            placement TEXT NOT NULL,
+            language TEXT NOT NULL,
+            text TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (placement, language)
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize fragment library (the database is opened lazily)"""
+        self.path = path or os.getenv("FRAGMENT_STORE_PATH", "fragments.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def placements(chart_data: Dict[str, Any]) -> Dict[str, List[str]]:
+        """
+        Placement keys of a chart: {"objects": [...], "aspects": [...]}
+
+        Keys are the readable placement itself, so they double as prompt
+        text. Aspect keys name the pair in FRAGMENT_OBJECTS order, making
+        "Moon Square Saturn" and "Saturn Square Moon" one fragment.
+        """
+        order = {name: position for position, name in enumerate(FRAGMENT_OBJECTS)}
+        names: Dict[str, str] = {}
+        objects: Dict[str, str] = {}
+        for key, obj in chart_data.get("objects", {}).items():
+            name = _name(obj) if isinstance(obj, dict) else None
+            if name is None:
+                continue
+            names[str(obj.get("index", key))] = name
+            sign, house = _name(obj.get("sign")), _number(obj.get("house"))
+            if name not in order or sign is None:
+                continue
+            if name in ANGLES or house is None:
+                objects[name] = f"{name} in {sign}"
+            else:
+                objects[name] = f"{name} in {sign} in the {ordinal(house)} House"
+
+        aspects = set()
+        for active_key, entry in chart_data.get("aspects", {}).items():
+            if not isinstance(entry, dict):
+                continue
+            # Flat {id: aspect} or Immanuel's nested {active: {passive: aspect}}
+            items = [entry] if "active" in entry else [item for item in entry.values() if isinstance(item, dict)]
+            for aspect in items:
+                pair = []
+                for end in (aspect.get("active"), aspect.get("passive")):
+                    end = end.get("index", end.get("name")) if isinstance(end, dict) else end
+                    pair.append(names.get(str(end), str(end)))
+                aspect_type = _name(aspect.get("type"))
+                if aspect_type not in MAJOR_ASPECTS or not all(name in order for name in pair):
+                    continue
+                first, second = sorted(pair, key=order.get)
+                aspects.add((order[first], order[second], f"{first} {aspect_type} {second}"))
+
+        return {
+            "objects": [objects[name] for name in FRAGMENT_OBJECTS if name in objects],
+            "aspects": [key for _, _, key in sorted(aspects)],
+        }
+
+    def get_many(self, placements: Iterable[str], language: str) -> Dict[str, str]:
+        """Stored fragments for the given placements"""
+        placements = list(placements)
+        if not placements:
+            return {}
+        with self._lock:
+            conn = self._connect()
+            rows = []
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(placements), 500):
+                chunk = placements[start:start + 500]
+                rows += conn.execute(
+                    f"SELECT placement, text FROM fragments WHERE language = ?"
+                    f" AND placement IN ({', '.join('?' for _ in chunk)})",
+                    (language, *chunk),
+                ).fetchall()
+        return dict(rows)
+
+    def put_many(self, fragments: Dict[str, str], language: str) -> None:
+        """Store fragments, replacing existing ones"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO fragments VALUES (?, ?, ?, ?)",
+                [(placement, language, text, now) for placement, text in fragments.items()],
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of stored fragments per language"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT language, COUNT(*) FROM fragments GROUP BY language"
+            ).fetchall()
+        return {"path": self.path, "fragments": dict(rows)}
+
+
+# Singleton instance
+fragment_library = FragmentLibrary()
@@ -0,0 +1,160 @@
+"""
+Geo Resolver - cached timezone and Julian day resolution for birth data
+Replaces Immanuel's per-subject timezone polygon lookup with a grid index
+built once, plus memoized (location, local time) -> UTC offset / Julian day
+"""
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from immanuel.tools import date
+from timezonefinder import TimezoneFinder
+from timezonefinder.global_settings import NR_SHORTCUTS_PER_LAT, NR_SHORTCUTS_PER_LNG
+
+
+# Grid cells match timezonefinder's shortcut layout, so a zone that is unique
+# at a cell's centre is the zone for every point in the cell
+GRID_LAT_STEP = 1.0 / NR_SHORTCUTS_PER_LAT
+GRID_LON_STEP = 1.0 / NR_SHORTCUTS_PER_LNG
+
+COORDINATE_PRECISION = 4
+
+CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    """
+    Timezone by name, loaded once
+
+    ZoneInfo keeps only its 8 most recent zones alive, so batches spanning
+    more zones would re-read the tz database for nearly every subject.
+    """
+    return ZoneInfo(name)
+
+
+class Resolution(NamedTuple):
+    """Timezone, UTC offset (hours) and Julian day of a local birth time"""
+    timezone: Optional[str]
+    utc_offset: float
+    julian_date: float
+
+
+class GeoResolver:
+    """Timezone lookups over a precomputed grid, with exact-point fallback"""
+
+    def __init__(self):
+        """Initialize resolver (the grid is built on first use or by build_index)"""
+        self._finder: Optional[TimezoneFinder] = None
+        self._grid: Optional[np.ndarray] = None
+        self._zones: List[str] = []
+        self._lock = threading.Lock()
+
+    def build_index(self) -> None:
+        """Load the timezone polygons and map every grid cell with a single zone"""
+        with self._lock:
+            if self._grid is not None:
+                return
+            finder = TimezoneFinder(in_memory=True)
+            rows = int(round(180.0 / GRID_LAT_STEP))
+            columns = int(round(360.0 / GRID_LON_STEP))
+            grid = np.full((rows, columns), -1, dtype=np.int16)
+            zone_ids: Dict[str, int] = {}
+            for row in range(rows):
+                lat = -90.0 + (row + 0.5) * GRID_LAT_STEP
+                for column in range(columns):
+                    lon = -180.0 + (column + 0.5) * GRID_LON_STEP
+                    zone = finder.unique_timezone_at(lng=lon, lat=lat)
+                    if zone is not None:
+                        grid[row, column] = zone_ids.setdefault(zone, len(zone_ids))
+            self._zones = list(zone_ids)
+            self._finder = finder
+            self._grid = grid
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Grid cell of a coordinate"""
+        row = int((latitude + 90.0) / GRID_LAT_STEP)
+        column = int((longitude + 180.0) / GRID_LON_STEP)
+        return min(row, self._grid.shape[0] - 1), min(column, self._grid.shape[1] - 1)
+
+    def timezone_at(self, latitude: float, longitude: float) -> Optional[str]:
+        """IANA timezone name for a coordinate"""
+        if self._grid is None:
+            self.build_index()
+        zone_id = self._grid[self._cell(latitude, longitude)]
+        if zone_id >= 0:
+            return self._zones[zone_id]
+        # Cell straddles a border: exact polygon test, memoized per rounded point
+        return self._exact_timezone(
+            round(float(latitude), COORDINATE_PRECISION),
+            round(float(longitude), COORDINATE_PRECISION),
+        )
+
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _exact_timezone(self, latitude: float, longitude: float) -> Optional[str]:
+        """Point-in-polygon timezone lookup"""
+        return self._finder.timezone_at(lng=longitude, lat=latitude)
+
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _localize(self, date_time: str, timezone: Optional[str]) -> Resolution:
+        """Resolve a normalized local date/time in a timezone"""
+        local = datetime.fromisoformat(date_time)
+        if timezone is not None:
+            local = local.replace(tzinfo=_zone(timezone))
+        offset = local.utcoffset()
+        return Resolution(
+            timezone=timezone,
+            utc_offset=offset.total_seconds() / 3600.0 if offset is not None else 0.0,
+            julian_date=date.to_jd(local),
+        )
+
+    @staticmethod
+    def _normalize(date_time: str) -> str:
+        """Canonical ISO form of a local date/time"""
+        return datetime.fromisoformat(str(date_time).strip()).isoformat(timespec="seconds")
+
+    def resolve(self, date_time: str, latitude: float, longitude: float) -> Resolution:
+        """Timezone, UTC offset and Julian day for a local date/time at a location"""
+        return self._localize(self._normalize(date_time), self.timezone_at(latitude, longitude))
+
+    def resolve_many(self, subjects: Iterable[Tuple[str, float, float]]) -> List[Resolution]:
+        """
+        Resolve many (date_time, latitude, longitude) triples
+
+        Grid cells for all coordinates are looked up in one array operation;
+        only points on timezone borders need an individual polygon test.
+        """
+        subjects = list(subjects)
+        if not subjects:
+            return []
+        if self._grid is None:
+            self.build_index()
+        coordinates = np.array([(lat, lon) for _, lat, lon in subjects], dtype=float)
+        rows = np.minimum(
+            ((coordinates[:, 0] + 90.0) / GRID_LAT_STEP).astype(int), self._grid.shape[0] - 1
+        )
+        columns = np.minimum(
+            ((coordinates[:, 1] + 180.0) / GRID_LON_STEP).astype(int), self._grid.shape[1] - 1
+        )
+        results = []
+        for (date_time, lat, lon), zone_id in zip(subjects, self._grid[rows, columns]):
+            timezone = self._zones[zone_id] if zone_id >= 0 else self._exact_timezone(
+                round(float(lat), COORDINATE_PRECISION), round(float(lon), COORDINATE_PRECISION)
+            )
+            results.append(self._localize(self._normalize(date_time), timezone))
+        return results
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the memoized lookups"""
+        return {
+            "grid_cells": int((self._grid >= 0).sum()) if self._grid is not None else 0,
+            "exact": self._exact_timezone.cache_info()._asdict(),
+            "localize": self._localize.cache_info()._asdict(),
+        }
+
+
+# Singleton instance
+geo_resolver = GeoResolver()
@@ -0,0 +1,187 @@
+"""
+HTTP Caching and Compression
+Content-negotiated compression (zstd, brotli, gzip) and strong ETags for
+chart responses. Stored charts are immutable for their inputs, so their ETag
+is derived from the chart ID and a matching If-None-Match is answered with
+304 before anything is loaded or calculated.
+"""
+import asyncio
+import gzip
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+# Levels favour latency: a natal chart compresses in a few milliseconds
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+# Part of every chart ETag; change it to invalidate cached charts after a
+# change to the calculation or the response format
+ETAG_VERSION = os.getenv("CHART_ETAG_VERSION", "1")
+
+CHART_CACHE_CONTROL = os.getenv("CHART_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Available encodings, in order of preference"""
+    table: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        # Compressor objects are not thread-safe; they are cheap to create
+        table["zstd"] = lambda body: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if brotli is not None:
+        table["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+    table["gzip"] = lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0)
+    return table
+
+
+COMPRESSORS = _compressors()
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Encoding to use for an Accept-Encoding header, or None for identity
+
+    The highest q-value wins; ties go to the order of COMPRESSORS.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in COMPRESSORS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def chart_etag(chart_id: str) -> str:
+    """ETag of a stored chart, without quotes or encoding suffix"""
+    return f"{chart_id}.{ETAG_VERSION}"
+
+
+def _etag_header(chart_id: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one encoding of a chart"""
+    tag = chart_etag(chart_id)
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def etag_matches(request: Request, chart_id: str) -> bool:
+    """Whether If-None-Match names the chart in any encoding"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tag = chart_etag(chart_id)
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        candidate = candidate.removeprefix("W/").strip('"')
+        if candidate.split("-", 1)[0] == tag:
+            return True
+    return False
+
+
+def _chart_headers(request: Request, chart_id: str, encoding: Optional[str]) -> Dict[str, str]:
+    """Caching headers of a stored chart's response"""
+    return {
+        "ETag": _etag_header(chart_id, encoding),
+        "Cache-Control": CHART_CACHE_CONTROL,
+        "Content-Location": request.url_for("get_stored_chart", chart_id=chart_id).path,
+        "Vary": "Accept-Encoding",
+    }
+
+
+def not_modified(request: Request, chart_id: str) -> Optional[Response]:
+    """A 304 response when the client already holds this chart, else None"""
+    if not etag_matches(request, chart_id):
+        return None
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    return Response(status_code=304, headers=_chart_headers(request, chart_id, encoding))
+
+
+def json_response(request: Request, content: Any, chart_id: Optional[str] = None) -> Response:
+    """
+    JSON response compressed for the client
+
+    With a `chart_id` the response also carries the chart's ETag,
+    Cache-Control and Content-Location (its GET URL), so caches can reuse
+    it for later requests of the same chart.
+    """
+    body = json.dumps(content, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+    return encoded_json_response(request, body, chart_id)
+
+
+def _encode_json(content: Any, depth: int = 2) -> bytes:
+    """
+    The bytes json_response sends, encoded one list item or dict value at
+    a time down to `depth` levels
+
+    A single json.dumps holds the GIL until it is done (about a second for
+    25 MB); encoded piecewise in a thread, the event loop gets to run
+    between pieces.
+    """
+    if depth > 0 and isinstance(content, dict) and all(isinstance(key, str) for key in content):
+        return b"{" + b",".join(
+            _encode_json(key, 0) + b":" + _encode_json(value, depth - 1) for key, value in content.items()
+        ) + b"}"
+    if depth > 0 and isinstance(content, list):
+        return b"[" + b",".join(_encode_json(item, depth - 1) for item in content) + b"]"
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+
+
+async def json_response_async(request: Request, content: Any, chart_id: Optional[str] = None) -> Response:
+    """
+    json_response encoded and compressed in a thread
+
+    For bodies of many megabytes (bulk and multi-chart responses), whose
+    serialization would otherwise stall the event loop.
+    """
+    return await asyncio.to_thread(
+        lambda: encoded_json_response(request, _encode_json(content), chart_id)
+    )
+
+
+def encoded_json_response(request: Request, body: bytes, chart_id: Optional[str] = None) -> Response:
+    """json_response for a body that is already serialized"""
+    encoding = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            body = COMPRESSORS[encoding](body)
+    if chart_id is not None:
+        headers = _chart_headers(request, chart_id, encoding)
+    else:
+        headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
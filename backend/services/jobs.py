@@ -0,0 +1,381 @@
+"""
+Job Queue
+In-process background jobs persisted in SQLite: separate worker lanes for
+LLM and CPU work, priorities, retries with backoff, and recovery of jobs
+interrupted by a restart
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Awaitable, Callable, List, NamedTuple, Optional, Tuple
+
+from services.chart_store import decode_payload, encode_payload
+from services.workers import CHART_WORKERS
+
+
+# Concurrent jobs per lane
+LANES: Dict[str, int] = {
+    "llm": int(os.getenv("JOB_LLM_WORKERS", "2")),
+    "cpu": int(os.getenv("JOB_CPU_WORKERS", str(CHART_WORKERS))),
+}
+
+# Lower values run first within a lane
+PRIORITIES: Dict[str, int] = {"high": 0, "normal": 1, "low": 2}
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Finished jobs are deleted after this many seconds
+JOB_TTL = float(os.getenv("JOB_TTL", "86400"))
+
+# Longest sleep of an idle worker before it re-checks for delayed retries
+POLL_INTERVAL = 1.0
+
+
+class RetryableJobError(Exception):
+    """A transient failure; the job is retried according to its policy"""
+
+
+class RetryPolicy(NamedTuple):
+    """How often and how soon a failed job is retried"""
+    max_attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    retry_on: Tuple[type, ...] = (RetryableJobError,)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before the next attempt, doubling per attempt"""
+        return min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+
+
+class JobType(NamedTuple):
+    """A registered job kind"""
+    lane: str
+    handler: Callable[[Dict[str, Any]], Awaitable[Any]]
+    retry: RetryPolicy
+
+
+class JobStore:
+    """SQLite persistence for jobs"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            lane TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            params TEXT NOT NULL,
+            result BLOB,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_queue
+            ON jobs (lane, status, priority, run_after, created_at);
+    """
+
+    COLUMNS = (
+        "id", "kind", "lane", "priority", "status", "params", "result", "error",
+        "attempts", "max_attempts", "run_after", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize job store (the database is opened lazily)"""
+        self.path = path or os.getenv("JOB_STORE_PATH", "jobs.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, query: str, args: tuple = ()) -> List[tuple]:
+        """Run one statement and commit"""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(query, args).fetchall()
+            conn.commit()
+        return rows
+
+    def insert(self, kind: str, lane: str, priority: int, params: Dict[str, Any], max_attempts: int) -> str:
+        """Queue a new job and return its ID"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, kind, lane, priority, status, params, max_attempts, run_after, created_at)"
+            " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, lane, priority, json.dumps(params), max_attempts, now, now),
+        )
+        return job_id
+
+    def claim(self, lane: str) -> Optional[Dict[str, Any]]:
+        """Atomically mark the next due job of a lane as running and return it"""
+        rows = self._execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?"
+            " WHERE id = (SELECT id FROM jobs WHERE lane = ? AND status = 'queued' AND run_after <= ?"
+            " ORDER BY priority, run_after, created_at LIMIT 1)"
+            f" RETURNING {', '.join(self.COLUMNS)}",
+            (time.time(), lane, time.time()),
+        )
+        return self._to_dict(rows[0]) if rows else None
+
+    def next_run_after(self, lane: str) -> Optional[float]:
+        """Earliest run_after among a lane's queued jobs"""
+        rows = self._execute("SELECT MIN(run_after) FROM jobs WHERE lane = ? AND status = 'queued'", (lane,))
+        return rows[0][0]
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        """Record a job's final outcome"""
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, encode_payload(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    def retry(self, job_id: str, run_after: float, error: str) -> None:
+        """Put a failed job back in the queue"""
+        self._execute(
+            "UPDATE jobs SET status = 'queued', error = ?, run_after = ? WHERE id = ?",
+            (error, run_after, job_id),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started; returns whether it was cancelled"""
+        rows = self._execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued' RETURNING id",
+            (time.time(), job_id),
+        )
+        return bool(rows)
+
+    def requeue_running(self, refund: bool = False) -> int:
+        """
+        Return jobs interrupted by a shutdown or crash to the queue
+
+        After a crash the interrupted attempt counts, and jobs out of
+        attempts fail; after a clean shutdown (`refund`) it is given back.
+        """
+        if refund:
+            rows = self._execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1 WHERE status = 'running' RETURNING id"
+            )
+            return len(rows)
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted', finished_at = ?"
+            " WHERE status = 'running' AND attempts >= max_attempts",
+            (time.time(),),
+        )
+        rows = self._execute("UPDATE jobs SET status = 'queued' WHERE status = 'running' RETURNING id")
+        return len(rows)
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs that ended before a timestamp"""
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        rows = self._execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND finished_at < ? RETURNING id",
+            (*TERMINAL_STATUSES, older_than),
+        )
+        return len(rows)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load a job by ID"""
+        rows = self._execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of jobs per lane and status"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for lane, status, count in self._execute("SELECT lane, status, COUNT(*) FROM jobs GROUP BY lane, status"):
+            counts.setdefault(lane, {})[status] = count
+        return counts
+
+    def _to_dict(self, row: tuple) -> Dict[str, Any]:
+        """Job row as a dict with decoded params and result"""
+        job = dict(zip(self.COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = decode_payload(job["result"]) if job["result"] is not None else None
+        return job
+
+
+class JobQueue:
+    """Registered job kinds, lane workers and completion notifications"""
+
+    def __init__(self, store: Optional[JobStore] = None, lanes: Optional[Dict[str, int]] = None):
+        """Initialize queue (workers start with start())"""
+        self.store = store or JobStore()
+        self.lanes = dict(lanes or LANES)
+        self._types: Dict[str, JobType] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+
+    def register(self, kind: str, lane: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 retry: Optional[RetryPolicy] = None) -> None:
+        """Register an async handler for a job kind"""
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown lane: {lane}")
+        self._types[kind] = JobType(lane, handler, retry or RetryPolicy())
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: str = "normal") -> str:
+        """Queue a job and return its ID"""
+        job_type = self._types.get(kind)
+        if job_type is None:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        job_id = self.store.insert(
+            kind, job_type.lane, PRIORITIES[priority], params, job_type.retry.max_attempts
+        )
+        if job_type.lane in self._wakeups:
+            self._wakeups[job_type.lane].set()
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job"""
+        cancelled = self.store.cancel(job_id)
+        if cancelled:
+            self._notify()
+        return cancelled
+
+    async def start(self) -> None:
+        """Recover interrupted jobs, purge expired ones and start the lane workers"""
+        if self._workers:
+            return
+        self.store.requeue_running()
+        self.store.purge(time.time() - JOB_TTL)
+        self._changed = asyncio.Condition()
+        for lane, concurrency in self.lanes.items():
+            self._wakeups[lane] = asyncio.Event()
+            self._wakeups[lane].set()
+            self._workers.extend(
+                asyncio.create_task(self._work(lane)) for _ in range(max(1, concurrency))
+            )
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are requeued"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeups = {}
+        self.store.requeue_running(refund=True)
+
+    async def _work(self, lane: str) -> None:
+        """Worker loop: claim due jobs of a lane and run them"""
+        wakeup = self._wakeups[lane]
+        while True:
+            job = self.store.claim(lane)
+            if job is None:
+                wakeup.clear()
+                next_run = self.store.next_run_after(lane)
+                timeout = POLL_INTERVAL if next_run is None else min(POLL_INTERVAL, max(0.0, next_run - time.time()))
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Another job may be due; let an idle sibling worker pick it up
+            wakeup.set()
+            self._notify()
+            await self._run(job)
+            self._notify()
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record success, retry or failure"""
+        job_type = self._types.get(job["kind"])
+        if job_type is None:
+            self.store.finish(job["id"], "failed", error=f"Unknown job kind: {job['kind']}")
+            return
+        try:
+            result = await job_type.handler(job["params"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, job_type.retry.retry_on) and job["attempts"] < job["max_attempts"]:
+                self.store.retry(job["id"], time.time() + job_type.retry.delay(job["attempts"]), error)
+            else:
+                self.store.finish(job["id"], "failed", error=error)
+            return
+        self.store.finish(job["id"], "succeeded", result=result)
+
+    def _notify(self) -> None:
+        """Wake everything waiting on job state changes"""
+        if self._changed is None:
+            return
+
+        async def notify():
+            async with self._changed:
+                self._changed.notify_all()
+
+        asyncio.get_running_loop().create_task(notify())
+
+    async def wait(self, job_id: str, timeout: float, since: Optional[Tuple[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Job state once it differs from `since` (status, attempts), it is
+        finished, or `timeout` seconds pass; with `since` unset, waits for a
+        terminal status
+        """
+        def changed(job: Optional[Dict[str, Any]]) -> bool:
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return True
+            return since is not None and (job["status"], job["attempts"]) != since
+
+        if timeout <= 0 or self._changed is None:
+            return self.store.get(job_id)
+        deadline = time.monotonic() + timeout
+        async with self._changed:
+            # State is read while holding the condition, so no notification
+            # can slip in between the check and the wait
+            job = self.store.get(job_id)
+            while not changed(job):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                job = self.store.get(job_id)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Lane concurrency and job counts"""
+        return {"lanes": dict(self.lanes), "jobs": self.store.counts()}
+
+
+def job_summary(job: Dict[str, Any], include_result: bool = True) -> Dict[str, Any]:
+    """Public view of a job"""
+    summary = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "lane": job["lane"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if include_result and job["status"] == "succeeded":
+        summary["result"] = job["result"]
+    return summary
+
+
+# Singleton instance
+job_queue = JobQueue()
@@ -0,0 +1,182 @@
+"""
+Batched Position Service
+Evaluates geocentric ecliptic longitudes and speeds for many Julian dates in one pass
+"""
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import chart as chart_const
+from immanuel.const import names
+
+from services.ephemeris_table import ephemeris_table
+
+
+# Immanuel object index -> Swiss Ephemeris body number for directly
+# calculable bodies (angles, houses and derived points are chart-specific)
+SWE_BODIES: Dict[int, int] = {
+    chart_const.SUN: swe.SUN,
+    chart_const.MOON: swe.MOON,
+    chart_const.MERCURY: swe.MERCURY,
+    chart_const.VENUS: swe.VENUS,
+    chart_const.MARS: swe.MARS,
+    chart_const.JUPITER: swe.JUPITER,
+    chart_const.SATURN: swe.SATURN,
+    chart_const.URANUS: swe.URANUS,
+    chart_const.NEPTUNE: swe.NEPTUNE,
+    chart_const.PLUTO: swe.PLUTO,
+    chart_const.CHIRON: swe.CHIRON,
+    chart_const.CERES: swe.CERES,
+    chart_const.PALLAS: swe.PALLAS,
+    chart_const.JUNO: swe.JUNO,
+    chart_const.VESTA: swe.VESTA,
+    chart_const.TRUE_NORTH_NODE: swe.TRUE_NODE,
+    chart_const.NORTH_NODE: swe.MEAN_NODE,
+    chart_const.TRUE_LILITH: swe.OSCU_APOG,
+    chart_const.LILITH: swe.MEAN_APOG,
+}
+
+# Objects that are calculated as the opposite point of another body
+OPPOSITES: Dict[int, int] = {
+    chart_const.TRUE_SOUTH_NODE: chart_const.TRUE_NORTH_NODE,
+    chart_const.SOUTH_NODE: chart_const.NORTH_NODE,
+}
+
+# Immanuel house system constant -> Swiss Ephemeris house system code
+HOUSE_SYSTEM_CODES: Dict[int, bytes] = {
+    chart_const.PLACIDUS: b"P",
+    chart_const.KOCH: b"K",
+    chart_const.WHOLE_SIGN: b"W",
+    chart_const.EQUAL: b"A",
+    chart_const.REGIOMONTANUS: b"R",
+    chart_const.CAMPANUS: b"C",
+    chart_const.PORPHYRIUS: b"O",
+}
+
+SIGN_NAMES = [names.SIGNS[number] for number in range(1, 13)]
+
+
+def object_name(index: int) -> str:
+    """Display name of an immanuel object index, as used in serialized charts"""
+    for table in (names.PLANETS, names.ASTEROIDS, names.POINTS, names.ANGLES):
+        if index in table:
+            return table[index]
+    return str(index)
+
+
+def is_supported(index: int) -> bool:
+    """Whether positions for an object can be evaluated in batch"""
+    return index in SWE_BODIES or index in OPPOSITES
+
+
+def swe_longitudes(index: int, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitudes and speeds straight from the Swiss Ephemeris"""
+    body = SWE_BODIES[index]
+    lon = np.empty(len(jds))
+    speed = np.empty(len(jds))
+    for i, jd in enumerate(jds):
+        result = swe.calc_ut(float(jd), body)[0]
+        lon[i] = result[0]
+        speed[i] = result[3]
+    return lon, speed
+
+
+def longitudes(index: int, jds: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ecliptic longitudes and daily speeds of one object at many Julian dates
+
+    Returns:
+        (longitudes in degrees [0, 360), speeds in degrees/day) as arrays
+    """
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    if index in OPPOSITES:
+        lon, speed = longitudes(OPPOSITES[index], jds)
+        return np.mod(lon + 180.0, 360.0), speed
+    if index not in SWE_BODIES:
+        raise ValueError(f"Object {index} cannot be evaluated in batch")
+    if ephemeris_table.covers(index, jds):
+        return ephemeris_table.longitudes(index, jds)
+    return swe_longitudes(index, jds)
+
+
+def positions(indices: Iterable[int], jds: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Longitudes and speeds for several objects at many Julian dates
+
+    Returns:
+        Two arrays of shape (len(indices), len(jds))
+    """
+    indices = list(indices)
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    lon = np.empty((len(indices), len(jds)))
+    speed = np.empty((len(indices), len(jds)))
+    for row, index in enumerate(indices):
+        lon[row], speed[row] = longitudes(index, jds)
+    return lon, speed
+
+
+def angular_difference(a: np.ndarray, b) -> np.ndarray:
+    """Signed shortest arc a - b, normalized to [-180, 180)"""
+    # floor-based wrap: about twice as fast as np.mod on large batches
+    difference = np.asarray(a, dtype=float) - b + 180.0
+    difference -= 360.0 * np.floor(difference / 360.0)
+    difference -= 180.0
+    return difference
+
+
+def sign_numbers(lon: np.ndarray) -> np.ndarray:
+    """Zodiac sign numbers (1 = Aries ... 12 = Pisces) for longitudes"""
+    return (np.floor(np.mod(lon, 360.0) / 30.0).astype(int) % 12) + 1
+
+
+def house_numbers(lon: np.ndarray, cusps: np.ndarray) -> np.ndarray:
+    """
+    House numbers (1-12) for longitudes given house cusps
+
+    Args:
+        lon: Longitudes, shape (..., n)
+        cusps: Cusp longitudes of houses 1-12, shape (n, 12) or (12,)
+    """
+    lon = np.asarray(lon, dtype=float)
+    cusps = np.asarray(cusps, dtype=float)
+    first = cusps[..., :1]
+    cusp_offsets = np.mod(cusps - first, 360.0)
+    object_offsets = np.mod(lon - first[..., 0], 360.0)
+    return (cusp_offsets <= object_offsets[..., None]).sum(axis=-1)
+
+
+def compact_chart(indices: np.ndarray, lon: np.ndarray, speed: np.ndarray,
+                  cusps: Optional[np.ndarray] = None,
+                  declination: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Objects (and houses, when cusps are given) of one chart in the compact
+    form used by composite and variant charts
+    """
+    signs = sign_numbers(lon)
+    houses = house_numbers(lon, cusps) if cusps is not None else None
+    objects = {}
+    for column, index in enumerate(np.asarray(indices).tolist()):
+        obj = {
+            "index": index,
+            "longitude": float(lon[column]),
+            "sign": SIGN_NAMES[signs[column] - 1],
+            "sign_longitude": float(lon[column] % 30.0),
+            "speed": float(speed[column]),
+            "retrograde": bool(speed[column] < 0),
+        }
+        if houses is not None:
+            obj["house"] = int(houses[column])
+        if declination is not None:
+            obj["declination"] = float(declination[column])
+        objects[object_name(index)] = obj
+    chart = {"objects": objects}
+    if cusps is not None:
+        chart["houses"] = {
+            str(number): {
+                "number": number,
+                "longitude": float(cusp),
+                "sign": SIGN_NAMES[int(cusp // 30) % 12],
+            }
+            for number, cusp in enumerate(np.asarray(cusps).tolist(), start=1)
+        }
+    return chart
@@ -0,0 +1,326 @@
+"""
+Preview Ephemeris
+Lightweight analytical planetary positions for fast, approximate chart previews
+
+Positions come from mean orbital elements with the principal perturbation
+terms (after Paul Schlyter's "How to compute planetary positions"), angles
+from the mean sidereal time - the same approach as the Moshier-based Netlify
+function. Everything is vectorized over Julian dates. ERROR_BOUNDS holds the
+validated worst-case longitude error against the Swiss Ephemeris inside
+VALID_RANGE; tests/test_preview_ephemeris.py checks them against full
+charts, and `python -m services.preview_ephemeris` prints the observed errors.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import chart as chart_const
+
+
+# Julian dates the error bounds were validated over (1900-01-01 .. 2100-01-01)
+VALID_RANGE = (2415020.5, 2488069.5)
+
+# Angle bounds hold up to this absolute latitude (the Ascendant degrades
+# towards the polar circles)
+VALID_LATITUDE = 60.0
+
+# Worst-case longitude error in degrees against the Swiss Ephemeris
+ERROR_BOUNDS: Dict[int, float] = {
+    chart_const.SUN: 0.03,
+    chart_const.MOON: 0.15,
+    chart_const.MERCURY: 0.05,
+    chart_const.VENUS: 0.05,
+    chart_const.MARS: 0.1,
+    chart_const.JUPITER: 0.06,
+    chart_const.SATURN: 0.08,
+    chart_const.URANUS: 0.06,
+    chart_const.NEPTUNE: 0.06,
+    chart_const.PLUTO: 0.05,
+    chart_const.TRUE_NORTH_NODE: 2.1,  # mean node standing in for the true node
+    chart_const.ASC: 0.05,
+    chart_const.MC: 0.02,
+}
+
+# Orbital elements as (constant, daily rate) pairs for N, i, w, a, e, M,
+# referred to the ecliptic and equinox of date
+_ELEMENTS = {
+    chart_const.SUN: ((0.0, 0.0), (0.0, 0.0), (282.9404, 4.70935e-5),
+                      (1.0, 0.0), (0.016709, -1.151e-9), (356.0470, 0.9856002585)),
+    chart_const.MOON: ((125.1228, -0.0529538083), (5.1454, 0.0), (318.0634, 0.1643573223),
+                       (60.2666, 0.0), (0.054900, 0.0), (115.3654, 13.0649929509)),
+    chart_const.MERCURY: ((48.3313, 3.24587e-5), (7.0047, 5.00e-8), (29.1241, 1.01444e-5),
+                          (0.387098, 0.0), (0.205635, 5.59e-10), (168.6562, 4.0923344368)),
+    chart_const.VENUS: ((76.6799, 2.46590e-5), (3.3946, 2.75e-8), (54.8910, 1.38374e-5),
+                        (0.723330, 0.0), (0.006773, -1.302e-9), (48.0052, 1.6021302244)),
+    chart_const.MARS: ((49.5574, 2.11081e-5), (1.8497, -1.78e-8), (286.5016, 2.92961e-5),
+                       (1.523688, 0.0), (0.093405, 2.516e-9), (18.6021, 0.5240207766)),
+    chart_const.JUPITER: ((100.4542, 2.76854e-5), (1.3030, -1.557e-7), (273.8777, 1.64505e-5),
+                          (5.20256, 0.0), (0.048498, 4.469e-9), (19.8950, 0.0830853001)),
+    chart_const.SATURN: ((113.6634, 2.38980e-5), (2.4886, -1.081e-7), (339.3939, 2.97661e-5),
+                         (9.55475, 0.0), (0.055546, -9.499e-9), (316.9670, 0.0334442282)),
+    chart_const.URANUS: ((74.0005, 1.3978e-5), (0.7733, 1.9e-8), (96.6612, 3.0565e-5),
+                         (19.18171, -1.55e-8), (0.047318, 7.45e-9), (142.5905, 0.011725806)),
+    chart_const.NEPTUNE: ((131.7806, 3.0173e-5), (1.7700, -2.55e-7), (272.8461, -6.027e-6),
+                          (30.05826, 3.313e-8), (0.008606, 2.15e-9), (260.2471, 0.005995147)),
+}
+
+PLANETS = (
+    chart_const.SUN, chart_const.MOON, chart_const.MERCURY, chart_const.VENUS,
+    chart_const.MARS, chart_const.JUPITER, chart_const.SATURN, chart_const.URANUS,
+    chart_const.NEPTUNE, chart_const.PLUTO, chart_const.TRUE_NORTH_NODE,
+)
+
+_RAD = np.pi / 180.0
+
+
+def _day_number(jd: np.ndarray) -> np.ndarray:
+    """Days since 2000 Jan 0.0 UT, the epoch of the orbital elements"""
+    return jd - 2451543.5
+
+
+def _elements(index: int, d: np.ndarray) -> Tuple[np.ndarray, ...]:
+    return tuple(constant + rate * d for constant, rate in _ELEMENTS[index])
+
+
+def _orbit(index: int, d: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ecliptic longitude, latitude (degrees) and distance in the body's own orbit frame"""
+    N, i, w, a, e, M = _elements(index, d)
+    M = np.mod(M, 360.0) * _RAD
+    E = M + e * np.sin(M) * (1.0 + e * np.cos(M))
+    for _ in range(4):
+        E = E - (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+    xv = a * (np.cos(E) - e)
+    yv = a * np.sqrt(1.0 - e * e) * np.sin(E)
+    v = np.arctan2(yv, xv)
+    r = np.hypot(xv, yv)
+
+    N, i, w = N * _RAD, i * _RAD, w * _RAD
+    x = r * (np.cos(N) * np.cos(v + w) - np.sin(N) * np.sin(v + w) * np.cos(i))
+    y = r * (np.sin(N) * np.cos(v + w) + np.cos(N) * np.sin(v + w) * np.cos(i))
+    z = r * np.sin(v + w) * np.sin(i)
+    return np.arctan2(y, x) / _RAD, np.arctan2(z, np.hypot(x, y)) / _RAD, r
+
+
+def _mean_anomaly(index: int, d: np.ndarray) -> np.ndarray:
+    constant, rate = _ELEMENTS[index][5]
+    return (constant + rate * d) * _RAD
+
+
+def _moon_perturbations(d: np.ndarray) -> np.ndarray:
+    Ms = _mean_anomaly(chart_const.SUN, d)
+    Mm = _mean_anomaly(chart_const.MOON, d)
+    Ls = Ms + (282.9404 + 4.70935e-5 * d) * _RAD
+    Nm = (125.1228 - 0.0529538083 * d) * _RAD
+    Lm = Mm + (318.0634 + 0.1643573223 * d) * _RAD + Nm
+    D = Lm - Ls
+    F = Lm - Nm
+    return (
+        -1.274 * np.sin(Mm - 2 * D)
+        + 0.658 * np.sin(2 * D)
+        - 0.186 * np.sin(Ms)
+        - 0.059 * np.sin(2 * Mm - 2 * D)
+        - 0.057 * np.sin(Mm - 2 * D + Ms)
+        + 0.053 * np.sin(Mm + 2 * D)
+        + 0.046 * np.sin(2 * D - Ms)
+        + 0.041 * np.sin(Mm - Ms)
+        - 0.035 * np.sin(D)
+        - 0.031 * np.sin(Mm + Ms)
+        - 0.015 * np.sin(2 * F - 2 * D)
+        + 0.011 * np.sin(Mm - 4 * D)
+    )
+
+
+def _outer_perturbations(index: int, d: np.ndarray) -> np.ndarray:
+    Mj = _mean_anomaly(chart_const.JUPITER, d)
+    Ms = _mean_anomaly(chart_const.SATURN, d)
+    Mu = _mean_anomaly(chart_const.URANUS, d)
+    deg = _RAD
+    if index == chart_const.JUPITER:
+        return (
+            -0.332 * np.sin(2 * Mj - 5 * Ms - 67.6 * deg)
+            - 0.056 * np.sin(2 * Mj - 2 * Ms + 21 * deg)
+            + 0.042 * np.sin(3 * Mj - 5 * Ms + 21 * deg)
+            - 0.036 * np.sin(Mj - 2 * Ms)
+            + 0.022 * np.cos(Mj - Ms)
+            + 0.023 * np.sin(2 * Mj - 3 * Ms + 52 * deg)
+            - 0.016 * np.sin(Mj - 5 * Ms - 69 * deg)
+        )
+    if index == chart_const.SATURN:
+        return (
+            0.812 * np.sin(2 * Mj - 5 * Ms - 67.6 * deg)
+            - 0.229 * np.cos(2 * Mj - 4 * Ms - 2 * deg)
+            + 0.119 * np.sin(Mj - 2 * Ms - 3 * deg)
+            + 0.046 * np.sin(2 * Mj - 6 * Ms - 69 * deg)
+            + 0.014 * np.sin(Mj - 3 * Ms + 32 * deg)
+        )
+    if index == chart_const.URANUS:
+        return (
+            0.040 * np.sin(Ms - 2 * Mu + 6 * deg)
+            + 0.035 * np.sin(Ms - 3 * Mu + 33 * deg)
+            - 0.015 * np.sin(Mj - Mu + 20 * deg)
+        )
+    return np.zeros_like(d)
+
+
+def _pluto(d: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Heliocentric Pluto from a periodic fit"""
+    S = (50.03 + 0.033459652 * d) * _RAD
+    P = (238.95 + 0.003968789 * d) * _RAD
+    lon = (
+        238.9508 + 0.00400703 * d
+        - 19.799 * np.sin(P) + 19.848 * np.cos(P)
+        + 0.897 * np.sin(2 * P) - 4.956 * np.cos(2 * P)
+        + 0.610 * np.sin(3 * P) + 1.211 * np.cos(3 * P)
+        - 0.341 * np.sin(4 * P) - 0.190 * np.cos(4 * P)
+        + 0.128 * np.sin(5 * P) - 0.034 * np.cos(5 * P)
+        - 0.038 * np.sin(6 * P) + 0.031 * np.cos(6 * P)
+        + 0.020 * np.sin(S - P) - 0.010 * np.cos(S - P)
+    )
+    lat = (
+        -3.9082
+        - 5.453 * np.sin(P) - 14.975 * np.cos(P)
+        + 3.527 * np.sin(2 * P) + 1.673 * np.cos(2 * P)
+        - 1.051 * np.sin(3 * P) + 0.328 * np.cos(3 * P)
+        + 0.179 * np.sin(4 * P) - 0.292 * np.cos(4 * P)
+        + 0.019 * np.sin(5 * P) + 0.100 * np.cos(5 * P)
+        - 0.031 * np.sin(6 * P) - 0.026 * np.cos(6 * P)
+        + 0.011 * np.cos(S - P)
+    )
+    r = (
+        40.72
+        + 6.68 * np.sin(P) + 6.90 * np.cos(P)
+        - 1.18 * np.sin(2 * P) - 0.03 * np.cos(2 * P)
+        + 0.15 * np.sin(3 * P) - 0.14 * np.cos(3 * P)
+    )
+    return lon, lat, r
+
+
+def _geocentric(lon: np.ndarray, lat: np.ndarray, r: np.ndarray, sun: Tuple) -> np.ndarray:
+    """Convert heliocentric ecliptic coordinates to a geocentric longitude"""
+    sun_lon, sun_r = sun
+    x = r * np.cos(lon * _RAD) * np.cos(lat * _RAD) + sun_r * np.cos(sun_lon * _RAD)
+    y = r * np.sin(lon * _RAD) * np.cos(lat * _RAD) + sun_r * np.sin(sun_lon * _RAD)
+    return np.arctan2(y, x) / _RAD
+
+
+def longitudes(jds) -> Dict[int, np.ndarray]:
+    """Geocentric tropical longitudes of every preview object at each Julian date"""
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    d = _day_number(jds)
+    sun_lon, _, sun_r = _orbit(chart_const.SUN, d)
+    result = {chart_const.SUN: sun_lon}
+
+    moon_lon, _, _ = _orbit(chart_const.MOON, d)
+    result[chart_const.MOON] = moon_lon + _moon_perturbations(d)
+    result[chart_const.TRUE_NORTH_NODE] = _elements(chart_const.MOON, d)[0]
+
+    for index in (chart_const.MERCURY, chart_const.VENUS, chart_const.MARS,
+                  chart_const.JUPITER, chart_const.SATURN, chart_const.URANUS,
+                  chart_const.NEPTUNE):
+        lon, lat, r = _orbit(index, d)
+        lon = lon + _outer_perturbations(index, d)
+        result[index] = _geocentric(lon, lat, r, (sun_lon, sun_r))
+
+    result[chart_const.PLUTO] = _geocentric(*_pluto(d), (sun_lon, sun_r))
+    return {index: np.mod(lon, 360.0) for index, lon in result.items()}
+
+
+def positions(jd: float) -> Dict[int, Tuple[float, float]]:
+    """(longitude, daily speed) of every preview object at one Julian date"""
+    lon = longitudes([jd - 0.5, jd, jd + 0.5])
+    return {
+        index: (float(values[1]), float(np.mod(values[2] - values[0] + 180.0, 360.0) - 180.0))
+        for index, values in lon.items()
+    }
+
+
+def obliquity(jd) -> np.ndarray:
+    """Mean obliquity of the ecliptic in degrees"""
+    T = (np.asarray(jd, dtype=float) - 2451545.0) / 36525.0
+    return 23.4392911 - 0.0130042 * T
+
+
+def armc(jd, longitude: float) -> np.ndarray:
+    """Local sidereal time as an angle (ARMC) from the mean sidereal time"""
+    jd = np.asarray(jd, dtype=float)
+    T = (jd - 2451545.0) / 36525.0
+    gmst = 280.46061837 + 360.98564736629 * (jd - 2451545.0) + 0.000387933 * T * T
+    return np.mod(gmst + longitude, 360.0)
+
+
+def angles(jd, latitude: float, longitude: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Ascendant and Midheaven longitudes"""
+    ramc = armc(jd, longitude) * _RAD
+    eps = obliquity(jd) * _RAD
+    lat = latitude * _RAD
+    asc = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(eps) + np.tan(lat) * np.sin(eps)))
+    mc = np.arctan2(np.sin(ramc), np.cos(ramc) * np.cos(eps))
+    return np.mod(asc / _RAD, 360.0), np.mod(mc / _RAD, 360.0)
+
+
+def is_validated(jd: float, latitude: float) -> bool:
+    """Whether ERROR_BOUNDS apply to a moment and place"""
+    return VALID_RANGE[0] <= jd <= VALID_RANGE[1] and abs(latitude) <= VALID_LATITUDE
+
+
+def verify_accuracy(samples: int = 2000, seed: int = 0) -> Dict[int, float]:
+    """
+    Measure worst-case longitude errors against the Swiss Ephemeris
+
+    Samples random moments and places inside VALID_RANGE and raises
+    AssertionError if any object exceeds its ERROR_BOUNDS entry.
+
+    Returns:
+        Observed maximum error in degrees per object
+    """
+    from services import positions as swe_positions
+
+    rng = np.random.default_rng(seed)
+    jds = rng.uniform(*VALID_RANGE, samples)
+    latitudes = rng.uniform(-VALID_LATITUDE, VALID_LATITUDE, samples)
+    longitudes_geo = rng.uniform(-180.0, 180.0, samples)
+
+    approximate = longitudes(jds)
+    observed = {}
+    for index in PLANETS:
+        exact, _ = swe_positions.longitudes(index, jds)
+        observed[index] = float(np.max(np.abs(swe_positions.angular_difference(approximate[index], exact))))
+
+    asc, mc = angles(jds, latitudes, longitudes_geo)
+    asc_error = mc_error = 0.0
+    for i, jd in enumerate(jds):
+        ascmc = swe.houses(float(jd), float(latitudes[i]), float(longitudes_geo[i]), b"P")[1]
+        asc_error = max(asc_error, abs(float(swe_positions.angular_difference(asc[i], ascmc[0]))))
+        mc_error = max(mc_error, abs(float(swe_positions.angular_difference(mc[i], ascmc[1]))))
+    observed[chart_const.ASC] = asc_error
+    observed[chart_const.MC] = mc_error
+
+    failures = {
+        index: error for index, error in observed.items() if error > ERROR_BOUNDS[index]
+    }
+    assert not failures, f"Preview ephemeris exceeds error bounds: {failures}"
+    return observed
+
+
+if __name__ == "__main__":
+    import time
+
+    from services import positions as swe_positions
+
+    for index, error in verify_accuracy().items():
+        print(f"{swe_positions.object_name(index):16s} max error {error:.4f}°  (bound {ERROR_BOUNDS[index]}°)")
+
+    from services.chart_service import chart_service
+
+    samples = [f"1990-06-{day:02d} 14:30" for day in range(1, 21)]
+    timings = {}
+    for precision in ("preview", "full"):
+        start = time.perf_counter()
+        for date_time in samples:
+            chart_service.calculate_natal(date_time, 40.4168, -3.7038, precision=precision)
+        timings[precision] = (time.perf_counter() - start) / len(samples)
+    print(
+        f"natal chart: preview {timings['preview'] * 1e3:.1f} ms, "
+        f"full {timings['full'] * 1e3:.1f} ms "
+        f"({timings['full'] / timings['preview']:.0f}x)"
+    )
@@ -0,0 +1,196 @@
+"""
+Progression Timeline
+Incremental secondary-progression positions and ingress events over a date range
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import swisseph as swe
+from dateutil.relativedelta import relativedelta
+from immanuel.const import calc
+from immanuel.const import chart as chart_const
+from immanuel.tools import ephemeris
+
+from services import positions
+
+
+STEP_UNITS = {
+    "day": relativedelta(days=1),
+    "week": relativedelta(weeks=1),
+    "month": relativedelta(months=1),
+    "year": relativedelta(years=1),
+}
+
+MAX_STEPS = 20000
+BATCH_SIZE = 240  # steps evaluated per batch before results are emitted
+
+
+def _to_jd(moment: datetime) -> float:
+    """UT Julian date of an aware datetime"""
+    utc = moment.astimezone(timezone.utc)
+    hour = utc.hour + utc.minute / 60 + utc.second / 3600 + utc.microsecond / 3.6e9
+    return swe.julday(utc.year, utc.month, utc.day, hour)
+
+
+class ProgressionTimeline:
+    """
+    Secondary progressions of one natal chart sampled at regular steps
+
+    The natal base (Julian date, ARMC, Sun, year length) is computed once;
+    each batch of steps evaluates every object in a single positions pass.
+    Iterating yields a header record, then one frame per step holding only
+    the fields that changed since the previous step plus any sign, house or
+    direction-change events.
+    """
+
+    def __init__(
+        self,
+        natal_jd: float,
+        latitude: float,
+        longitude: float,
+        tzinfo,
+        start: str,
+        end: str,
+        house_system: int,
+        step: str = "month",
+        interval: int = 1,
+        objects: Optional[List[int]] = None,
+        precision: int = 2,
+        method: int = calc.NAIBOD
+    ):
+        if step not in STEP_UNITS:
+            raise ValueError(f"Unsupported step: {step}")
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+
+        self.natal_jd = natal_jd
+        self.latitude = latitude
+        self.longitude = longitude
+        self.house_code = positions.HOUSE_SYSTEM_CODES.get(house_system, b"P")
+        self.precision = precision
+        self.method = method
+        self.objects = [index for index in (objects or []) if positions.is_supported(index)]
+
+        self.dates = self._dates(start, end, tzinfo, STEP_UNITS[step] * interval)
+        self.year_days = ephemeris.solar_year_length(natal_jd)
+        self.natal_armc = swe.houses_ex(natal_jd, latitude, longitude, self.house_code)[1][2]
+        if method == calc.SOLAR_ARC:
+            self.natal_sun = float(positions.swe_longitudes(chart_const.SUN, [natal_jd])[0][0])
+            self.natal_mc = swe.houses_ex(natal_jd, latitude, longitude, self.house_code)[1][1]
+
+    @staticmethod
+    def _dates(start: str, end: str, tzinfo, delta: relativedelta) -> List[datetime]:
+        """Step dates between start and end, localized to the natal timezone"""
+        first = datetime.fromisoformat(start)
+        last = datetime.fromisoformat(end)
+        first = first if first.tzinfo else first.replace(tzinfo=tzinfo)
+        last = last if last.tzinfo else last.replace(tzinfo=tzinfo)
+        if last < first:
+            raise ValueError("end must not be before start")
+
+        dates = []
+        current = first
+        while current <= last:
+            dates.append(current)
+            if len(dates) > MAX_STEPS:
+                raise ValueError(f"Timeline exceeds {MAX_STEPS} steps")
+            current = first + delta * len(dates)
+        return dates
+
+    def _armc(self, progressed_jds: np.ndarray, years: np.ndarray) -> np.ndarray:
+        """Progressed ARMC for each step according to the MC progression method"""
+        if self.method == calc.NAIBOD:
+            return np.mod(self.natal_armc + years * calc.MEAN_MOTIONS[chart_const.SUN], 360.0)
+        if self.method == calc.SOLAR_ARC:
+            sun, _ = positions.longitudes(chart_const.SUN, progressed_jds)
+            arcs = positions.angular_difference(sun, self.natal_sun)
+            return np.array([
+                swe.cotrans((self.natal_mc + arc, 0, 1), -ephemeris.earth_obliquity(float(jd)))[0]
+                for arc, jd in zip(arcs, progressed_jds)
+            ])
+        return np.array([
+            swe.houses_ex(float(jd), self.latitude, self.longitude, self.house_code)[1][2]
+            for jd in progressed_jds
+        ])
+
+    def _batch(self, dates: List[datetime]) -> Dict[str, np.ndarray]:
+        """Evaluate every object, angle and cusp for a batch of steps"""
+        target_jds = np.array([_to_jd(moment) for moment in dates])
+        years = (target_jds - self.natal_jd) / self.year_days
+        progressed_jds = self.natal_jd + years
+        armc = self._armc(progressed_jds, years)
+
+        cusps = np.empty((len(dates), 12))
+        angles = np.empty((2, len(dates)))
+        for i, (jd, armc_lon) in enumerate(zip(progressed_jds, armc)):
+            house_cusps, ascmc = swe.houses_armc(
+                float(armc_lon), self.latitude, ephemeris.earth_obliquity(float(jd)), self.house_code
+            )
+            cusps[i] = house_cusps[:12]
+            angles[:, i] = ascmc[0], ascmc[1]
+
+        lon, speed = positions.positions(self.objects, progressed_jds)
+        return {
+            "progressed_jds": progressed_jds,
+            "lon": np.vstack([lon, angles]),
+            "speed": np.vstack([speed, np.ones_like(angles)]),
+            "cusps": cusps,
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = [positions.object_name(index) for index in self.objects] + ["Asc", "MC"]
+        yield {
+            "type": "header",
+            "objects": names,
+            "steps": len(self.dates),
+            "fields": ["longitude", "sign", "house", "retrograde"],
+        }
+
+        previous: Dict[str, Dict[str, Any]] = {}
+        for offset in range(0, len(self.dates), BATCH_SIZE):
+            dates = self.dates[offset:offset + BATCH_SIZE]
+            batch = self._batch(dates)
+            lon = np.round(batch["lon"], self.precision)
+            signs = positions.sign_numbers(batch["lon"])
+            houses = positions.house_numbers(batch["lon"], batch["cusps"])
+            retrograde = batch["speed"] < 0
+
+            for step, moment in enumerate(dates):
+                changes: Dict[str, Dict[str, Any]] = {}
+                events = []
+                for row, name in enumerate(names):
+                    state = {
+                        "longitude": float(lon[row, step]),
+                        "sign": positions.SIGN_NAMES[signs[row, step] - 1],
+                        "house": int(houses[row, step]),
+                        "retrograde": bool(retrograde[row, step]),
+                    }
+                    before = previous.get(name)
+                    changed = {
+                        field: value for field, value in state.items()
+                        if before is None or before[field] != value
+                    }
+                    if changed:
+                        changes[name] = changed
+                    if before is not None:
+                        if "sign" in changed:
+                            events.append({"type": "sign_ingress", "object": name,
+                                           "from": before["sign"], "to": state["sign"]})
+                        if "house" in changed:
+                            events.append({"type": "house_ingress", "object": name,
+                                           "from": before["house"], "to": state["house"]})
+                        if "retrograde" in changed:
+                            events.append({"type": "station", "object": name,
+                                           "direction": "retrograde" if state["retrograde"] else "direct"})
+                    previous[name] = state
+
+                frame = {
+                    "type": "frame",
+                    "date_time": moment.isoformat(),
+                    "progressed_jd": float(batch["progressed_jds"][step]),
+                    "changes": changes,
+                }
+                if events:
+                    frame["events"] = events
+                yield frame
@@ -0,0 +1,79 @@
+"""
+Return Finder
+Locates exact solar and lunar return moments over a range of dates
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import calc
+from immanuel.const import chart as chart_const
+
+from services import positions
+
+
+RETURN_BODIES: Dict[str, int] = {
+    "sun": chart_const.SUN,
+    "moon": chart_const.MOON,
+}
+
+# Scan step in days - small enough that the body moves well under 180°
+# between samples, so every pass over the target is a clean sign change
+SCAN_STEPS: Dict[int, float] = {
+    chart_const.SUN: 10.0,
+    chart_const.MOON: 1.0,
+}
+
+MAX_ITERATIONS = 20
+
+
+def find_returns(
+    index: int,
+    target_longitude: float,
+    start_jd: float,
+    end_jd: float,
+    tolerance: float = calc.MAX_ERROR
+) -> np.ndarray:
+    """
+    Julian dates in [start_jd, end_jd) when a body returns to a longitude
+
+    Longitudes are sampled on a fixed grid in one batch, upward zero crossings
+    of the signed distance to the target bracket every return, and all
+    brackets are then refined together with vectorized Newton steps. The
+    scan may be served from the interpolated table; refinement always uses
+    the Swiss Ephemeris so return moments stay exact.
+    """
+    step = SCAN_STEPS[index]
+    grid = np.arange(start_jd - step, end_jd + step, step)
+    lon, _ = positions.longitudes(index, grid)
+    distance = positions.angular_difference(lon, target_longitude)
+
+    # Sun and Moon never retrograde: a return is a - to + crossing; the
+    # wrap from +180 to -180 is the opposite point and is ignored
+    crossing = (distance[:-1] < 0) & (distance[1:] >= 0)
+    before, after = distance[:-1][crossing], distance[1:][crossing]
+    jds = grid[:-1][crossing] + step * -before / (after - before)
+
+    for _ in range(MAX_ITERATIONS):
+        if not len(jds):
+            break
+        lon, speed = positions.swe_longitudes(index, jds)
+        error = positions.angular_difference(lon, target_longitude)
+        jds = jds - error / speed
+        if np.max(np.abs(error)) <= tolerance:
+            break
+
+    return jds[(jds >= start_jd) & (jds < end_jd)]
+
+
+def year_start_jd(year: int) -> float:
+    """Julian date of 1 January 00:00 UT of a year"""
+    return swe.julday(year, 1, 1, 0.0)
+
+
+def jd_to_iso(jd: float) -> str:
+    """UTC ISO date/time for a Julian date"""
+    year, month, day, hour = swe.revjul(jd)
+    moment = datetime(year, month, day, tzinfo=timezone.utc) + timedelta(hours=hour)
+    return moment.isoformat(timespec="seconds")
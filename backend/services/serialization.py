@@ -0,0 +1,193 @@
+"""
+Chart Serialization
+Immanuel formats every angle of a chart (a D°M'S" string plus the split
+direction, degrees, minutes and seconds) while the chart is being built.
+LazyAngle stands in for its Angle class and defers that work to
+serialization, so a chart serialized in "raw" mode, where every angle is
+its plain float, never formats anything. That only shortens the
+serialization; building the chart costs the same in both modes.
+format_angle and angle_text format raw values on demand, e.g. for
+interpretation prompts.
+
+    python -m services.serialization --repeat 30
+"""
+import json
+import statistics
+import time
+from typing import Dict, Any, Optional
+
+from immanuel.classes import wrap
+from immanuel.classes.serialize import ToJSON
+from immanuel.const import calc
+from immanuel.tools import convert
+
+
+# "full": angles serialized as Immanuel does; "raw": angles as floats
+FORMATTING_MODES = ("full", "raw")
+
+# Immanuel's Angle, before install() replaces it
+_ImmanuelAngle = wrap.Angle
+_PRECISION = _ImmanuelAngle.precision
+
+
+def format_angle(
+    raw: float,
+    format: int = convert.FORMAT_DMS,
+    round_to: int = calc.SECOND
+) -> Dict[str, Any]:
+    """Serialized form of an angle, as Immanuel builds it"""
+    # Immanuel rounds the split fields to the second whatever `round_to` is
+    direction, degrees, minutes, seconds = convert.dec_to_dms(raw)
+    return {
+        "raw": raw,
+        "formatted": convert.dec_to_string(raw, format=format, round_to=_PRECISION[round_to]),
+        "direction": direction,
+        "degrees": degrees,
+        "minutes": minutes,
+        "seconds": seconds,
+    }
+
+
+class LazyAngle(_ImmanuelAngle):
+    """Immanuel Angle that formats itself only when a formatted field is read"""
+
+    def __init__(
+        self,
+        angle: float,
+        format: int = convert.FORMAT_DMS,
+        round_to: int = calc.SECOND
+    ) -> None:
+        """Store the raw angle and how to format it"""
+        self.raw = angle
+        self._format = format
+        self._round_to = round_to
+
+    @property
+    def formatted(self) -> str:
+        """D°M'S" string"""
+        return convert.dec_to_string(self.raw, format=self._format, round_to=_PRECISION[self._round_to])
+
+    @property
+    def direction(self) -> str:
+        """'+' or '-'"""
+        return convert.dec_to_dms(self.raw)[0]
+
+    @property
+    def degrees(self) -> int:
+        """Whole degrees of the rounded value"""
+        return convert.dec_to_dms(self.raw)[1]
+
+    @property
+    def minutes(self) -> int:
+        """Minutes of the rounded value"""
+        return convert.dec_to_dms(self.raw)[2]
+
+    @property
+    def seconds(self) -> int:
+        """Seconds of the rounded value"""
+        return convert.dec_to_dms(self.raw)[3]
+
+    def __json__(self) -> Dict[str, Any]:
+        """Serialized form (used by ToJSON)"""
+        return format_angle(self.raw, self._format, self._round_to)
+
+
+def install() -> None:
+    """Make Immanuel build charts with LazyAngle (once per process)"""
+    wrap.Angle = LazyAngle
+
+
+class RawJSON(ToJSON):
+    """ToJSON that serializes every angle as its raw float"""
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, _ImmanuelAngle):
+            return obj.raw
+        return super().default(obj)
+
+
+ENCODERS = {"full": ToJSON, "raw": RawJSON}
+
+
+def to_dict(chart_obj: Any, formatting: str = "full") -> Dict[str, Any]:
+    """Serialized chart in one of FORMATTING_MODES"""
+    if formatting not in ENCODERS:
+        raise ValueError(f"Unknown formatting '{formatting}', expected one of {', '.join(FORMATTING_MODES)}")
+    return json.loads(json.dumps(chart_obj, cls=ENCODERS[formatting]))
+
+
+def angle_raw(value: Any) -> Optional[float]:
+    """Decimal degrees of a serialized angle in either mode"""
+    if isinstance(value, dict):
+        return value.get("raw")
+    return value
+
+
+def angle_text(value: Any, default: str = "?") -> str:
+    """D°M'S" text of a serialized angle in either mode"""
+    if isinstance(value, dict):
+        return value.get("formatted", default)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return convert.dec_to_string(value)
+    return default
+
+
+def benchmark(repeat: int = 20) -> Dict[str, Any]:
+    """
+    CPU time per natal chart with eager (Immanuel's own), lazy "full" and
+    lazy "raw" angles
+
+    "total" runs from chart construction through serialization, "serialize"
+    is the serialization alone. The variants are interleaved and repeated
+    so that drift between runs affects all of them alike; times are
+    medians in milliseconds.
+    """
+    from immanuel import charts
+
+    from services.chart_service import chart_service
+
+    subjects = [
+        chart_service._create_subject(f"19{70 + i % 30}-0{1 + i % 9}-1{i % 10} 0{i % 10}:30", 40.4168, -3.7038, "placidus")
+        for i in range(repeat)
+    ]
+    variants = {"eager": (_ImmanuelAngle, "full"), "full": (LazyAngle, "full"), "raw": (LazyAngle, "raw")}
+    totals: Dict[str, list] = {name: [] for name in variants}
+    serializing: Dict[str, list] = {name: [] for name in variants}
+    sizes: Dict[str, int] = {}
+    try:
+        for subject in subjects:
+            for name, (angle_class, formatting) in variants.items():
+                wrap.Angle = angle_class
+                started = time.process_time()
+                natal = charts.Natal(subject)
+                built = time.process_time()
+                chart = to_dict(natal, formatting)
+                finished = time.process_time()
+                totals[name].append((finished - started) * 1000)
+                serializing[name].append((finished - built) * 1000)
+                sizes[name] = len(json.dumps(chart, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    finally:
+        install()
+    return {
+        name: {
+            "total_ms": statistics.median(totals[name]),
+            "serialize_ms": statistics.median(serializing[name]),
+            "json_bytes": sizes[name],
+        }
+        for name in variants
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CPU time per chart by angle formatting mode")
+    parser.add_argument("--repeat", type=int, default=20, help="Charts per variant")
+    args = parser.parse_args()
+
+    result = benchmark(max(1, args.repeat))
+    baseline = result["eager"]
+    for name, values in result.items():
+        saved = baseline["total_ms"] - values["total_ms"]
+        print(f"{name:<6} total {values['total_ms']:6.1f} ms (saved {saved:4.1f} ms)"
+              f"  serialize {values['serialize_ms']:5.1f} ms  JSON {values['json_bytes']} bytes")
@@ -0,0 +1,226 @@
+"""
+Sky Now
+Charts of the current sky for a configured set of locations, recalculated
+at a fixed cadence in the chart worker pool and held in memory, so every
+client asking for "now" shares one calculation per location and interval
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, NamedTuple, Optional
+
+import swisseph as swe
+
+from services.workers import submit_chart_service
+
+
+# Seconds between recalculations; moments are aligned to multiples of it,
+# so every worker process calculates the same moments
+INTERVAL = float(os.getenv("SKY_NOW_INTERVAL", "300"))
+
+HOUSE_SYSTEM = os.getenv("SKY_NOW_HOUSE_SYSTEM", "placidus")
+
+# "Name=latitude,longitude" entries separated by semicolons
+DEFAULT_LOCATIONS = (
+    "London=51.5074,-0.1278;New York=40.7128,-74.006;Los Angeles=34.0522,-118.2437;"
+    "Mexico City=19.4326,-99.1332;Buenos Aires=-34.6037,-58.3816;Madrid=40.4168,-3.7038;"
+    "Paris=48.8566,2.3522;Berlin=52.52,13.405;Mumbai=19.076,72.8777;Tokyo=35.6762,139.6503;"
+    "Sydney=-33.8688,151.2093"
+)
+
+
+class SkyLocation(NamedTuple):
+    """A place whose current sky is precomputed"""
+    slug: str
+    name: str
+    latitude: float
+    longitude: float
+
+
+def parse_locations(spec: str) -> List[SkyLocation]:
+    """Locations from a "Name=lat,lon;Name=lat,lon" string"""
+    locations = []
+    for entry in spec.split(";"):
+        if not entry.strip():
+            continue
+        name, _, coordinates = entry.partition("=")
+        latitude, _, longitude = coordinates.partition(",")
+        name = name.strip()
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except ValueError:
+            raise ValueError(f"Invalid sky location '{entry.strip()}', expected Name=latitude,longitude")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f"Coordinates out of range for sky location '{name}'")
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+        locations.append(SkyLocation(slug, name, latitude, longitude))
+    return locations
+
+
+def julian_date(moment: datetime) -> float:
+    """Julian date (UT) of an aware datetime"""
+    moment = moment.astimezone(timezone.utc)
+    hours = moment.hour + moment.minute / 60 + (moment.second + moment.microsecond / 1e6) / 3600
+    return swe.julday(moment.year, moment.month, moment.day, hours)
+
+
+class SkyNowScheduler:
+    """Recalculates the current-sky charts and notifies subscribers"""
+
+    def __init__(
+        self,
+        locations: Optional[List[SkyLocation]] = None,
+        interval: float = INTERVAL,
+        house_system: str = HOUSE_SYSTEM
+    ):
+        """Initialize scheduler (nothing is calculated until start)"""
+        self.locations = {
+            location.slug: location
+            for location in (locations if locations is not None
+                             else parse_locations(os.getenv("SKY_NOW_LOCATIONS") or DEFAULT_LOCATIONS))
+        }
+        self.interval = max(1.0, interval)
+        self.house_system = house_system
+        self.version = 0
+        self.moment: Optional[datetime] = None
+        self._encoded: Dict[str, str] = {}
+        self._errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self.refreshes = 0
+        self.last_duration: Optional[float] = None
+
+    def current_moment(self, now: Optional[float] = None) -> datetime:
+        """Start of the interval containing `now`, in UTC"""
+        now = time.time() if now is None else now
+        return datetime.fromtimestamp(now - now % self.interval, timezone.utc)
+
+    async def start(self) -> None:
+        """Start recalculating in the background"""
+        if self._task is not None or not self.locations:
+            return
+        self._changed = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background recalculation"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        """Recalculate at every interval boundary"""
+        while True:
+            moment = self.current_moment()
+            if moment != self.moment:
+                await self.refresh(moment)
+            next_tick = moment.timestamp() + self.interval
+            await asyncio.sleep(max(0.0, next_tick - time.time()))
+
+    async def _calculate(self, location: SkyLocation, moment: datetime) -> Dict[str, Any]:
+        """Chart of one location at `moment`"""
+        chart = await submit_chart_service("calculate_moment", {
+            "julian_date": julian_date(moment),
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "house_system": self.house_system,
+        })
+        chart["chart_type"] = "now"
+        chart["input"] = {
+            "date_time": moment.isoformat(),
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "house_system": self.house_system,
+        }
+        return chart
+
+    async def refresh(self, moment: Optional[datetime] = None) -> None:
+        """
+        Recalculate every location for `moment` (default: the current interval)
+
+        A location that fails keeps its previous chart; the error is reported
+        in stats() until the next successful refresh.
+        """
+        moment = moment or self.current_moment()
+        started = time.perf_counter()
+        locations = list(self.locations.values())
+        results = await asyncio.gather(
+            *(self._calculate(location, moment) for location in locations),
+            return_exceptions=True,
+        )
+        next_update = datetime.fromtimestamp(moment.timestamp() + self.interval, timezone.utc)
+        for location, result in zip(locations, results):
+            if isinstance(result, BaseException):
+                self._errors[location.slug] = f"{type(result).__name__}: {result}"
+                continue
+            self._errors.pop(location.slug, None)
+            snapshot = {
+                "location": location._asdict(),
+                "moment": moment.isoformat(),
+                "next_update": next_update.isoformat(),
+                "chart": result,
+            }
+            # Serialized once here and shared by every request and subscriber
+            self._encoded[location.slug] = json.dumps(
+                {"success": True, **snapshot}, separators=(",", ":"), ensure_ascii=False
+            )
+        self.moment = moment
+        self.version += 1
+        self.refreshes += 1
+        self.last_duration = time.perf_counter() - started
+        if self._changed is not None:
+            async with self._changed:
+                self._changed.notify_all()
+
+    def encoded(self, slug: str) -> Optional[str]:
+        """Latest snapshot of a location as JSON text"""
+        return self._encoded.get(slug)
+
+    def seconds_until_update(self) -> int:
+        """Seconds until the next scheduled recalculation"""
+        if self.moment is None:
+            return 0
+        return max(0, int(self.moment.timestamp() + self.interval - time.time()))
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait for the first refresh; False if it has not finished in time"""
+        if self.version or self._changed is None:
+            return bool(self.version)
+        return await self.wait_for_update(0, timeout) > 0
+
+    async def wait_for_update(self, version: int, timeout: float) -> int:
+        """Current version once it is newer than `version` or `timeout` passes"""
+        if self._changed is None or self.version != version:
+            return self.version
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.version != version), timeout
+                )
+        except asyncio.TimeoutError:
+            pass
+        return self.version
+
+    def stats(self) -> Dict[str, Any]:
+        """Schedule, locations and the outcome of the last refresh"""
+        return {
+            "running": self._task is not None,
+            "interval": self.interval,
+            "house_system": self.house_system,
+            "moment": self.moment.isoformat() if self.moment else None,
+            "version": self.version,
+            "refreshes": self.refreshes,
+            "last_duration": self.last_duration,
+            "locations": [location._asdict() for location in self.locations.values()],
+            "memory": {"encoded": sum(len(text) for text in self._encoded.values())},
+            "errors": dict(self._errors),
+        }
+
+
+# Singleton instance
+sky_now = SkyNowScheduler()
@@ -0,0 +1,379 @@
+"""
+Streaming Service
+Coalesces upstream token deltas into Server-Sent Events and buffers them
+under a stream ID, so generation runs independently of client connections
+and clients can resume with Last-Event-ID
+"""
+import asyncio
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, AsyncIterator, Callable, Deque, List, Optional, Tuple
+
+from sse_starlette.event import ServerSentEvent
+
+
+logger = logging.getLogger(__name__)
+
+# Buffered text is flushed once it is this old (seconds) or this long (characters)
+FLUSH_INTERVAL = float(os.getenv("SSE_FLUSH_INTERVAL", "0.05"))
+MAX_EVENT_CHARS = int(os.getenv("SSE_MAX_EVENT_CHARS", "1024"))
+
+# Comment frame sent while the stream is idle, so proxies keep it open
+HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+
+# Finished streams stay resumable this long (seconds)
+STREAM_TTL = float(os.getenv("SSE_STREAM_TTL", "600"))
+
+# Generation is cancelled once no client has been attached this long (seconds)
+ABANDON_AFTER = float(os.getenv("SSE_ABANDON_AFTER", "60"))
+
+# Memory bounds: text kept per stream (oldest events are dropped beyond it)
+# and across all streams (oldest finished streams are evicted beyond it)
+MAX_STREAM_CHARS = int(os.getenv("SSE_MAX_STREAM_CHARS", "262144"))
+MAX_BUFFERED_CHARS = int(os.getenv("SSE_MAX_BUFFERED_CHARS", "67108864"))
+
+# Deltas held between the upstream reader and the coalescer
+QUEUE_SIZE = 256
+
+RECENT_STREAMS = 200
+
+_END = object()
+
+
+class StreamExpired(Exception):
+    """The requested events are no longer buffered"""
+
+
+class StreamMetrics:
+    """Counters and timings of one stream"""
+
+    def __init__(self, stream_id: str, kind: str):
+        """Start timing a stream"""
+        self.stream_id = stream_id
+        self.kind = kind
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.first_chunk: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.chunks = 0
+        self.chars = 0
+        self.events = 0
+        self.bytes = 0
+        self.parse_errors = 0
+        self.connections = 0
+        self.resumes = 0
+        self.status = "streaming"
+        self.error: Optional[str] = None
+
+    def record_chunk(self, text: str) -> None:
+        """Count one upstream delta"""
+        if self.first_chunk is None:
+            self.first_chunk = time.perf_counter() - self._clock
+        self.chunks += 1
+        self.chars += len(text)
+
+    def record_event(self, size: int) -> None:
+        """Count one event written to a client"""
+        self.events += 1
+        self.bytes += size
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot for the metrics endpoint"""
+        duration = self.duration if self.duration is not None else time.perf_counter() - self._clock
+        return {
+            "stream_id": self.stream_id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "started": self.started,
+            "time_to_first_chunk": self.first_chunk,
+            "duration": duration,
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "events": self.events,
+            "bytes": self.bytes,
+            "parse_errors": self.parse_errors,
+            "connections": self.connections,
+            "resumes": self.resumes,
+        }
+
+
+class BufferedStream:
+    """Events of one generation, numbered from 1, readable by any number of clients"""
+
+    def __init__(self, stream_id: str, kind: str, max_chars: int = MAX_STREAM_CHARS):
+        """Initialize an empty buffer"""
+        self.stream_id = stream_id
+        self.metrics = StreamMetrics(stream_id, kind)
+        self.max_chars = max_chars
+        self.chars = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._events: Deque[str] = deque()
+        self._first_seq = 1
+        self._changed = asyncio.Condition()
+        self._clients = 0
+        self._abandon: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def last_seq(self) -> int:
+        """Number of the newest event (0 before the first)"""
+        return self._first_seq + len(self._events) - 1
+
+    def event_id(self, seq: int) -> str:
+        """SSE event ID; carries the stream ID so Last-Event-ID alone locates it"""
+        return f"{self.stream_id}:{seq}"
+
+    def can_resume(self, after: int) -> bool:
+        """Whether every event after `after` is still buffered"""
+        return after + 1 >= self._first_seq
+
+    async def append(self, text: str) -> None:
+        """Add an event, dropping the oldest ones beyond the size limit"""
+        self._events.append(text)
+        self.chars += len(text)
+        while self.chars > self.max_chars and len(self._events) > 1:
+            self.chars -= len(self._events.popleft())
+            self._first_seq += 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def close(self, status: str) -> None:
+        """Mark the generation finished and wake all readers"""
+        self.done = True
+        self.finished_at = time.time()
+        self.metrics.status = status
+        self.metrics.duration = time.perf_counter() - self.metrics._clock
+        if self._abandon is not None:
+            self._abandon.cancel()
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _attach(self, resumed: bool) -> None:
+        """Count a connected client and stop any pending abandonment"""
+        self._clients += 1
+        self.metrics.connections += 1
+        if resumed:
+            self.metrics.resumes += 1
+        if self._abandon is not None:
+            self._abandon.cancel()
+            self._abandon = None
+
+    def _detach(self) -> None:
+        """Start the abandonment timer when the last client leaves mid-generation"""
+        self._clients -= 1
+        if self._clients == 0 and not self.done and self.task is not None:
+            self._abandon = asyncio.get_running_loop().call_later(ABANDON_AFTER, self.task.cancel)
+
+    async def events(self, after: int = 0) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (seq, text) for every event after `after`, waiting for new ones
+        until the generation finishes
+
+        Raises:
+            StreamExpired: If events after `after` were dropped from the buffer
+        """
+        if not self.can_resume(after):
+            raise StreamExpired(self.stream_id)
+        self._attach(resumed=after > 0)
+        seq = after
+        try:
+            while True:
+                while seq < self.last_seq:
+                    seq += 1
+                    if seq < self._first_seq:
+                        raise StreamExpired(self.stream_id)
+                    yield seq, self._events[seq - self._first_seq]
+                if self.done:
+                    return
+                async with self._changed:
+                    await self._changed.wait_for(lambda: self.last_seq > seq or self.done)
+        finally:
+            self._detach()
+
+
+class StreamRegistry:
+    """Buffered streams by ID, expired by TTL and bounded in total size"""
+
+    def __init__(
+        self,
+        ttl: float = STREAM_TTL,
+        max_buffered_chars: int = MAX_BUFFERED_CHARS,
+        recent: int = RECENT_STREAMS
+    ):
+        """Initialize empty registry"""
+        self.ttl = ttl
+        self.max_buffered_chars = max_buffered_chars
+        self._streams: "OrderedDict[str, BufferedStream]" = OrderedDict()
+        self._recent: Deque[StreamMetrics] = deque(maxlen=recent)
+        self._totals: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, kind: str, source: Callable[[StreamMetrics], AsyncIterator[str]]) -> BufferedStream:
+        """
+        Begin a generation in the background
+
+        Args:
+            kind: Label for metrics
+            source: Called with the stream's metrics, returns the upstream deltas
+        """
+        self._sweep()
+        stream = BufferedStream(secrets.token_urlsafe(12), kind)
+        with self._lock:
+            self._streams[stream.stream_id] = stream
+        stream.task = asyncio.create_task(self._produce(stream, source(stream.metrics)))
+        return stream
+
+    async def _produce(self, stream: BufferedStream, source: AsyncIterator[str]) -> None:
+        """Coalesce upstream deltas into the stream's buffer"""
+        status = "error"
+        try:
+            async for text in coalesce(source, stream.metrics):
+                await stream.append(text)
+                self._enforce_limit()
+            status = "completed"
+        except asyncio.CancelledError:
+            status = "abandoned"
+        except Exception as e:
+            status = "error"
+            stream.metrics.error = f"{type(e).__name__}: {e}"
+            logger.exception("Stream %s (%s) failed", stream.stream_id, stream.metrics.kind)
+        finally:
+            await stream.close(status)
+            with self._lock:
+                self._recent.append(stream.metrics)
+                self._totals[status] = self._totals.get(status, 0) + 1
+
+    def get(self, stream_id: str) -> Optional[BufferedStream]:
+        """A stream that has not expired"""
+        self._sweep()
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def _sweep(self) -> None:
+        """Drop finished streams older than the TTL"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for stream_id in [
+                stream_id for stream_id, stream in self._streams.items()
+                if stream.done and stream.finished_at < cutoff
+            ]:
+                del self._streams[stream_id]
+
+    def _enforce_limit(self) -> None:
+        """Evict the oldest finished streams while the total buffer is too large"""
+        with self._lock:
+            total = sum(stream.chars for stream in self._streams.values())
+            for stream_id in list(self._streams):
+                if total <= self.max_buffered_chars:
+                    break
+                stream = self._streams[stream_id]
+                if stream.done:
+                    total -= stream.chars
+                    del self._streams[stream_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals by outcome, running generations and recently finished ones"""
+        with self._lock:
+            running = [stream.metrics for stream in self._streams.values() if not stream.done]
+            recent: List[StreamMetrics] = list(self._recent)
+            totals = dict(self._totals)
+            buffered = {
+                "streams": len(self._streams),
+                "chars": sum(stream.chars for stream in self._streams.values()),
+                "max_chars": self.max_buffered_chars,
+            }
+        return {
+            "totals": totals,
+            "buffered": buffered,
+            "active": [metrics.as_dict() for metrics in running],
+            "recent": [metrics.as_dict() for metrics in reversed(recent)],
+        }
+
+
+def encode_event(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """One SSE frame; multi-line data becomes several `data:` lines"""
+    return ServerSentEvent(data=data, event=event, id=event_id).encode()
+
+
+def parse_event_id(last_event_id: Optional[str]) -> Tuple[Optional[str], int]:
+    """(stream ID, sequence number) from a Last-Event-ID value"""
+    if not last_event_id:
+        return None, 0
+    stream_id, _, seq = last_event_id.rpartition(":")
+    try:
+        return stream_id or None, max(0, int(seq))
+    except ValueError:
+        return None, 0
+
+
+async def coalesce(
+    source: AsyncIterator[str],
+    metrics: Optional[StreamMetrics] = None,
+    flush_interval: float = FLUSH_INTERVAL,
+    max_chars: int = MAX_EVENT_CHARS,
+) -> AsyncIterator[str]:
+    """
+    Merge upstream deltas into larger pieces
+
+    A background task reads `source` into a bounded queue; buffered text is
+    released once it is `flush_interval` seconds old or `max_chars` long.
+    Closing this generator cancels the reader, which closes the upstream
+    request.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def pump() -> None:
+        try:
+            async for chunk in source:
+                if metrics is not None:
+                    metrics.record_chunk(chunk)
+                await queue.put(chunk)
+        except Exception as error:
+            await queue.put(error)
+            return
+        await queue.put(_END)
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.create_task(pump())
+    buffer: List[str] = []
+    size = 0
+    deadline = 0.0
+    try:
+        while True:
+            try:
+                if buffer:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                else:
+                    item = await queue.get()
+            except asyncio.TimeoutError:
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer.append(item)
+            size += len(item)
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # The cancellation unwinds `source` inside the reader task, closing
+        # the upstream response; nothing is awaited here because this block
+        # may itself run under cancellation
+        reader.cancel()
+
+
+# Singleton instance
+stream_registry = StreamRegistry()
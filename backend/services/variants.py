@@ -0,0 +1,112 @@
+"""
+Chart Variants
+House system, sidereal and harmonic variants of one chart derived from a
+single ephemeris pass
+"""
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import swisseph as swe
+from immanuel.const import chart as chart_const
+
+from services import positions
+from services.aspects import AspectEngine, PositionSet, aspect_engine
+from services.composite import NatalPositions, Subject, composite_service
+
+
+# Sidereal zodiacs offered by name -> Swiss Ephemeris ayanamsa mode
+AYANAMSAS: Dict[str, int] = {
+    "lahiri": swe.SIDM_LAHIRI,
+    "fagan_bradley": swe.SIDM_FAGAN_BRADLEY,
+    "raman": swe.SIDM_RAMAN,
+    "krishnamurti": swe.SIDM_KRISHNAMURTI,
+    "yukteshwar": swe.SIDM_YUKTESHWAR,
+    "true_citra": swe.SIDM_TRUE_CITRA,
+}
+
+# Positions are cached under one house system; objects do not depend on it
+BASE_HOUSE_SYSTEM = chart_const.PLACIDUS
+
+
+class Variant(NamedTuple):
+    """One requested rendering of a chart"""
+    house_system: int = BASE_HOUSE_SYSTEM
+    ayanamsa: Optional[str] = None
+    harmonic: int = 1
+
+
+def ayanamsa(jd: float, name: str) -> Tuple[float, float]:
+    """
+    (ayanamsa in degrees, its daily rate) for a Julian date
+
+    The ayanamsa includes nutation, matching the Swiss Ephemeris' own
+    sidereal positions.
+    """
+    swe.set_sid_mode(AYANAMSAS[name])
+    value = swe.get_ayanamsa_ex_ut(jd, swe.FLG_SWIEPH)[1]
+    rate = swe.get_ayanamsa_ex_ut(jd + 1.0, swe.FLG_SWIEPH)[1] - value
+    return value, rate
+
+
+class VariantService:
+    """Derives chart variants from cached tropical positions"""
+
+    def __init__(self, engine: Optional[AspectEngine] = None):
+        """Initialize service"""
+        self.engine = engine or aspect_engine
+
+    @staticmethod
+    def cusps(natal: NatalPositions, house_system: int, offset: float = 0.0) -> np.ndarray:
+        """
+        House cusps from the natal ARMC, shifted back by a sidereal offset
+
+        Whole sign houses start at the sign holding the (shifted) Ascendant,
+        so they are recast rather than shifted.
+        """
+        code = positions.HOUSE_SYSTEM_CODES.get(house_system, b"P")
+        cusps, ascmc = swe.houses_armc(natal.armc, natal.latitude, natal.obliquity, code)
+        if house_system == chart_const.WHOLE_SIGN:
+            first = np.floor(np.mod(ascmc[0] - offset, 360.0) / 30.0) * 30.0
+            return np.mod(first + 30.0 * np.arange(12), 360.0)
+        return np.mod(np.array(cusps[:12]) - offset, 360.0)
+
+    def derive(self, natal: NatalPositions, variant: Variant, aspects: bool = True) -> Dict[str, Any]:
+        """
+        One variant of a chart
+
+        Sidereal variants subtract the ayanamsa (and its rate) from every
+        longitude and cusp. Harmonic variants multiply longitudes and speeds
+        by the harmonic number; their cusps would have no meaning, so they
+        carry objects and aspects only.
+        """
+        lon, speed = natal.lon, natal.speed
+        offset = 0.0
+        if variant.ayanamsa:
+            offset, rate = ayanamsa(natal.julian_date, variant.ayanamsa)
+            lon = np.mod(lon - offset, 360.0)
+            speed = speed - rate
+        cusps = None
+        if variant.harmonic != 1:
+            lon = np.mod(lon * variant.harmonic, 360.0)
+            speed = speed * variant.harmonic
+        else:
+            cusps = self.cusps(natal, variant.house_system, offset)
+
+        chart = positions.compact_chart(natal.indices, lon, speed, cusps)
+        if aspects:
+            chart["aspects"] = self.engine.natal(PositionSet(natal.indices, lon, speed))
+        return chart
+
+    def variants(
+        self,
+        subject: Subject,
+        variants: Sequence[Variant],
+        aspects: bool = True
+    ) -> List[Dict[str, Any]]:
+        """All requested variants of one subject's chart from one ephemeris pass"""
+        natal = composite_service.natal_positions([subject], BASE_HOUSE_SYSTEM)[0]
+        return [self.derive(natal, variant, aspects) for variant in variants]
+
+
+# Singleton instance
+variant_service = VariantService()
@@ -0,0 +1,72 @@
+"""
+Chart Worker Pool
+Shared process pool for CPU-bound chart builds
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", os.cpu_count() or 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Pool slots for submit_chart_service, per event loop
+_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+def call_chart_service(method: str, kwargs: Dict[str, Any]) -> Any:
+    """Worker entry point: run one ChartService method in this process"""
+    from services.chart_service import chart_service
+
+    return getattr(chart_service, method)(**kwargs)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Create the shared process pool on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CHART_WORKERS)
+    return _pool
+
+
+def _pool_slots() -> asyncio.Semaphore:
+    """Semaphore admitting one call per pool worker"""
+    global _slots
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots[0] is not loop:
+        _slots = (loop, asyncio.Semaphore(max(1, CHART_WORKERS)))
+    return _slots[1]
+
+
+async def submit_chart_service(method: str, kwargs: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+    """
+    Run one ChartService method in the process pool, cancellably
+
+    Calls wait for a free worker here, not in the pool's queue, so a call
+    cancelled (or timed out) while waiting is dropped without ever being
+    submitted. A call that has started runs to completion in its worker,
+    which stays reserved until then, but its result is discarded. Raises
+    asyncio.TimeoutError once `timeout` seconds pass.
+    """
+    async def call():
+        slots = _pool_slots()
+        await slots.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(get_pool(), call_chart_service, method, kwargs)
+        except BaseException:
+            slots.release()
+            raise
+
+        def finished(done: asyncio.Future) -> None:
+            slots.release()
+            if not done.cancelled():
+                done.exception()  # retrieved, so abandoned failures are not logged
+
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    if timeout is None:
+        return await call()
+    return await asyncio.wait_for(call(), timeout)
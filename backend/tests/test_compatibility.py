@@ -0,0 +1,70 @@
+"""
+Compatibility position cache
+
+Positions taken from calculated natal charts must equal the ones the
+service calculates itself, and cold subjects are calculated in chunks that
+a cancelled request stops between.
+"""
+import threading
+from concurrent.futures import CancelledError
+
+import numpy as np
+import pytest
+
+from services import compatibility
+from services.chart_service import chart_service
+from services.compatibility import CompatibilityService
+
+
+# Subjects on land (so they have a timezone)
+SUBJECTS = [
+    ("1990-05-15 14:30", 40.4168, -3.7038),   # Madrid
+    ("1985-01-01 08:00", 51.5074, -0.1278),   # London
+    ("1962-09-30 21:15", -33.8688, 151.2093), # Sydney
+    ("2003-07-04 05:45", 35.6762, 139.6503),  # Tokyo
+    ("1948-02-29 12:00", -23.5505, -46.6333), # São Paulo
+]
+
+
+@pytest.mark.parametrize("formatting", ["full", "raw"])
+def test_remembered_chart_matches_calculated_positions(formatting):
+    service = CompatibilityService()
+    subject = SUBJECTS[0]
+    service.remember(subject, chart_service.calculate_natal(*subject, formatting=formatting))
+    expected_lon, expected_speed = service._calculate([subject])
+
+    assert service.cache_info()["subjects"] == 1
+    lon, speed = service.natal_positions([subject])
+    np.testing.assert_allclose(lon, expected_lon, atol=1e-9)
+    np.testing.assert_allclose(speed, expected_speed, atol=1e-9)
+
+
+def test_cold_subjects_are_calculated_in_chunks(monkeypatch):
+    monkeypatch.setattr(compatibility, "COLD_CHUNK", 2)
+    service = CompatibilityService()
+    calls = []
+    calculate = service._calculate
+    monkeypatch.setattr(service, "_calculate", lambda subjects: calls.append(len(subjects)) or calculate(subjects))
+
+    lon, _ = service.natal_positions(SUBJECTS + SUBJECTS[:1])
+
+    assert calls == [2, 2, 1]
+    np.testing.assert_array_equal(lon[0], lon[-1])
+    assert service.cache_info()["subjects"] == len(SUBJECTS)
+
+
+def test_cancelled_ranking_stops_before_the_next_chunk(monkeypatch):
+    monkeypatch.setattr(compatibility, "COLD_CHUNK", 2)
+    service = CompatibilityService()
+    cancelled = threading.Event()
+    calculate = service._calculate
+
+    def calculate_then_cancel(subjects):
+        cancelled.set()
+        return calculate(subjects)
+
+    monkeypatch.setattr(service, "_calculate", calculate_then_cancel)
+    with pytest.raises(CancelledError):
+        service.top_matches(SUBJECTS[:1], SUBJECTS[1:], top_k=2, cancelled=cancelled)
+    # The subject's chunk was calculated and stays cached
+    assert service.cache_info()["subjects"] == 1
@@ -0,0 +1,72 @@
+"""
+Preview charts against full Immanuel charts
+
+Every preview position must lie within its ERROR_BOUNDS entry of the full
+chart's, at dates across VALID_RANGE and latitudes up to VALID_LATITUDE.
+"""
+import pytest
+
+from services import positions, preview_ephemeris
+from services.chart_service import chart_service
+from services.serialization import angle_raw
+
+
+# Moments spread over 1900-2100, local time
+DATES = [
+    "1901-03-14 06:10",
+    "1932-11-02 23:45",
+    "1957-07-21 12:00",
+    "1978-01-30 03:25",
+    "1999-08-11 11:08",
+    "2024-04-08 18:17",
+    "2061-07-28 09:40",
+    "2098-12-24 15:55",
+]
+
+# Places on land (so they have a timezone) up to VALID_LATITUDE
+PLACES = [
+    (-54.8019, -68.3030),  # Ushuaia
+    (-33.8688, 151.2093),  # Sydney
+    (-0.1807, -78.4678),   # Quito
+    (40.4168, -3.7038),    # Madrid
+    (59.9139, 10.7522),    # Oslo
+]
+
+# Preview longitudes are rounded to 4 decimals
+ROUNDING = 1e-4
+
+
+def _full_longitudes(chart):
+    """Longitudes of a full chart by object name"""
+    return {obj["name"]: angle_raw(obj["longitude"]) for obj in chart["objects"].values()}
+
+
+@pytest.mark.parametrize("latitude,longitude", PLACES)
+@pytest.mark.parametrize("date_time", DATES)
+def test_preview_within_error_bounds(date_time, latitude, longitude):
+    preview = chart_service.calculate_natal(date_time, latitude, longitude, precision="preview")
+    full = _full_longitudes(chart_service.calculate_natal(date_time, latitude, longitude, formatting="raw"))
+
+    assert preview["validated"]
+    for index, bound in preview_ephemeris.ERROR_BOUNDS.items():
+        name = positions.object_name(index)
+        obj = preview["objects"][name]
+        error = abs(float(positions.angular_difference(obj["longitude"], full[name])))
+        assert obj["max_error"] <= bound
+        assert error <= bound + ROUNDING, f"{name} off by {error:.4f}° (bound {bound}°)"
+
+
+def test_preview_outside_validated_range_is_exact():
+    date_time, latitude, longitude = "1750-06-01 12:00", 40.4168, -3.7038
+    preview = chart_service.calculate_natal(date_time, latitude, longitude, precision="preview")
+    full = _full_longitudes(chart_service.calculate_natal(date_time, latitude, longitude, formatting="raw"))
+
+    assert not preview["validated"]
+    for name, obj in preview["objects"].items():
+        assert obj["max_error"] == 0.0
+        assert abs(float(positions.angular_difference(obj["longitude"], full[name]))) <= ROUNDING
+
+
+def test_verify_accuracy_against_swiss_ephemeris():
+    observed = preview_ephemeris.verify_accuracy(samples=300, seed=1)
+    assert set(observed) == set(preview_ephemeris.ERROR_BOUNDS)
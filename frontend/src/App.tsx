@@ -32,6 +32,9 @@ export interface BirthData {
     houseSystem: string;
 }
 
+// Chart types fetched together for one person's birth data
+const DASHBOARD_CHARTS = ['natal', 'transit', 'solar_return']
+
 function AppContent() {
     const { t, language } = useLanguage()
     const [chartType, setChartType] = useState('natal')
@@ -47,6 +50,7 @@ function AppContent() {
     const [isLoading, setIsLoading] = useState(false)
     const [error, setError] = useState<string | null>(null)
     const [activeTab, setActiveTab] = useState<'chart' | 'tables' | 'interpretation'>('chart')
+    const [dashboard, setDashboard] = useState<{ key: string; charts: Record<string, ChartData> } | null>(null)
 
     const getFormTitle = () => {
         if (['synastry', 'composite'].includes(chartType)) {
@@ -77,35 +81,43 @@ function AppContent() {
         }
 
         setPrimaryData(data)
+        await fetchDashboard(data)
+    }
 
-        if (chartType === 'natal') {
-            await fetchChart('natal', {
-                date_time: `${data.date} ${data.time}`,
-                latitude: data.latitude,
-                longitude: data.longitude,
-                house_system: data.houseSystem
-            })
-        } else if (chartType === 'transit') {
-            const now = new Date()
-            const transitTime = now.toISOString().slice(0, 16).replace('T', ' ')
-
-            await fetchChart('transit', {
-                natal_date_time: `${data.date} ${data.time}`,
-                natal_latitude: data.latitude,
-                natal_longitude: data.longitude,
-                transit_date_time: transitTime,
-                house_system: data.houseSystem
-            })
-        } else if (chartType === 'solar-return') {
-            const currentYear = new Date().getFullYear()
-
-            await fetchChart('solar-return', {
-                natal_date_time: `${data.date} ${data.time}`,
-                latitude: data.latitude,
-                longitude: data.longitude,
-                year: currentYear,
-                house_system: data.houseSystem
-            })
+    // Single-person chart types come from one dashboard request per birth
+    // data; switching between them afterwards needs no further request
+    const fetchDashboard = async (data: BirthData) => {
+        const chartKey = chartType.replace('-', '_')
+        const payload = {
+            date_time: `${data.date} ${data.time}`,
+            latitude: data.latitude,
+            longitude: data.longitude,
+            house_system: data.houseSystem,
+            charts: DASHBOARD_CHARTS
+        }
+        const cacheKey = JSON.stringify(payload)
+
+        if (dashboard?.key === cacheKey && dashboard.charts[chartKey]) {
+            setError(null)
+            setChartData(dashboard.charts[chartKey])
+            return
+        }
+
+        const result = await fetchChart('dashboard', payload)
+        if (!result) return
+
+        if (result.charts) {
+            const charts: Record<string, ChartData> = {}
+            for (const [type, entry] of Object.entries<any>(result.charts)) {
+                charts[type] = entry.chart
+            }
+            setDashboard({ key: cacheKey, charts })
+            setChartData(charts[chartKey])
+        } else if (result.chart && chartType === 'natal') {
+            // Deployments without the dashboard endpoint answer with a natal chart
+            setChartData(result.chart)
+        } else {
+            setError(t('errors.failedChart'))
         }
     }
 
@@ -120,10 +132,13 @@ function AppContent() {
             house_system: p1.houseSystem
         }
 
-        await fetchChart(chartType, payload)
+        const result = await fetchChart(chartType, payload)
+        if (result) {
+            setChartData(result.chart)
+        }
     }
 
-    const fetchChart = async (endpoint: string, payload: any) => {
+    const fetchChart = async (endpoint: string, payload: any): Promise<any | null> => {
         setIsLoading(true)
         setError(null)
         setChartData(null)
@@ -145,14 +160,14 @@ function AppContent() {
 
             const result = await response.json()
 
-            if (result.success) {
-                setChartData(result.chart)
-            } else {
+            if (!result.success) {
                 throw new Error(result.detail || t('errors.generic'))
             }
+            return result
         } catch (err) {
             setError(err instanceof Error ? err.message : t('errors.failedChart'))
             console.error(err)
+            return null
         } finally {
             setIsLoading(false)
         }
@@ -14,6 +14,10 @@ interface InterpretationProps {
     chartData: ChartData
 }
 
+// Reconnects allowed after a dropped interpretation stream, and the base delay between them
+const MAX_RESUME_ATTEMPTS = 5
+const RESUME_DELAY_MS = 500
+
 // Preprocess markdown to ensure headers render correctly
 const preprocessMarkdown = (text: string): string => {
     return text
@@ -74,37 +78,78 @@ function Interpretation({ chartData }: InterpretationProps) {
                 throw new Error(`${t('errors.failedInterpretation')}: ${response.statusText}`)
             }
 
-            const reader = response.body?.getReader()
-            const decoder = new TextDecoder()
-
-            if (!reader) {
-                throw new Error('No response body')
-            }
-
             let fullText = ''
+            let lastEventId = ''
+            let finished = false
+            let attempts = 0
             setMessages(prev => [...prev, { role: 'assistant', content: '' }])
 
-            while (true) {
-                const { done, value } = await reader.read()
-                if (done) break
+            // Reads one connection; returns when it ends, throws on stream errors
+            const readStream = async (body: ReadableStream<Uint8Array>) => {
+                const reader = body.getReader()
+                const decoder = new TextDecoder()
+                let buffer = ''
+
+                while (!finished) {
+                    const { done, value } = await reader.read()
+                    if (done) break
 
-                const chunk = decoder.decode(value)
-                const lines = chunk.split('\n')
+                    // Events end with a blank line; keep any partial event for the next read
+                    buffer += decoder.decode(value, { stream: true }).replace(/\r\n?/g, '\n')
+                    const events = buffer.split('\n\n')
+                    buffer = events.pop() ?? ''
 
-                for (const line of lines) {
-                    if (line.startsWith('data: ')) {
-                        const data = line.slice(6)
-                        if (data === '[DONE]') break
-                        // Add newline between data lines to reconstruct multi-line text
-                        if (fullText.length > 0) fullText += '\n'
+                    for (const event of events) {
+                        // Lines of one event's data are joined with newlines;
+                        // comment lines (heartbeats) start with ':'
+                        const lines = event.split('\n')
+                        const dataLines = lines
+                            .filter(line => line.startsWith('data:'))
+                            .map(line => line.slice(line.startsWith('data: ') ? 6 : 5))
+                        if (dataLines.length === 0) continue
+                        const data = dataLines.join('\n')
+                        if (lines.includes('event: error')) throw new Error(data)
+                        const idLine = lines.find(line => line.startsWith('id: '))
+                        if (idLine) lastEventId = idLine.slice(4)
+                        if (data === '[DONE]') {
+                            finished = true
+                            break
+                        }
                         fullText += data
-                        setMessages(prev => {
-                            const updated = [...prev]
-                            updated[updated.length - 1] = { role: 'assistant', content: fullText }
-                            return updated
-                        })
                     }
+                    setMessages(prev => {
+                        const updated = [...prev]
+                        updated[updated.length - 1] = { role: 'assistant', content: fullText }
+                        return updated
+                    })
+                }
+            }
+
+            let body = response.body
+            while (!finished) {
+                if (!body) throw new Error('No response body')
+                try {
+                    await readStream(body)
+                } catch (err) {
+                    // Dropped connections are resumed below; server-sent errors are final
+                    if (!(err instanceof TypeError)) throw err
+                }
+                if (finished) break
+
+                // The server keeps generating; reconnect and continue after the last event seen
+                const streamId = lastEventId.split(':')[0]
+                if (!streamId || attempts >= MAX_RESUME_ATTEMPTS) {
+                    throw new Error(t('errors.failedInterpretation'))
+                }
+                attempts += 1
+                await new Promise(resolve => setTimeout(resolve, RESUME_DELAY_MS * attempts))
+                const resumed = await fetch(`${apiBase}/api/interpret/streams/${streamId}`, {
+                    headers: { 'Last-Event-ID': lastEventId }
+                })
+                if (!resumed.ok) {
+                    throw new Error(`${t('errors.failedInterpretation')}: ${resumed.statusText}`)
                 }
+                body = resumed.body
             }
         } catch (err) {
             setError(err instanceof Error ? err.message : t('errors.failedInterpretation'))